@@ -1,8 +1,15 @@
-import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from config.vars import env
+from db.config import init_engines, dispose_engines
+from proxmox.init import clusters
+from proxmox.tasks import task_registry
+from proxmox.placement import placement_index
+from proxmox.inventory import inventory_reconciler
 from routes.proxmox.nodes import pve_nodes
 from routes.proxmox.network import network_devices
 from routes.proxmox.lxc import lxc_containers
+from routes.proxmox.tasks import pve_tasks
 from routes.core.project import project_router
 from routes.core.region import region_router
 from routes.core.service import service_router
@@ -10,16 +17,36 @@ from routes.auth.ssh_key import ssh_key_router
 from routes.business.server_offer import server_offer_router
 from routes.servers.image import server_image_router
 from routes.servers.node import prox_node_router
+from routes.servers.provision import server_provision_router
 from routes.networking.vlan import prox_vlan_router
+from routes.monitoring.metrics import metrics_router
+from utils.instrumentation import InstrumentationMiddleware
+from utils.logs import setup_logging
 
 
-logging.basicConfig(level=logging.INFO)
+setup_logging(env["LOG_LEVEL"], env["LOG_FORMAT"], env["LOG_ROUTE_LEVELS"], env["LOG_ROUTE_SAMPLE_RATES"])
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_engines()
+    await clusters.load_nodes()
+    await clusters.warm()
+    placement_index.start()
+    inventory_reconciler.start()
+    yield
+    await inventory_reconciler.stop()
+    await placement_index.stop()
+    await task_registry.stop()
+    await clusters.aclose()
+    await dispose_engines()
 
 
 app = FastAPI(
     title="Puyu API",
     description="Helmcode Cloud API",
     version="0.0.1",
+    lifespan=lifespan,
     openapi_tags=[
         {
             "name": "auth",
@@ -84,13 +111,20 @@ app = FastAPI(
                     "description": "Handle VLANs",
                 }
             ]
+        },
+        {
+            "name": "monitoring",
+            "description": "Monitoring API",
         }
     ],
 )
 
+app.add_middleware(InstrumentationMiddleware, server_timing=env["SERVER_TIMING_ENABLED"].lower() == "true")
+
 app.include_router(pve_nodes)
 app.include_router(network_devices)
 app.include_router(lxc_containers)
+app.include_router(pve_tasks)
 app.include_router(project_router)
 app.include_router(region_router)
 app.include_router(service_router)
@@ -98,4 +132,6 @@ app.include_router(ssh_key_router)
 app.include_router(server_offer_router)
 app.include_router(server_image_router)
 app.include_router(prox_node_router)
+app.include_router(server_provision_router)
 app.include_router(prox_vlan_router)
+app.include_router(metrics_router)
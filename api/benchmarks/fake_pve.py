@@ -0,0 +1,434 @@
+import argparse
+import asyncio
+import fnmatch
+import itertools
+import random
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from fastapi import FastAPI, Form, Request
+from fastapi.responses import JSONResponse
+
+GB = 1024 ** 3
+MB = 1024 ** 2
+FIRST_VMID = 100
+API_PREFIX = "/api2/json"
+
+
+class Distribution:
+    def __init__(self, spec: str):
+        name, *params = spec.split(":")
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exponential": 1}
+        if expected.get(name) != len(params):
+            raise ValueError(f"Invalid distribution {spec}, expected one of fixed:ms, uniform:min:max, normal:mean:sd, lognormal:median:sigma or exponential:mean")
+        self.name = name
+        self.params = [float(param) for param in params]
+
+    def sample(self, rng: random.Random) -> float:
+        match self.name:
+            case "fixed":
+                ms = self.params[0]
+            case "uniform":
+                ms = rng.uniform(*self.params)
+            case "normal":
+                ms = max(rng.gauss(*self.params), 0)
+            case "lognormal":
+                ms = self.params[0] * rng.lognormvariate(0, self.params[1])
+            case "exponential":
+                ms = rng.expovariate(1 / self.params[0]) if self.params[0] else 0
+        return ms / 1000
+
+
+class Rules:
+    def __init__(self, rules: Iterable[str], parse: Callable[[str], object], method_scoped: bool = True):
+        self.rules: List[Tuple[str, object]] = []
+        for rule in rules:
+            pattern, value = rule.rsplit("=", 1)
+            pattern = pattern.strip()
+            if method_scoped and " " not in pattern:
+                pattern = f"* {pattern}"
+            self.rules.append((pattern, parse(value.strip())))
+
+    def match(self, key: str):
+        for pattern, value in self.rules:
+            if fnmatch.fnmatchcase(key, pattern):
+                return value
+        return None
+
+
+def parse_error(value: str) -> Tuple[float, int]:
+    rate, status_code = value.split(":")
+    return float(rate), int(status_code)
+
+
+class PveError(Exception):
+    def __init__(self, status_code: int, message: str, errors: Optional[dict] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+        self.errors = errors
+
+
+class FakeProxmox:
+    def __init__(
+        self,
+        nodes: int = 3,
+        containers_per_node: int = 10,
+        latency: Iterable[str] = (),
+        errors: Iterable[str] = (),
+        task_durations: Iterable[str] = (),
+        task_failure_rate: float = 0,
+        offline_nodes: Iterable[str] = (),
+        node_cpus: int = 64,
+        node_memory_gb: int = 256,
+        node_storage_gb: int = 2000,
+        seed: Optional[int] = None,
+    ):
+        self.rng = random.Random(seed)
+        self.latency = Rules(latency, Distribution)
+        self.errors = Rules(errors, parse_error)
+        self.task_durations = Rules(task_durations, Distribution, method_scoped=False)
+        self.task_failure_rate = task_failure_rate
+        self.node_cpus = node_cpus
+        self.node_memory = node_memory_gb * GB
+        self.node_storage = node_storage_gb * GB
+        self.nodes: Dict[str, str] = {f"node{index:02d}": "online" for index in range(1, nodes + 1)}
+        for node in offline_nodes:
+            self.nodes[node] = "offline"
+        self.containers: Dict[int, dict] = {}
+        self.networks: Dict[str, Dict[str, dict]] = {node: {} for node in self.nodes}
+        self.tasks: Dict[str, dict] = {}
+        self._running: Dict[str, dict] = {}
+        self._task_ids = itertools.count(1)
+        for node in self.nodes:
+            self.add_interface(node, {"iface": "vmbr0", "type": "bridge", "bridge_ports": "eno1", "bridge_vlan_aware": 1, "cidr": "10.0.0.1/24", "autostart": 1}, active=True)
+            self.add_interface(node, {"iface": "eno1", "type": "eth", "autostart": 1}, active=True)
+        vmids = itertools.count(FIRST_VMID)
+        for node in self.nodes:
+            for _ in range(containers_per_node):
+                vmid = next(vmids)
+                self.add_container(node, vmid, f"ct-{vmid}", status="running")
+
+    def add_container(self, node: str, vmid: int, hostname: str, status: str = "stopped", cores: int = 1, memory: int = 512, disk_gb: int = 8, tags: Optional[str] = None, lock: Optional[str] = None):
+        self.containers[vmid] = {
+            "vmid": vmid, "node": node, "name": hostname, "status": status, "type": "lxc",
+            "cpus": cores, "maxmem": memory * MB, "maxdisk": disk_gb * GB, "tags": tags, "lock": lock,
+        }
+
+    def add_interface(self, node: str, interface: dict, active: bool = False):
+        self.networks[node][interface["iface"]] = {**interface, "active": 1 if active else 0, "pending": not active}
+
+    def node(self, node: str) -> str:
+        if node not in self.nodes:
+            raise PveError(500, f"hostname lookup '{node}' failed - failed to get address info for: {node}")
+        if self.nodes[node] != "online":
+            raise PveError(595, f"no route to host {node}")
+        return node
+
+    def container(self, node: str, vmid: int) -> dict:
+        container = self.containers.get(vmid)
+        if container is None or container["node"] != node:
+            raise PveError(500, f"Configuration file 'nodes/{node}/lxc/{vmid}.conf' does not exist")
+        return container
+
+    def next_vmid(self) -> int:
+        return next(vmid for vmid in itertools.count(FIRST_VMID) if vmid not in self.containers)
+
+    def start_task(self, node: str, task_type: str, task_id, on_success: Optional[Callable[[], None]] = None, on_failure: Optional[Callable[[], None]] = None) -> str:
+        now = time.time()
+        upid = f"UPID:{node}:{next(self._task_ids):08X}:00000000:{int(now):08X}:{task_type}:{task_id}:root@pam:"
+        duration = self.task_durations.match(task_type)
+        self.tasks[upid] = {
+            "upid": upid, "node": node, "type": task_type, "id": str(task_id), "user": "root@pam",
+            "starttime": int(now), "endtime": now + (duration.sample(self.rng) if duration else 0),
+            "status": "running", "exitstatus": None, "on_success": on_success, "on_failure": on_failure,
+        }
+        self._running[upid] = self.tasks[upid]
+        self.refresh()
+        return upid
+
+    def refresh(self):
+        now = time.time()
+        for upid, task in list(self._running.items()):
+            if task["endtime"] > now:
+                continue
+            del self._running[upid]
+            task["status"] = "stopped"
+            if self.rng.random() < self.task_failure_rate:
+                task["exitstatus"] = "simulated task failure"
+                callback = task.pop("on_failure")
+            else:
+                task["exitstatus"] = "OK"
+                callback = task.pop("on_success")
+            task.pop("on_failure", None)
+            task.pop("on_success", None)
+            if callback:
+                callback()
+
+    def task_status(self, task: dict) -> dict:
+        status = {key: task[key] for key in ("upid", "node", "type", "id", "user", "starttime", "status")}
+        if task["status"] == "stopped":
+            status["exitstatus"] = task["exitstatus"]
+            status["endtime"] = int(task["endtime"])
+        return status
+
+    def resources(self, resource_type: Optional[str] = None) -> List[dict]:
+        resources = []
+        if resource_type in (None, "node"):
+            for node, status in self.nodes.items():
+                used_memory = sum(container["maxmem"] for container in self.containers.values() if container["node"] == node and container["status"] == "running")
+                resources.append({
+                    "type": "node", "id": f"node/{node}", "node": node, "status": status,
+                    "maxcpu": self.node_cpus, "cpu": self.rng.uniform(0.05, 0.6) if status == "online" else 0,
+                    "maxmem": self.node_memory, "mem": min(used_memory, self.node_memory),
+                    "maxdisk": self.node_storage, "disk": 0, "uptime": 86400 if status == "online" else 0,
+                })
+        if resource_type in (None, "vm"):
+            for vmid, container in sorted(self.containers.items()):
+                resources.append({
+                    "type": "lxc", "id": f"lxc/{vmid}", "vmid": vmid, "node": container["node"], "name": container["name"],
+                    "status": container["status"], "maxcpu": container["cpus"], "maxmem": container["maxmem"],
+                    "maxdisk": container["maxdisk"], "tags": container["tags"],
+                    "mem": container["maxmem"] // 4 if container["status"] == "running" else 0,
+                })
+        if resource_type in (None, "storage"):
+            for node, status in self.nodes.items():
+                used = sum(container["maxdisk"] for container in self.containers.values() if container["node"] == node)
+                resources.append({
+                    "type": "storage", "id": f"storage/{node}/local-lvm", "node": node, "storage": "local-lvm",
+                    "status": "available" if status == "online" else "unknown", "maxdisk": self.node_storage, "disk": min(used, self.node_storage),
+                })
+        return resources
+
+
+def data(value, status_code: int = 200) -> JSONResponse:
+    return JSONResponse(content={"data": value}, status_code=status_code)
+
+
+def create_app(pve: FakeProxmox) -> FastAPI:
+    app = FastAPI(title="Fake Proxmox VE", docs_url=None, redoc_url=None, openapi_url=None)
+
+    @app.middleware("http")
+    async def simulate(request: Request, call_next):
+        key = f"{request.method} {request.url.path.removeprefix(API_PREFIX).strip('/')}"
+        latency = pve.latency.match(key)
+        if latency:
+            await asyncio.sleep(latency.sample(pve.rng))
+        error = pve.errors.match(key)
+        if error and pve.rng.random() < error[0]:
+            return JSONResponse(content={"data": None, "message": "simulated error"}, status_code=error[1])
+        pve.refresh()
+        return await call_next(request)
+
+    @app.exception_handler(PveError)
+    async def pve_error(request: Request, e: PveError):
+        content = {"data": None, "message": e.message}
+        if e.errors:
+            content["errors"] = e.errors
+        return JSONResponse(content=content, status_code=e.status_code)
+
+    @app.get(f"{API_PREFIX}/version")
+    async def version():
+        return data({"version": "8.2.4", "release": "8.2", "repoid": "fake"})
+
+    @app.get(f"{API_PREFIX}/cluster/resources")
+    async def cluster_resources(type: Optional[str] = None):
+        return data(pve.resources(type))
+
+    @app.get(f"{API_PREFIX}/cluster/config/nodes")
+    async def cluster_nodes():
+        return data([{"node": node, "name": node, "nodeid": str(index), "quorum_votes": "1", "ring0_addr": f"10.0.0.{index}"} for index, node in enumerate(pve.nodes, start=1)])
+
+    @app.get(f"{API_PREFIX}/cluster/nextid")
+    async def cluster_nextid():
+        return data(str(pve.next_vmid()))
+
+    @app.get(f"{API_PREFIX}/nodes")
+    async def list_nodes():
+        return data([{"node": node, "status": status, "maxcpu": pve.node_cpus, "maxmem": pve.node_memory} for node, status in pve.nodes.items()])
+
+    @app.get(f"{API_PREFIX}/nodes/{{node}}/status")
+    async def node_status(node: str):
+        pve.node(node)
+        return data({"uptime": 86400, "cpuinfo": {"cpus": pve.node_cpus}, "memory": {"total": pve.node_memory}})
+
+    @app.get(f"{API_PREFIX}/nodes/{{node}}/lxc")
+    async def list_lxc(node: str):
+        pve.node(node)
+        return data([
+            {key: value for key, value in container.items() if key != "node" and value is not None}
+            for container in pve.containers.values()
+            if container["node"] == node
+        ])
+
+    @app.post(f"{API_PREFIX}/nodes/{{node}}/lxc")
+    async def create_lxc(
+        node: str,
+        vmid: int = Form(...),
+        hostname: str = Form(...),
+        ostemplate: str = Form(...),
+        cores: int = Form(1),
+        memory: int = Form(512),
+        rootfs: Optional[str] = Form(None),
+        tags: Optional[str] = Form(None),
+    ):
+        pve.node(node)
+        if vmid in pve.containers:
+            raise PveError(500, f"CT {vmid} already exists on node '{pve.containers[vmid]['node']}'")
+        disk_gb = int(rootfs.rsplit(":", 1)[-1]) if rootfs and rootfs.rsplit(":", 1)[-1].isdigit() else 8
+        pve.add_container(node, vmid, hostname, cores=cores, memory=memory, disk_gb=disk_gb, tags=tags, lock="create")
+
+        def created():
+            pve.containers[vmid]["lock"] = None
+
+        return data(pve.start_task(node, "vzcreate", vmid, created, lambda: pve.containers.pop(vmid, None)))
+
+    @app.get(f"{API_PREFIX}/nodes/{{node}}/lxc/{{vmid}}/config")
+    async def lxc_config(node: str, vmid: int):
+        container = pve.container(pve.node(node), vmid)
+        config = {
+            "hostname": container["name"], "arch": "amd64", "ostype": "debian", "cores": container["cpus"],
+            "memory": container["maxmem"] // MB, "swap": 0, "rootfs": f"local-lvm:vm-{vmid}-disk-0,size={container['maxdisk'] // GB}G",
+            "net0": f"name=eth0,bridge=vmbr0,gw=10.0.0.1,hwaddr=BC:24:11:00:{vmid // 256 % 256:02X}:{vmid % 256:02X},ip=10.0.{vmid // 256 % 256}.{vmid % 256}/16,type=veth",
+            "digest": f"{vmid:040x}",
+        }
+        if container["tags"]:
+            config["tags"] = container["tags"]
+        if container["lock"]:
+            config["lock"] = container["lock"]
+        return data(config)
+
+    @app.get(f"{API_PREFIX}/nodes/{{node}}/lxc/{{vmid}}/status/current")
+    async def lxc_status(node: str, vmid: int):
+        container = pve.container(pve.node(node), vmid)
+        return data({key: value for key, value in container.items() if value is not None})
+
+    @app.post(f"{API_PREFIX}/nodes/{{node}}/lxc/{{vmid}}/status/{{action}}")
+    async def change_lxc_status(node: str, vmid: int, action: str):
+        container = pve.container(pve.node(node), vmid)
+        statuses = {"start": "running", "stop": "stopped", "shutdown": "stopped", "reboot": "running"}
+        if action not in statuses:
+            raise PveError(501, f"Method 'POST /nodes/{node}/lxc/{vmid}/status/{action}' not implemented")
+        if container["lock"]:
+            raise PveError(500, f"CT is locked ({container['lock']})")
+        if action == "start" and container["status"] == "running":
+            raise PveError(500, f"CT {vmid} already running")
+
+        def changed():
+            if vmid in pve.containers:
+                pve.containers[vmid]["status"] = statuses[action]
+
+        return data(pve.start_task(node, f"vz{action}", vmid, changed))
+
+    @app.delete(f"{API_PREFIX}/nodes/{{node}}/lxc/{{vmid}}")
+    async def delete_lxc(node: str, vmid: int, force: Optional[int] = None):
+        container = pve.container(pve.node(node), vmid)
+        if container["status"] == "running" and not force:
+            raise PveError(500, f"CT {vmid} is running - destroy failed")
+        container["lock"] = "destroyed"
+
+        def destroy_failed():
+            container["lock"] = None
+
+        return data(pve.start_task(node, "vzdestroy", vmid, lambda: pve.containers.pop(vmid, None), destroy_failed))
+
+    @app.get(f"{API_PREFIX}/nodes/{{node}}/tasks")
+    async def list_tasks(node: str, source: Optional[str] = None, limit: int = 50):
+        pve.node(node)
+        tasks = [task for task in pve.tasks.values() if task["node"] == node]
+        if source == "active":
+            tasks = [task for task in tasks if task["status"] == "running"]
+        return data([pve.task_status(task) for task in tasks[-limit:]])
+
+    @app.get(f"{API_PREFIX}/nodes/{{node}}/tasks/{{upid}}/status")
+    async def task_status(node: str, upid: str):
+        pve.node(node)
+        task = pve.tasks.get(upid)
+        if task is None or task["node"] != node:
+            raise PveError(500, f"no such task '{upid}'")
+        return data(pve.task_status(task))
+
+    @app.get(f"{API_PREFIX}/nodes/{{node}}/network")
+    async def list_network(node: str, type: Optional[str] = None):
+        pve.node(node)
+        return data([
+            {key: value for key, value in interface.items() if key != "pending"}
+            for interface in pve.networks[node].values()
+            if type is None or interface["type"] == type or (type == "any_bridge" and interface["type"] in ("bridge", "OVSBridge"))
+        ])
+
+    @app.get(f"{API_PREFIX}/nodes/{{node}}/network/{{iface}}")
+    async def get_network(node: str, iface: str):
+        pve.node(node)
+        interface = pve.networks[node].get(iface)
+        if interface is None:
+            raise PveError(500, f"interface does not exist: {iface}")
+        return data({key: value for key, value in interface.items() if key != "pending"})
+
+    @app.post(f"{API_PREFIX}/nodes/{{node}}/network")
+    async def create_network(request: Request, node: str):
+        pve.node(node)
+        form = dict(await request.form())
+        iface = form.get("iface")
+        if not iface or not form.get("type"):
+            raise PveError(400, "Parameter verification failed.", {"iface": "property is missing and it is not optional"})
+        if iface in pve.networks[node]:
+            raise PveError(400, "Parameter verification failed.", {"iface": f"interface already exists: {iface}"})
+        interface = {key: value for key, value in form.items() if value != ""}
+        if form["type"] == "vlan" and "." in iface:
+            interface["vlan-id"] = int(iface.rsplit(".", 1)[1])
+        pve.add_interface(node, interface)
+        return data(None)
+
+    @app.put(f"{API_PREFIX}/nodes/{{node}}/network")
+    async def reload_network(node: str):
+        pve.node(node)
+
+        def reloaded():
+            for interface in pve.networks[node].values():
+                if interface["pending"]:
+                    interface["active"] = 1
+                    interface["pending"] = False
+
+        return data(pve.start_task(node, "srvreload", "networking", reloaded))
+
+    @app.delete(f"{API_PREFIX}/nodes/{{node}}/network/{{iface}}")
+    async def delete_network(node: str, iface: str):
+        pve.node(node)
+        if pve.networks[node].pop(iface, None) is None:
+            raise PveError(500, f"interface does not exist: {iface}")
+        return data(None)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a simulated Proxmox VE API")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8006, help="Port to listen on, served over plain HTTP")
+    parser.add_argument("--nodes", type=int, default=3, help="Number of nodes of the cluster, named node01, node02...")
+    parser.add_argument("--containers", type=int, default=10, help="Number of LXC containers per node")
+    parser.add_argument("--offline", action="append", default=[], help="Node that is offline, can be repeated")
+    parser.add_argument("--latency", action="append", default=[], help="Latency of the matching requests, e.g. 'GET cluster/resources=lognormal:20:0.5' or '*=uniform:5:15' (ms), can be repeated, first match wins")
+    parser.add_argument("--error", action="append", default=[], help="Error rate and status of the matching requests, e.g. 'POST nodes/*/lxc=0.05:500', can be repeated, first match wins")
+    parser.add_argument("--task-duration", action="append", default=[], help="Duration of the matching tasks by type, e.g. 'vzcreate=uniform:2000:5000' (ms), can be repeated, first match wins")
+    parser.add_argument("--task-failure-rate", type=float, default=0, help="Share of tasks that stop with an error")
+    parser.add_argument("--seed", type=int, help="Random seed, for repeatable latencies and failures")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    pve = FakeProxmox(
+        nodes=args.nodes,
+        containers_per_node=args.containers,
+        latency=args.latency,
+        errors=args.error,
+        task_durations=args.task_duration,
+        task_failure_rate=args.task_failure_rate,
+        offline_nodes=args.offline,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(pve), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+import httpx
+import uvicorn
+from benchmarks.fake_pve import FakeProxmox, create_app
+
+API_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+SCENARIOS = [
+    ("pve_nodes", "/proxmox/nodes"),
+    ("network_devices", "/proxmox/node01/network"),
+    ("network_devices", "/proxmox/node01/network/bridge"),
+    ("network_devices", "/proxmox/network?region_id=1"),
+    ("lxc_containers", "/proxmox/lxc"),
+    ("lxc_containers", "/proxmox/node01/lxc"),
+    ("lxc_containers", "/proxmox/node01/lxc/100"),
+    ("pve_tasks", "/proxmox/tasks/{task_id}"),
+    ("project", "/core/project"),
+    ("project", "/core/project/1"),
+    ("region", "/core/region"),
+    ("service", "/core/service"),
+    ("service", "/core/service?id=1"),
+    ("ssh_key", "/core/ssh_keys?project_id=1"),
+    ("server_offer", "/business/server-offer"),
+    ("server_offer", "/business/server-offer/1"),
+    ("server_image", "/server/image"),
+    ("server_image", "/server/image/1"),
+    ("prox_node", "/server/nodes"),
+    ("prox_node", "/server/nodes/1/lxc"),
+    ("server_provision", "/server/placement?region_id=1&server_offer_id=1&count=5"),
+    ("prox_vlan", "/networking/vlans"),
+    ("metrics", "/metrics"),
+]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve_in_thread(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def configure_database(database: str):
+    from sqlalchemy import create_engine
+    from sqlalchemy.ext.asyncio import create_async_engine
+    import db.config as db_config
+    from utils.instrumentation import instrument_engine
+
+    if database == "sqlite":
+        path = Path(tempfile.mkdtemp(prefix="puyu-bench-")) / "bench.db"
+        db_config.engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+        db_config.async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        db_config.SessionLocal.configure(bind=db_config.engine)
+        db_config.AsyncSessionLocal.configure(bind=db_config.async_engine)
+        instrument_engine(db_config.engine)
+        instrument_engine(db_config.async_engine.sync_engine)
+    else:
+        db_config.init_engines()
+    db_config.Base.metadata.drop_all(db_config.engine)
+    db_config.Base.metadata.create_all(db_config.engine)
+    return db_config
+
+
+def percentile(quantiles, value: int) -> float:
+    return round(quantiles[value - 1], 2)
+
+
+async def run_scenario(client: httpx.AsyncClient, path: str, requests: int, concurrency: int, warmup: int):
+    for _ in range(warmup):
+        await client.get(path)
+    latencies = []
+    errors = 0
+    pending = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in pending:
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "p50": percentile(quantiles, 50),
+        "p95": percentile(quantiles, 95),
+        "p99": percentile(quantiles, 99),
+        "rps": round(requests / elapsed, 1),
+        "errors": errors,
+    }
+
+
+async def run_benchmarks(base_url: str, args) -> dict:
+    results = {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=httpx.Limits(max_connections=args.concurrency)) as client:
+        task = (await client.post("/proxmox/node01/lxc/100", params={"lxc_status": "stop"})).json()
+        for router, path in SCENARIOS:
+            path = path.format(task_id=task["id"])
+            if args.only and args.only not in path and args.only != router:
+                continue
+            results[path] = {"router": router, **await run_scenario(client, path, args.requests, args.concurrency, args.warmup)}
+            print(format_row(path, results[path]), flush=True)
+    return results
+
+
+def format_row(path: str, result: dict, baseline: dict = None) -> str:
+    row = f"{path:<60} p50 {result['p50']:>8.2f}  p95 {result['p95']:>8.2f}  p99 {result['p99']:>8.2f}  rps {result['rps']:>8.1f}  errors {result['errors']}"
+    if baseline:
+        p95 = (result["p95"] - baseline["p95"]) / baseline["p95"] * 100 if baseline["p95"] else 0
+        rps = (result["rps"] - baseline["rps"]) / baseline["rps"] * 100 if baseline["rps"] else 0
+        row += f"  | p95 {p95:+.1f}%  rps {rps:+.1f}%"
+    return row
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=API_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the latency and throughput of the API endpoints against a fake Proxmox cluster")
+    parser.add_argument("--database", default="sqlite", help="'sqlite' for a temporary SQLite database, or a Postgres connection string (user:password@host/db). The database is wiped and seeded")
+    parser.add_argument("--regions", type=int, default=3, help="Number of regions to seed")
+    parser.add_argument("--services", type=int, default=5, help="Number of services to seed")
+    parser.add_argument("--images", type=int, default=20, help="Number of server images to seed")
+    parser.add_argument("--offers", type=int, default=20, help="Number of server offers to seed")
+    parser.add_argument("--projects", type=int, default=20, help="Number of projects to seed")
+    parser.add_argument("--nodes", type=int, default=6, help="Number of Proxmox nodes of the fake cluster")
+    parser.add_argument("--containers", type=int, default=20, help="Number of LXC containers per node of the fake cluster")
+    parser.add_argument("--pve-latency", type=float, default=10, help="Mean latency in ms of the fake Proxmox API, spread uniformly by 50%% around it")
+    parser.add_argument("--pve-error", action="append", default=[], help="Error rate and status of the matching fake Proxmox requests, e.g. 'GET nodes/*/network=0.01:500', can be repeated")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the fake Proxmox latencies and errors")
+    parser.add_argument("--requests", type=int, default=200, help="Number of measured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10, help="Number of concurrent requests")
+    parser.add_argument("--warmup", type=int, default=20, help="Number of unmeasured requests per endpoint")
+    parser.add_argument("--only", help="Only run the endpoints of this router, or whose path contains this text")
+    parser.add_argument("--save", help="Save the results as benchmarks/results/<name>.json")
+    parser.add_argument("--compare", help="Compare the results with benchmarks/results/<name>.json")
+    parser.add_argument("--log-level", default="WARNING", help="Log level of the API")
+    args = parser.parse_args()
+
+    pve = FakeProxmox(
+        nodes=args.nodes,
+        containers_per_node=args.containers,
+        latency=[f"*=uniform:{args.pve_latency * 0.5}:{args.pve_latency * 1.5}"],
+        errors=args.pve_error,
+        seed=args.seed,
+    )
+    pve_port = free_port()
+    pve_server = serve_in_thread(create_app(pve), pve_port)
+    os.environ.update({
+        "PVE_HOST": f"http://127.0.0.1:{pve_port}",
+        "PVE_USER": "bench@pve",
+        "PVE_TOKEN_NAME": "bench",
+        "PVE_TOKEN_VALUE": "bench",
+        "LOG_LEVEL": args.log_level,
+    })
+    if args.database != "sqlite":
+        os.environ["DATABASE_CONNECTION_STRING"] = args.database
+
+    from benchmarks.seed import seed
+
+    db_config = configure_database(args.database)
+    with db_config.SessionLocal() as db:
+        seed(db, list(pve.nodes), args.regions, args.services, args.images, args.offers, args.projects)
+
+    from app import app
+
+    api_port = free_port()
+    api_server = serve_in_thread(app, api_port)
+    try:
+        results = asyncio.run(run_benchmarks(f"http://127.0.0.1:{api_port}", args))
+    finally:
+        api_server.should_exit = True
+        pve_server.should_exit = True
+
+    if args.compare:
+        baseline = json.loads((RESULTS_DIR / f"{args.compare}.json").read_text())
+        print(f"\nCompared with {args.compare} (commit {baseline['commit']}):")
+        for path, result in results.items():
+            print(format_row(path, result, baseline["results"].get(path)))
+    if args.save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        output = RESULTS_DIR / f"{args.save}.json"
+        output.write_text(json.dumps({"commit": git_commit(), "created_at": time.time(), "args": vars(args), "results": results}, indent=2))
+        print(f"\nSaved results to {output}")
+
+
+if __name__ == "__main__":
+    main()
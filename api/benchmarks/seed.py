@@ -0,0 +1,54 @@
+from typing import List
+from sqlalchemy.orm import Session
+from models import ProjectModel, SshKeyModel, RegionModel, ServiceModel, RegionServiceModel, ServerOfferModel, ServerImageModel, RegionImageModel, ProxNodeModel, ProxVlanModel
+
+
+def seed(
+    db: Session,
+    node_names: List[str],
+    regions: int,
+    services: int,
+    images: int,
+    offers: int,
+    projects: int,
+    vlans_per_node: int = 2,
+    ssh_keys_per_project: int = 2,
+):
+    region_rows = [RegionModel(name=f"region-{index}", logo="region.svg", available=True) for index in range(regions)]
+    service_rows = [ServiceModel(name=f"service-{index}", description=f"Service {index}", available=True) for index in range(services)]
+    project_rows = [ProjectModel(name=f"project-{index}") for index in range(projects)]
+    db.add_all(region_rows + service_rows + project_rows)
+    db.flush()
+
+    db.add_all(RegionServiceModel(region_id=region.id, service_id=service.id) for region in region_rows for service in service_rows)
+    image_rows = [
+        ServerImageModel(
+            name=f"image-{index}",
+            version="1.0",
+            source=f"local:vztmpl/image-{index}.tar.zst",
+            logo="image.svg",
+            available=True,
+            service_id=service_rows[index % services].id,
+        )
+        for index in range(images)
+    ]
+    db.add_all(image_rows)
+    db.add_all(
+        ServerOfferModel(price=5.0 * (1 + index % 8), currency="EUR", cpu=1 + index % 8, memory=1024 * (1 + index % 8), storage=10 * (1 + index % 8), service_id=service_rows[index % services].id)
+        for index in range(offers)
+    )
+    node_rows = [
+        ProxNodeModel(name=name, private_network_interface="vmbr1", public_network_interface="vmbr0", region_id=region_rows[index % regions].id)
+        for index, name in enumerate(node_names)
+    ]
+    db.add_all(node_rows)
+    db.flush()
+
+    db.add_all(RegionImageModel(region_id=region.id, image_id=image.id) for region in region_rows for image in image_rows)
+    db.add_all(ProxVlanModel(name=f"vlan{100 + index}", prox_node_id=node.id) for node in node_rows for index in range(vlans_per_node))
+    db.add_all(
+        SshKeyModel(name=f"key-{index}", public_key=f"ssh-ed25519 AAAA{project.id:08d}{index:04d} bench", project_id=project.id)
+        for project in project_rows
+        for index in range(ssh_keys_per_project)
+    )
+    db.commit()
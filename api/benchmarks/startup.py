@@ -0,0 +1,32 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parent.parent
+
+
+def measure(statement: str, runs: int):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], cwd=API_DIR, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the cold start time of the API")
+    parser.add_argument("--runs", type=int, default=10, help="Number of cold starts to measure")
+    args = parser.parse_args()
+    baseline = measure("pass", args.runs)
+    startup = measure("import app", args.runs)
+    print(f"interpreter: median {statistics.median(baseline):.1f} ms")
+    print(f"import app:  median {statistics.median(startup):.1f} ms, max {max(startup):.1f} ms")
+    print(f"app cost:    {statistics.median(startup) - statistics.median(baseline):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
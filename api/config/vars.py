@@ -8,6 +8,50 @@ env = {
     "PVE_TOKEN_NAME": os.environ.get("PVE_TOKEN_NAME"),
     "PVE_TOKEN_VALUE": os.environ.get("PVE_TOKEN_VALUE"),
     "PVE_NODE": os.environ.get("PVE_NODE"),
+    "PVE_NODE_HOSTS": os.environ.get("PVE_NODE_HOSTS"),
+    "PVE_CLUSTERS": os.environ.get("PVE_CLUSTERS"),
+    "PVE_DEFAULT_CLUSTER": os.environ.get("PVE_DEFAULT_CLUSTER"),
+    "PVE_CONNECT_TIMEOUT": os.environ.get("PVE_CONNECT_TIMEOUT", "5"),
+    "PVE_READ_TIMEOUT": os.environ.get("PVE_READ_TIMEOUT", "60"),
+    "PVE_RETRIES": os.environ.get("PVE_RETRIES", "2"),
+    "PVE_RETRY_BACKOFF": os.environ.get("PVE_RETRY_BACKOFF", "0.2"),
+    "PVE_BREAKER_FAILURE_THRESHOLD": os.environ.get("PVE_BREAKER_FAILURE_THRESHOLD", "5"),
+    "PVE_BREAKER_RESET_TIMEOUT": os.environ.get("PVE_BREAKER_RESET_TIMEOUT", "30"),
+    "PVE_CACHE_BACKEND": os.environ.get("PVE_CACHE_BACKEND", "memory"),
+    "PVE_CACHE_TTL": os.environ.get("PVE_CACHE_TTL", "5"),
+    "PVE_CACHE_STALE_TTL": os.environ.get("PVE_CACHE_STALE_TTL", "30"),
+    "PVE_CACHE_MAX_ENTRIES": os.environ.get("PVE_CACHE_MAX_ENTRIES", "1024"),
+    "PVE_CACHE_REDIS_URL": os.environ.get("PVE_CACHE_REDIS_URL"),
+    "PVE_TASK_POLL_MIN_INTERVAL": os.environ.get("PVE_TASK_POLL_MIN_INTERVAL", "0.5"),
+    "PVE_TASK_POLL_MAX_INTERVAL": os.environ.get("PVE_TASK_POLL_MAX_INTERVAL", "5"),
+    "PVE_TASK_RETENTION": os.environ.get("PVE_TASK_RETENTION", "3600"),
+    "PVE_TASK_MAX_POLL_ERRORS": os.environ.get("PVE_TASK_MAX_POLL_ERRORS", "10"),
+    "PVE_BATCH_NODE_CONCURRENCY": os.environ.get("PVE_BATCH_NODE_CONCURRENCY", "4"),
+    "PVE_BATCH_RATE_LIMIT": os.environ.get("PVE_BATCH_RATE_LIMIT", "20"),
+    "PVE_NETWORK_RELOAD_WINDOW": os.environ.get("PVE_NETWORK_RELOAD_WINDOW", "0"),
+    "PVE_NETWORK_QUERY_CONCURRENCY": os.environ.get("PVE_NETWORK_QUERY_CONCURRENCY", "8"),
+    "PVE_PROVISION_CONCURRENCY": os.environ.get("PVE_PROVISION_CONCURRENCY", "8"),
+    "PVE_VMID_RESERVATION_TTL": os.environ.get("PVE_VMID_RESERVATION_TTL", "600"),
+    "PVE_PLACEMENT_REFRESH_INTERVAL": os.environ.get("PVE_PLACEMENT_REFRESH_INTERVAL", "30"),
+    "PVE_PLACEMENT_STORAGE": os.environ.get("PVE_PLACEMENT_STORAGE", "local-lvm"),
+    "PVE_PLACEMENT_CPU_OVERCOMMIT": os.environ.get("PVE_PLACEMENT_CPU_OVERCOMMIT", "4"),
+    "PVE_INVENTORY_SYNC_INTERVAL": os.environ.get("PVE_INVENTORY_SYNC_INTERVAL", "15"),
+    "PVE_EVENTS_POLL_INTERVAL": os.environ.get("PVE_EVENTS_POLL_INTERVAL", "2"),
+    "PVE_EVENTS_MAX_QUEUE": os.environ.get("PVE_EVENTS_MAX_QUEUE", "1000"),
+    "SSE_KEEPALIVE_INTERVAL": os.environ.get("SSE_KEEPALIVE_INTERVAL", "15"),
     # Database
-    "DATABASE_CONNECTION_STRING": os.environ.get("DATABASE_CONNECTION_STRING")
+    "DATABASE_CONNECTION_STRING": os.environ.get("DATABASE_CONNECTION_STRING"),
+    "DATABASE_POOL_SIZE": os.environ.get("DATABASE_POOL_SIZE", "5"),
+    "DATABASE_MAX_OVERFLOW": os.environ.get("DATABASE_MAX_OVERFLOW", "10"),
+    "DATABASE_POOL_TIMEOUT": os.environ.get("DATABASE_POOL_TIMEOUT", "30"),
+    "DATABASE_POOL_RECYCLE": os.environ.get("DATABASE_POOL_RECYCLE", "1800"),
+    "DATABASE_POOL_PRE_PING": os.environ.get("DATABASE_POOL_PRE_PING", "true"),
+    "DATABASE_STATEMENT_TIMEOUT": os.environ.get("DATABASE_STATEMENT_TIMEOUT", "0"),
+    # Monitoring
+    "SERVER_TIMING_ENABLED": os.environ.get("SERVER_TIMING_ENABLED", "true"),
+    # Logging
+    "LOG_LEVEL": os.environ.get("LOG_LEVEL", "INFO"),
+    "LOG_FORMAT": os.environ.get("LOG_FORMAT", "json"),
+    "LOG_ROUTE_LEVELS": os.environ.get("LOG_ROUTE_LEVELS"),
+    "LOG_ROUTE_SAMPLE_RATES": os.environ.get("LOG_ROUTE_SAMPLE_RATES"),
 }
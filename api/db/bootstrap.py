@@ -0,0 +1,35 @@
+from sqlalchemy import inspect, text
+from db.config import Base, init_engines
+from utils.logs import logger
+import models
+
+UNIQUE_ASSOCIATIONS = [
+    (models.RegionServiceModel.__tablename__, ("region_id", "service_id")),
+    (models.RegionImageModel.__tablename__, ("region_id", "image_id")),
+]
+
+
+def add_unique_associations(engine):
+    inspector = inspect(engine)
+    for table, columns in UNIQUE_ASSOCIATIONS:
+        existing = [constraint["column_names"] for constraint in inspector.get_unique_constraints(table)]
+        existing += [index["column_names"] for index in inspector.get_indexes(table) if index["unique"]]
+        if any(sorted(column_names) == sorted(columns) for column_names in existing):
+            continue
+        column_list = ", ".join(columns)
+        with engine.begin() as connection:
+            deleted = connection.execute(text(
+                f"DELETE FROM {table} WHERE id NOT IN (SELECT MIN(id) FROM {table} GROUP BY {column_list})"
+            )).rowcount
+            connection.execute(text(f"CREATE UNIQUE INDEX {table}_{'_'.join(columns)}_key ON {table} ({column_list})"))
+        logger.info(f"Added unique index on {table} ({column_list}), removed {deleted} duplicate rows")
+
+
+def bootstrap():
+    engine = init_engines(with_async=False)
+    Base.metadata.create_all(engine)
+    add_unique_associations(engine)
+
+
+if __name__ == "__main__":
+    bootstrap()
@@ -1,13 +1,61 @@
-import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from config.vars import env
+from db.pool import InstrumentedQueuePool, InstrumentedAsyncQueuePool
+from utils.instrumentation import instrument_engine
+from utils.metrics import instrument_pool
 
 
-database_connection_string = env["DATABASE_CONNECTION_STRING"]
-
-engine = create_engine(f'postgresql+psycopg2://{database_connection_string}')
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = None
+async_engine = None
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
+
+
+def init_engines(with_async: bool = True):
+    global engine, async_engine
+    database_connection_string = env["DATABASE_CONNECTION_STRING"]
+    pool_options = {
+        "pool_size": int(env["DATABASE_POOL_SIZE"]),
+        "max_overflow": int(env["DATABASE_MAX_OVERFLOW"]),
+        "pool_timeout": float(env["DATABASE_POOL_TIMEOUT"]),
+        "pool_recycle": int(env["DATABASE_POOL_RECYCLE"]),
+        "pool_pre_ping": env["DATABASE_POOL_PRE_PING"].lower() == "true",
+    }
+    if engine is None:
+        engine = create_engine(
+            f'postgresql+psycopg2://{database_connection_string}',
+            poolclass=InstrumentedQueuePool,
+            connect_args={"options": f"-c statement_timeout={env['DATABASE_STATEMENT_TIMEOUT']}"},
+            **pool_options,
+        )
+        instrument_pool(engine.pool, "sync")
+        instrument_engine(engine)
+        SessionLocal.configure(bind=engine)
+    if with_async and async_engine is None:
+        async_engine = create_async_engine(
+            f'postgresql+asyncpg://{database_connection_string}',
+            poolclass=InstrumentedAsyncQueuePool,
+            connect_args={"server_settings": {"statement_timeout": env["DATABASE_STATEMENT_TIMEOUT"]}},
+            **pool_options,
+        )
+        instrument_pool(async_engine.pool, "async")
+        instrument_engine(async_engine.sync_engine)
+        AsyncSessionLocal.configure(bind=async_engine)
+    return engine
+
+
+async def dispose_engines():
+    global engine, async_engine
+    if async_engine is not None:
+        await async_engine.dispose()
+    if engine is not None:
+        engine.dispose()
+    engine = None
+    async_engine = None
+    SessionLocal.configure(bind=None)
+    AsyncSessionLocal.configure(bind=None)
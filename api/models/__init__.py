@@ -1,5 +1,3 @@
-from db.config import Base, engine
-
 # Auth Models
 from .auth.user_project import UserProjectModel
 from .auth.ssh_key import SshKeyModel
@@ -10,6 +8,7 @@ from .core.project import ProjectModel
 from .core.region import RegionModel
 from .core.service import ServiceModel
 from .core.region_service import RegionServiceModel
+from .core.table_version import TableVersionModel
 
 # Business Models
 from .business.server_offer import ServerOfferModel
@@ -18,8 +17,7 @@ from .business.server_offer import ServerOfferModel
 from .servers.image import ServerImageModel
 from .servers.region_image import RegionImageModel
 from .servers.node import ProxNodeModel
+from .servers.container import ProxContainerModel
 
 # Networking Models
 from .networking.vlan import ProxVlanModel
-
-Base.metadata.create_all(engine)
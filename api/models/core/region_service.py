@@ -1,10 +1,11 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from db.config import Base
 
 
 class RegionServiceModel(Base):
     __tablename__ = 'region_service'
+    __table_args__ = (UniqueConstraint('region_id', 'service_id'),)
     id = Column(Integer, primary_key=True)
     region_id = Column(Integer, ForeignKey('regions.id'), nullable=False)
     service_id = Column(Integer, ForeignKey('services.id'), nullable=False)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, BigInteger
+from db.config import Base
+
+
+class TableVersionModel(Base):
+    __tablename__ = 'table_versions'
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "version": self.version,
+        }
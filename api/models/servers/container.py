@@ -0,0 +1,33 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Float, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from db.config import Base
+from utils.size_changes import bytes_to_gb
+
+
+class ProxContainerModel(Base):
+    __tablename__ = 'prox_containers'
+    __table_args__ = (UniqueConstraint('prox_node_id', 'vmid'),)
+    id = Column(Integer, primary_key=True)
+    vmid = Column(Integer, nullable=False, index=True)
+    name = Column(String, nullable=False)
+    type = Column(String, nullable=False)
+    status = Column(String, nullable=False)
+    cpus = Column(Integer, nullable=False)
+    maxmem = Column(BigInteger, nullable=False)
+    maxdisk = Column(BigInteger, nullable=False)
+    tags = Column(String, nullable=True)
+    synced_at = Column(Float, nullable=False)
+    prox_node_id = Column(Integer, ForeignKey('prox_nodes.id'), nullable=False)
+
+    prox_node = relationship('ProxNodeModel', back_populates='prox_containers')
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "vmid": self.vmid,
+            "type": self.type,
+            "status": self.status,
+            "cpus": self.cpus,
+            "maxmem_gb": bytes_to_gb(self.maxmem),
+            "maxdisk_gb": bytes_to_gb(self.maxdisk),
+        }
@@ -13,6 +13,7 @@ class ProxNodeModel(Base):
 
     region = relationship('RegionModel', back_populates='prox_nodes')
     prox_vlans = relationship('ProxVlanModel', back_populates='prox_node')
+    prox_containers = relationship('ProxContainerModel', back_populates='prox_node', cascade='all, delete-orphan')
 
     def to_dict(self):
         return {
@@ -1,10 +1,11 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from db.config import Base
 
 
 class RegionImageModel(Base):
     __tablename__ = 'region_image'
+    __table_args__ = (UniqueConstraint('region_id', 'image_id'),)
     id = Column(Integer, primary_key=True)
     region_id = Column(Integer, ForeignKey('regions.id'), nullable=False)
     image_id = Column(Integer, ForeignKey('server_images.id'), nullable=False)
@@ -0,0 +1,52 @@
+import time
+from utils.metrics import PVE_CIRCUIT_STATE, PVE_CIRCUIT_TRIPS
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    def __init__(self, scope: str, failure_threshold: int, reset_timeout: float):
+        self.scope = scope
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_started_at = None
+        self._set_state(CLOSED)
+
+    def _set_state(self, state: str):
+        self.state = state
+        PVE_CIRCUIT_STATE.labels(self.scope).set(STATE_VALUES[state])
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == OPEN and now - self._opened_at >= self._reset_timeout:
+            self._set_state(HALF_OPEN)
+            self._trial_started_at = None
+        if self.state == HALF_OPEN and (
+            self._trial_started_at is None or now - self._trial_started_at >= self._reset_timeout
+        ):
+            self._trial_started_at = now
+            return True
+        return False
+
+    def record_success(self):
+        self._failures = 0
+        self._trial_started_at = None
+        if self.state != CLOSED:
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        self._failures += 1
+        self._trial_started_at = None
+        if self.state == HALF_OPEN or self._failures >= self._failure_threshold:
+            if self.state != OPEN:
+                PVE_CIRCUIT_TRIPS.labels(self.scope).inc()
+            self._opened_at = time.monotonic()
+            self._set_state(OPEN)
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from utils.logs import logger
+from utils.instrumentation import create_detached_task
+
+
+# Cached payloads are shared between callers (the memory backend returns the stored object itself, and
+# get_cluster_resources relies on that identity), so they are read-only: build new dicts and lists instead
+# of mutating them.
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, stored_at: float, expire: float):
+        pass
+
+    @abstractmethod
+    async def delete_prefix(self, prefix: str):
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    def __init__(self, max_entries: int = 1024):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Any, float, float]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, stored_at, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value, stored_at
+
+    async def set(self, key: str, value: Any, stored_at: float, expire: float):
+        self._entries[key] = (value, stored_at, stored_at + expire)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete_prefix(self, prefix: str):
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            del self._entries[key]
+
+
+class RedisCacheBackend(CacheBackend):
+    def __init__(self, url: str, namespace: str = "puyu:pve:"):
+        import redis.asyncio as redis
+        self._redis = redis.from_url(url)
+        self._namespace = namespace
+
+    async def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        raw = await self._redis.get(self._namespace + key)
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return entry["value"], entry["stored_at"]
+
+    async def set(self, key: str, value: Any, stored_at: float, expire: float):
+        raw = json.dumps({"value": value, "stored_at": stored_at})
+        await self._redis.set(self._namespace + key, raw, px=max(int(expire * 1000), 1))
+
+    async def delete_prefix(self, prefix: str):
+        keys = [key async for key in self._redis.scan_iter(match=f"{self._namespace}{prefix}*")]
+        if keys:
+            await self._redis.delete(*keys)
+
+
+class ProxmoxCache:
+    def __init__(self, backend: CacheBackend, ttl: float, stale_ttl: float):
+        self._backend = backend
+        self._ttl = ttl
+        self._stale_ttl = stale_ttl
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._generations: Dict[str, int] = {}
+
+    @staticmethod
+    def key(scope: str, path: str, params: Dict[str, Any]) -> str:
+        return f"{scope}|{path}|{json.dumps(params, sort_keys=True, default=str)}"
+
+    async def fetch(self, scope: str, path: str, params: Dict[str, Any], loader: Callable[[], Awaitable[Any]]):
+        key = self.key(scope, path, params)
+        entry = await self._backend.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.time() - stored_at
+            if age < self._ttl:
+                return value
+            if age < self._ttl + self._stale_ttl:
+                if key not in self._inflight:
+                    logger.debug(f"Refreshing stale cache entry {key}")
+                    self._load(scope, key, loader).add_done_callback(self._log_refresh_error)
+                return value
+        return await asyncio.shield(self._load(scope, key, loader))
+
+    async def invalidate(self, scope: str):
+        self._generations[scope] = self._generations.get(scope, 0) + 1
+        await self._backend.delete_prefix(f"{scope}|")
+
+    def _load(self, scope: str, key: str, loader: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        future = self._inflight.get(key)
+        if future is None:
+            future = create_detached_task(self._fill(scope, key, loader, self._generations.get(scope, 0)))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return future
+
+    async def _fill(self, scope: str, key: str, loader: Callable[[], Awaitable[Any]], generation: int):
+        value = await loader()
+        if self._generations.get(scope, 0) == generation:
+            await self._backend.set(key, value, time.time(), self._ttl + self._stale_ttl)
+        return value
+
+    @staticmethod
+    def _log_refresh_error(future: asyncio.Future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(f"Error refreshing stale cache entry: {future.exception()}")
+
+
+def build_cache(
+    backend: Optional[str],
+    ttl: float,
+    stale_ttl: float,
+    max_entries: int,
+    redis_url: Optional[str],
+    namespace: str = "puyu:pve:",
+) -> Optional[ProxmoxCache]:
+    match backend:
+        case "memory":
+            return ProxmoxCache(MemoryCacheBackend(max_entries), ttl, stale_ttl)
+        case "redis":
+            return ProxmoxCache(RedisCacheBackend(redis_url, namespace), ttl, stale_ttl)
+        case "none" | None | "":
+            return None
+        case _:
+            raise ValueError(f"Invalid Proxmox cache backend: {backend}")
@@ -0,0 +1,221 @@
+import asyncio
+import random
+import time
+from typing import Any, Dict, Optional
+import httpx
+from fastapi import status
+from .breaker import CircuitBreaker
+from .cache import ProxmoxCache
+from utils.instrumentation import record_pve_call
+from utils.logs import logger
+from utils.metrics import PVE_REQUEST_RETRIES
+
+RETRY_STATUS_CODES = {502, 503, 504, 595}
+
+
+class ProxmoxError(Exception):
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"{status_code} {message}")
+        self.status_code = status_code
+        self.message = message
+
+
+class CircuitOpenError(ProxmoxError):
+    def __init__(self, scope: str):
+        super().__init__(status.HTTP_503_SERVICE_UNAVAILABLE, f"Circuit open for {scope}, failing fast")
+        self.scope = scope
+
+
+def error_status(error: Exception) -> int:
+    if isinstance(error, CircuitOpenError):
+        return status.HTTP_503_SERVICE_UNAVAILABLE
+    return status.HTTP_500_INTERNAL_SERVER_ERROR
+
+
+class ProxmoxResource:
+    def __init__(self, client: "ProxmoxClient", path: str):
+        self._client = client
+        self._path = path
+
+    def __getattr__(self, item: str) -> "ProxmoxResource":
+        if item.startswith("_"):
+            raise AttributeError(item)
+        return ProxmoxResource(self._client, f"{self._path}/{item}")
+
+    def __call__(self, item: Any) -> "ProxmoxResource":
+        return ProxmoxResource(self._client, f"{self._path}/{item}")
+
+    async def get(self, **params):
+        return await self._client.request("GET", self._path, params)
+
+    async def cached_get(self, **params):
+        return await self._client.cached_request(self._path, params)
+
+    async def post(self, **params):
+        return await self._client.request("POST", self._path, params)
+
+    async def put(self, **params):
+        return await self._client.request("PUT", self._path, params)
+
+    async def delete(self, **params):
+        return await self._client.request("DELETE", self._path, params)
+
+
+class ProxmoxClient:
+    def __init__(
+        self,
+        host: str,
+        user: str,
+        token_name: str,
+        token_value: str,
+        node_hosts: Optional[Dict[str, str]] = None,
+        verify_ssl: bool = False,
+        connect_timeout: float = 5,
+        read_timeout: float = 60,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        retries: int = 2,
+        retry_backoff: float = 0.2,
+        breaker_failure_threshold: int = 5,
+        breaker_reset_timeout: float = 30,
+        cache: Optional[ProxmoxCache] = None,
+    ):
+        self._cache = cache
+        self._retries = retries
+        self._retry_backoff = retry_backoff
+        self._breaker_failure_threshold = breaker_failure_threshold
+        self._breaker_reset_timeout = breaker_reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._base_url = self._api_url(host)
+        self._node_base_urls = {node: self._api_url(node_host) for node, node_host in (node_hosts or {}).items()}
+        self._http_options = {
+            "headers": {"Authorization": f"PVEAPIToken={user}!{token_name}={token_value}"},
+            "verify": verify_ssl,
+            "timeout": httpx.Timeout(read_timeout, connect=connect_timeout),
+            "limits": httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+        }
+        self._http_client: Optional[httpx.AsyncClient] = None
+
+    def __getattr__(self, item: str) -> ProxmoxResource:
+        if item.startswith("_"):
+            raise AttributeError(item)
+        return ProxmoxResource(self, item)
+
+    @property
+    def _http(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(**self._http_options)
+        return self._http_client
+
+    @staticmethod
+    def _api_url(host: Optional[str]) -> str:
+        host = host or "localhost"
+        if host.startswith(("http://", "https://")):
+            return f"{host.rstrip('/')}/api2/json"
+        if ":" not in host:
+            host = f"{host}:8006"
+        return f"https://{host}/api2/json"
+
+    @staticmethod
+    def _scope_for(path: str) -> str:
+        parts = path.split("/")
+        if len(parts) > 1 and parts[0] == "nodes":
+            return parts[1]
+        return "cluster"
+
+    def _url_for(self, path: str) -> str:
+        parts = path.split("/")
+        if len(parts) > 1 and parts[0] == "nodes":
+            return f"{self._node_base_urls.get(parts[1], self._base_url)}/{path}"
+        return f"{self._base_url}/{path}"
+
+    def breaker(self, scope: str) -> CircuitBreaker:
+        breaker = self._breakers.get(scope)
+        if breaker is None:
+            breaker = self._breakers[scope] = CircuitBreaker(
+                scope, self._breaker_failure_threshold, self._breaker_reset_timeout
+            )
+        return breaker
+
+    async def _send(self, method: str, path: str, params: Dict[str, Any]) -> httpx.Response:
+        start = time.perf_counter()
+        try:
+            if method in ("POST", "PUT"):
+                return await self._http.request(method, self._url_for(path), data=params)
+            return await self._http.request(method, self._url_for(path), params=params)
+        finally:
+            record_pve_call(time.perf_counter() - start)
+
+    async def request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None):
+        params = {key: value for key, value in (params or {}).items() if value is not None}
+        scope = self._scope_for(path)
+        breaker = self.breaker(scope)
+        attempts = self._retries + 1 if method == "GET" else 1
+        for attempt in range(attempts):
+            if not breaker.allow():
+                raise CircuitOpenError(scope)
+            try:
+                response = await self._send(method, path, params)
+            except httpx.TransportError as e:
+                breaker.record_failure()
+                if attempt + 1 == attempts:
+                    raise
+                logger.warning(f"Retrying {method} {path} after {type(e).__name__}: {e}")
+            else:
+                if response.status_code not in RETRY_STATUS_CODES:
+                    breaker.record_success()
+                    break
+                breaker.record_failure()
+                if attempt + 1 == attempts:
+                    break
+                logger.warning(f"Retrying {method} {path} after status {response.status_code}")
+            PVE_REQUEST_RETRIES.labels(scope).inc()
+            await asyncio.sleep(random.uniform(0, self._retry_backoff * 2 ** attempt))
+        if response.is_error:
+            errors = None
+            try:
+                errors = response.json().get("errors")
+            except ValueError:
+                pass
+            message = response.reason_phrase
+            if errors:
+                message = f"{message}: {errors}"
+            raise ProxmoxError(response.status_code, message)
+        if method != "GET":
+            await self.invalidate(path)
+        return response.json().get("data")
+
+    async def invalidate(self, path: str):
+        if self._cache is None:
+            return
+        scope = self._scope_for(path)
+        await self._cache.invalidate(scope)
+        if scope != "cluster":
+            await self._cache.invalidate("cluster")
+
+    async def cached_request(self, path: str, params: Optional[Dict[str, Any]] = None):
+        params = params or {}
+        if self._cache is None:
+            return await self.request("GET", path, params)
+        return await self._cache.fetch(
+            self._scope_for(path), path, params, lambda: self.request("GET", path, params)
+        )
+
+    async def aclose(self):
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+
+def parse_node_hosts(value: Optional[str]) -> Dict[str, str]:
+    node_hosts = {}
+    if not value:
+        return node_hosts
+    for item in value.split(","):
+        if "=" in item:
+            node, host = item.split("=", 1)
+            node_hosts[node.strip()] = host.strip()
+    return node_hosts
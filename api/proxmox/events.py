@@ -0,0 +1,119 @@
+import asyncio
+from typing import Dict, List, Optional, Set, Tuple
+from .lxc import project_tag
+from .resources import fetch_cluster_resources, merge_resources
+from config.vars import env
+from utils.logs import logger
+from utils.instrumentation import create_detached_task
+
+WATCHED_FIELDS = ("node", "name", "status", "tags")
+
+
+class ContainerSubscription:
+    def __init__(self, node: Optional[str], vmid: Optional[int], project_id: Optional[int], max_events: int):
+        self.node = node
+        self.vmid = vmid
+        self.tag = project_tag(project_id) if project_id is not None else None
+        self.queue: asyncio.Queue = asyncio.Queue(max_events)
+
+    def matches(self, container: dict) -> bool:
+        if self.node is not None and container["node"] != self.node:
+            return False
+        if self.vmid is not None and container["vmid"] != self.vmid:
+            return False
+        if self.tag is not None and self.tag not in (container.get("tags") or "").split(";"):
+            return False
+        return True
+
+
+class ContainerEventBroker:
+    def __init__(self, interval: float, max_events: int):
+        self._interval = interval
+        self._max_events = max_events
+        self._subscriptions: Set[ContainerSubscription] = set()
+        self._containers: Optional[Dict[Tuple[str, int], dict]] = None
+        self._ready = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+
+    async def subscribe(
+        self, node: Optional[str] = None, vmid: Optional[int] = None, project_id: Optional[int] = None
+    ) -> ContainerSubscription:
+        subscription = ContainerSubscription(node, vmid, project_id, self._max_events)
+        self._subscriptions.add(subscription)
+        if self._runner is None or self._runner.done():
+            self._runner = create_detached_task(self._run())
+        await self._ready.wait()
+        return subscription
+
+    async def unsubscribe(self, subscription: ContainerSubscription):
+        self._subscriptions.discard(subscription)
+        if not self._subscriptions and self._runner is not None:
+            runner = self._runner
+            self._runner = None
+            self._containers = None
+            self._ready.clear()
+            runner.cancel()
+            try:
+                await runner
+            except asyncio.CancelledError:
+                pass
+
+    def snapshot(self, subscription: ContainerSubscription) -> List[dict]:
+        return [container for container in (self._containers or {}).values() if subscription.matches(container)]
+
+    async def _run(self):
+        while True:
+            try:
+                await self._poll()
+            except Exception as e:
+                logger.warning(f"Error polling container status: {e}")
+            self._ready.set()
+            await asyncio.sleep(self._interval)
+
+    async def _poll(self):
+        fetched, failed = await fetch_cluster_resources("vm", cached=False)
+        resources = merge_resources(fetched)
+        containers = {
+            (resource["cluster"], int(resource["vmid"])): {
+                "cluster": resource["cluster"],
+                "vmid": int(resource["vmid"]),
+                "node": resource.get("node"),
+                "name": resource.get("name"),
+                "status": resource.get("status", "").lower(),
+                "tags": resource.get("tags"),
+            }
+            for resource in resources
+            if resource.get("type") == "lxc"
+        }
+        previous = self._containers
+        if previous is not None:
+            containers.update((key, container) for key, container in previous.items() if key[0] in failed)
+        self._containers = containers
+        if previous is None:
+            return
+        events = []
+        for key, container in containers.items():
+            before = previous.get(key)
+            if before is None:
+                events.append({"event": "added", **container, "previous_status": None})
+            elif any(before[field] != container[field] for field in WATCHED_FIELDS):
+                events.append({"event": "changed", **container, "previous_status": before["status"]})
+        for key, before in previous.items():
+            if key not in containers:
+                events.append({"event": "removed", **before, "previous_status": before["status"]})
+        if events:
+            logger.debug(f"Publishing {len(events)} container events to {len(self._subscriptions)} subscribers")
+        for event in events:
+            for subscription in list(self._subscriptions):
+                if not subscription.matches(event):
+                    continue
+                try:
+                    subscription.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    logger.warning(f"Dropping container event for vmid {event['vmid']}, subscriber is too slow")
+
+
+container_events = ContainerEventBroker(
+    interval=float(env["PVE_EVENTS_POLL_INTERVAL"]),
+    max_events=int(env["PVE_EVENTS_MAX_QUEUE"]),
+)
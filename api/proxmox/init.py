@@ -1,14 +1,47 @@
-import urllib3
-from proxmoxer import ProxmoxAPI
 from config.vars import env
+from .client import ProxmoxClient, parse_node_hosts
+from .cache import build_cache
+from .registry import ProxmoxRegistry, DEFAULT_CLUSTER, parse_clusters, region_clusters
 
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-prox = ProxmoxAPI(
-    host=env["PVE_HOST"],
-    user=env["PVE_USER"],
-    token_name=env["PVE_TOKEN_NAME"],
-    token_value=env["PVE_TOKEN_VALUE"],
-    verify_ssl=False,
-    timeout=60
+def build_client(cluster: str, config: dict) -> ProxmoxClient:
+    node_hosts = config.get("node_hosts")
+    return ProxmoxClient(
+        host=config["host"],
+        user=config["user"],
+        token_name=config["token_name"],
+        token_value=config["token_value"],
+        node_hosts=parse_node_hosts(node_hosts) if isinstance(node_hosts, str) else node_hosts,
+        verify_ssl=config.get("verify_ssl", False),
+        connect_timeout=float(env["PVE_CONNECT_TIMEOUT"]),
+        read_timeout=float(env["PVE_READ_TIMEOUT"]),
+        retries=int(env["PVE_RETRIES"]),
+        retry_backoff=float(env["PVE_RETRY_BACKOFF"]),
+        breaker_failure_threshold=int(env["PVE_BREAKER_FAILURE_THRESHOLD"]),
+        breaker_reset_timeout=float(env["PVE_BREAKER_RESET_TIMEOUT"]),
+        cache=build_cache(
+            backend=env["PVE_CACHE_BACKEND"],
+            ttl=float(env["PVE_CACHE_TTL"]),
+            stale_ttl=float(env["PVE_CACHE_STALE_TTL"]),
+            max_entries=int(env["PVE_CACHE_MAX_ENTRIES"]),
+            redis_url=env["PVE_CACHE_REDIS_URL"],
+            namespace=f"puyu:pve:{cluster}:",
+        )
+    )
+
+
+cluster_configs = parse_clusters(env["PVE_CLUSTERS"])
+if DEFAULT_CLUSTER not in cluster_configs and (env["PVE_HOST"] or not cluster_configs):
+    cluster_configs[DEFAULT_CLUSTER] = {
+        "host": env["PVE_HOST"],
+        "user": env["PVE_USER"],
+        "token_name": env["PVE_TOKEN_NAME"],
+        "token_value": env["PVE_TOKEN_VALUE"],
+        "node_hosts": env["PVE_NODE_HOSTS"],
+    }
+
+clusters = ProxmoxRegistry(
+    {cluster: build_client(cluster, config) for cluster, config in cluster_configs.items()},
+    region_clusters(cluster_configs),
+    env["PVE_DEFAULT_CLUSTER"] or (DEFAULT_CLUSTER if DEFAULT_CLUSTER in cluster_configs else next(iter(cluster_configs))),
 )
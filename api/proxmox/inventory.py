@@ -0,0 +1,106 @@
+import asyncio
+import time
+from typing import Dict, Optional
+from sqlalchemy import select
+from .init import clusters
+from .resources import fetch_cluster_resources, merge_resources
+from .tasks import task_registry
+from config.vars import env
+from db.config import AsyncSessionLocal
+from models import ProxContainerModel, ProxNodeModel
+from utils.logs import logger
+from utils.instrumentation import create_detached_task
+
+SYNCED_FIELDS = ("name", "type", "status", "cpus", "maxmem", "maxdisk", "tags", "prox_node_id")
+
+
+class InventoryReconciler:
+    def __init__(self, interval: float):
+        self._interval = interval
+        self._synced_at: Dict[str, float] = {}
+        self._wakeup = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+
+    def synced_at(self, cluster: str) -> Optional[float]:
+        return self._synced_at.get(cluster)
+
+    def request_sync(self, *_):
+        self._wakeup.set()
+
+    def start(self):
+        if self._runner is None or self._runner.done():
+            self._runner = create_detached_task(self._run())
+
+    async def stop(self):
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.error(f"Error syncing Proxmox inventory: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def sync(self):
+        started_at = time.time()
+        fetched, failed = await fetch_cluster_resources("vm", cached=False)
+        resources = merge_resources(fetched)
+        async with AsyncSessionLocal() as db:
+            node_ids = dict((await db.execute(select(ProxNodeModel.name, ProxNodeModel.id))).all())
+            unreachable = {node_id for name, node_id in node_ids.items() if clusters.cluster_for_node(name) in failed}
+            containers = {
+                (container.prox_node_id, container.vmid): container
+                for container in await db.scalars(select(ProxContainerModel))
+            }
+            seen = set()
+            inserted = updated = 0
+            for resource in resources:
+                if resource.get("type") != "lxc" or resource.get("node") not in node_ids:
+                    continue
+                vmid = int(resource["vmid"])
+                key = (node_ids[resource["node"]], vmid)
+                seen.add(key)
+                values = {
+                    "name": resource.get("name", ""),
+                    "type": resource["type"],
+                    "status": resource.get("status", "").lower(),
+                    "cpus": int(resource.get("maxcpu", 0)),
+                    "maxmem": int(resource.get("maxmem", 0)),
+                    "maxdisk": int(resource.get("maxdisk", 0)),
+                    "tags": resource.get("tags"),
+                    "prox_node_id": node_ids[resource["node"]],
+                }
+                container = containers.get(key)
+                if container is None:
+                    db.add(ProxContainerModel(vmid=vmid, synced_at=started_at, **values))
+                    inserted += 1
+                elif any(getattr(container, field) != values[field] for field in SYNCED_FIELDS):
+                    for field, value in values.items():
+                        setattr(container, field, value)
+                    container.synced_at = started_at
+                    updated += 1
+            deleted = 0
+            for key, container in containers.items():
+                if key not in seen and key[0] not in unreachable:
+                    await db.delete(container)
+                    deleted += 1
+            await db.commit()
+        for cluster in fetched:
+            self._synced_at[cluster] = started_at
+        if inserted or updated or deleted:
+            logger.info(f"Proxmox inventory synced: {inserted} inserted, {updated} updated, {deleted} deleted")
+
+
+inventory_reconciler = InventoryReconciler(interval=float(env["PVE_INVENTORY_SYNC_INTERVAL"]))
+task_registry.add_listener(inventory_reconciler.request_sync)
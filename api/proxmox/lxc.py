@@ -1,24 +1,83 @@
-from typing import Optional
+import asyncio
+from typing import List, Optional, Set
 from fastapi import HTTPException, status
-from .init import prox
+from .client import error_status
+from .init import clusters
+from .resources import get_cluster_resources
+from .tasks import task_registry
+from config.vars import env
 from utils.logs import logger
-from schemas.proxmox.lxc import LXCConfig, LXCStatusChange
+from utils.instrumentation import create_detached_task
+from utils.concurrency import KeyedSemaphore, RateLimiter
+from utils.size_changes import bytes_to_gb
+from schemas.proxmox.lxc import LXCConfig, LXCStatus, LXCStatusChange, LXCBatchAction, LXCBatchItem
 
 
-def get_lxc(proxmox_node: str, vmid: Optional[int] = None):
+batch_node_limit = KeyedSemaphore(int(env["PVE_BATCH_NODE_CONCURRENCY"]))
+batch_rate_limit = RateLimiter(float(env["PVE_BATCH_RATE_LIMIT"]))
+batch_runners: Set[asyncio.Task] = set()
+
+
+async def get_lxc(proxmox_node: str, vmid: Optional[int] = None):
     try:
         if vmid:
             logger.info(f"Retrieving LXC container config with vmid {vmid} for node {proxmox_node}")
-            return prox.nodes(proxmox_node).lxc(vmid).config.get()
-        else:
-            logger.info(f"Retrieving all LXC containers for node {proxmox_node}")
-            return prox.nodes(proxmox_node).lxc.get()
+            return await clusters.nodes(proxmox_node).lxc(vmid).config.cached_get()
+        logger.info(f"Retrieving all LXC containers for node {proxmox_node}")
+        resources = await get_cluster_resources()
     except Exception as e:
         logger.error(f"Error retrieving LXC containers: {e}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error retrieving LXC containers: {e}")
+        raise HTTPException(status_code=error_status(e), detail=f"Error retrieving LXC containers: {e}")
+    if resources.node(proxmox_node) is None:
+        if resources.unreachable(proxmox_node):
+            logger.error(f"Proxmox cluster of node {proxmox_node} is unreachable")
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Proxmox cluster of node {proxmox_node} is unreachable")
+        logger.warning(f"Node not found in the cluster: {proxmox_node}")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Node not found in the cluster: {proxmox_node}")
+    return resources.guests(proxmox_node)
+
+
+def project_tag(project_id: int) -> str:
+    return f"project-{project_id}"
+
+
+def format_lxc(container: dict) -> dict:
+    return {
+        "name": container["name"],
+        "vmid": container["vmid"],
+        "type": container["type"],
+        "status": container["status"].lower(),
+        "cpus": container.get("cpus", container.get("maxcpu")),
+        "maxmem_gb": bytes_to_gb(container["maxmem"]),
+        "maxdisk_gb": bytes_to_gb(container["maxdisk"])
+    }
+
+
+async def get_lxc_inventory(proxmox_nodes: List[str], lxc_status: Optional[LXCStatus] = None):
+    logger.info(f"Retrieving LXC containers for {len(proxmox_nodes)} nodes")
+    try:
+        resources = await get_cluster_resources()
+    except Exception as e:
+        logger.error(f"Error retrieving cluster resources: {e}")
+        raise HTTPException(status_code=error_status(e), detail=f"Error retrieving LXC containers: {e}")
+    containers = []
+    errors = []
+    for proxmox_node in proxmox_nodes:
+        node = resources.node(proxmox_node)
+        if node is None:
+            detail = "Proxmox cluster is unreachable" if resources.unreachable(proxmox_node) else "Node not found in the cluster"
+            errors.append({"node": proxmox_node, "detail": detail})
+            continue
+        if node.get("status") != "online":
+            errors.append({"node": proxmox_node, "detail": f"Node is {node.get('status', 'unknown')}"})
+            continue
+        for container in resources.guests(proxmox_node):
+            if lxc_status is None or container["status"].lower() == lxc_status:
+                containers.append({"node": proxmox_node, **format_lxc(container)})
+    return containers, errors
 
 
-def create_lxc(proxmox_node: str, lxc_config: LXCConfig):
+async def create_lxc(proxmox_node: str, lxc_config: LXCConfig):
     try:
         logger.info(f"Creating LXC container for node {proxmox_node}")
         params = {
@@ -32,16 +91,18 @@ def create_lxc(proxmox_node: str, lxc_config: LXCConfig):
             "ssh-public-keys": lxc_config.ssh_public_keys,
             "rootfs": lxc_config.rootfs,
             "storage": lxc_config.storage,
+            "cores": lxc_config.cores,
+            "tags": lxc_config.tags,
             "onboot": 1,
             "start": 1,
         }
-        return prox.nodes(proxmox_node).lxc.post(**params)
+        return await clusters.nodes(proxmox_node).lxc.post(**params)
     except Exception as e:
         logger.error(f"Error creating LXC container: {e}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error creating LXC container: {e}")
+        raise HTTPException(status_code=error_status(e), detail=f"Error creating LXC container: {e}")
 
 
-def delete_lxc(proxmox_node: str, vmid: int):
+async def delete_lxc(proxmox_node: str, vmid: int):
     try:
         logger.info(f"Deleting LXC container with vmid: {vmid} for node: {proxmox_node}")
         params = {
@@ -49,41 +110,74 @@ def delete_lxc(proxmox_node: str, vmid: int):
             "purge": 1,
             "force": 1,
         }
-        return prox.nodes(proxmox_node).lxc(vmid).delete(**params)
+        return await clusters.nodes(proxmox_node).lxc(vmid).delete(**params)
     except Exception as e:
         logger.error(f"Error deleting LXC container: {e}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error deleting LXC container: {e}")
+        raise HTTPException(status_code=error_status(e), detail=f"Error deleting LXC container: {e}")
 
 
-def change_status_lxc(proxmox_node: str, vmid: int, lxc_status: LXCStatusChange):
+async def change_status_lxc(proxmox_node: str, vmid: int, lxc_status: LXCStatusChange):
     match lxc_status:
         case LXCStatusChange.START:
             logger.info(f"Starting LXC container with vmid: {vmid} for node: {proxmox_node}")
             try:
-                return prox.nodes(proxmox_node).lxc(vmid).status.start.post()
+                return await clusters.nodes(proxmox_node).lxc(vmid).status.start.post()
             except Exception as e:
                 logger.error(f"Error starting LXC container: {e}")
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error starting LXC container: {e}")
+                raise HTTPException(status_code=error_status(e), detail=f"Error starting LXC container: {e}")
         case LXCStatusChange.STOP:
             logger.info(f"Stopping LXC container with vmid: {vmid} for node: {proxmox_node}")
             try:
-                return prox.nodes(proxmox_node).lxc(vmid).status.stop.post()
+                return await clusters.nodes(proxmox_node).lxc(vmid).status.stop.post()
             except Exception as e:
                 logger.error(f"Error stopping LXC container: {e}")
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error stopping LXC container: {e}")
+                raise HTTPException(status_code=error_status(e), detail=f"Error stopping LXC container: {e}")
         case LXCStatusChange.SHUTDOWN:
             logger.info(f"Shutting down LXC container with vmid: {vmid} for node: {proxmox_node}")
             try:
-                return prox.nodes(proxmox_node).lxc(vmid).status.shutdown.post()
+                return await clusters.nodes(proxmox_node).lxc(vmid).status.shutdown.post()
             except Exception as e:
                 logger.error(f"Error shutting down LXC container: {e}")
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error shutting down LXC container: {e}")
+                raise HTTPException(status_code=error_status(e), detail=f"Error shutting down LXC container: {e}")
         case LXCStatusChange.REBOOT:
             logger.info(f"Rebooting LXC container with vmid: {vmid} for node: {proxmox_node}")
             try:
-                return prox.nodes(proxmox_node).lxc(vmid).status.reboot.post()
+                return await clusters.nodes(proxmox_node).lxc(vmid).status.reboot.post()
             except Exception as e:
                 logger.error(f"Error rebooting LXC container: {e}")
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error rebooting LXC container: {e}")
+                raise HTTPException(status_code=error_status(e), detail=f"Error rebooting LXC container: {e}")
         case _:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid status: {status}")
+
+
+async def run_lxc_batch_item(group_id: str, item: LXCBatchItem):
+    try:
+        async with batch_node_limit(item.node):
+            await batch_rate_limit.acquire()
+            if item.action == LXCBatchAction.DELETE:
+                upid = await delete_lxc(item.node, item.vmid)
+            else:
+                upid = await change_status_lxc(item.node, item.vmid, LXCStatusChange(item.action.value))
+    except HTTPException as e:
+        task_registry.fail_in_group(group_id, {**item.model_dump(mode="json"), "detail": e.detail})
+    except Exception as e:
+        logger.error(f"Error running {item.action.value} on LXC container {item.vmid} for node {item.node}: {e}")
+        task_registry.fail_in_group(group_id, {**item.model_dump(mode="json"), "detail": str(e)})
+    else:
+        task = task_registry.track(item.node, upid, item.action.value, item.vmid)
+        task_registry.add_to_group(group_id, task["id"])
+
+
+async def run_lxc_batch(group_id: str, items: List[LXCBatchItem]):
+    await asyncio.gather(*(run_lxc_batch_item(group_id, item) for item in items))
+    group = task_registry.get(group_id)
+    logger.info(f"LXC batch {group_id} started {len(group['tasks'])} of {len(items)} tasks")
+
+
+def start_lxc_batch(items: List[LXCBatchItem]) -> dict:
+    group = task_registry.track_group("batch", len(items))
+    logger.info(f"Running LXC batch {group['id']} with {len(items)} items")
+    runner = create_detached_task(run_lxc_batch(group["id"], items))
+    batch_runners.add(runner)
+    runner.add_done_callback(batch_runners.discard)
+    return group
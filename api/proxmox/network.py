@@ -1,26 +1,99 @@
-from typing import Optional
-from fastapi import HTTPException, status
-from .init import prox
+import asyncio
+from typing import Dict, List, Optional
+from fastapi import HTTPException
+from .client import error_status
+from .init import clusters
+from .resources import get_cluster_resources
+from config.vars import env
+from schemas.proxmox.network import NetworkBatchAction, NetworkBatchItem
+from utils.concurrency import gather_bounded
 from utils.logs import logger
+from utils.instrumentation import create_detached_task
 
+NETWORK_FIELDS = {
+    "vlan": ["vlan-id", "iface", "type"],
+    "bridge": ["iface", "cidr", "type", "bridge_ports"],
+    "alias": ["iface", "cidr", "type"]
+}
 
-def get_network_devices(proxmox_node: str, interface_type: Optional[str] = None):
+
+async def get_network_devices(proxmox_node: str, interface_type: Optional[str] = None):
     if interface_type:
         try:
             logger.info(f"Getting network devices for node {proxmox_node} with type {interface_type}")
-            return prox.nodes(proxmox_node).network.get(type=interface_type)
+            return await clusters.nodes(proxmox_node).network.cached_get(type=interface_type)
         except Exception as e:
             logger.error(f"Error getting network devices: {e}")
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error getting network devices: {e}")
+            raise HTTPException(status_code=error_status(e), detail=f"Error getting network devices: {e}")
     try:
         logger.info(f"Getting all network devices for node {proxmox_node}")
-        return prox.nodes(proxmox_node).network.get()
+        return await clusters.nodes(proxmox_node).network.cached_get()
     except Exception as e:
         logger.error(f"Error getting network devices: {e}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error getting network devices: {e}")
+        raise HTTPException(status_code=error_status(e), detail=f"Error getting network devices: {e}")
+
+
+def filter_network_devices(
+        interfaces: List[dict],
+        fields: Optional[List[str]] = None,
+        vlan_aware: Optional[bool] = None,
+        active: Optional[bool] = None
+):
+    filtered = []
+    for interface in interfaces or []:
+        if vlan_aware is not None and bool(int(interface.get("bridge_vlan_aware") or 0)) != vlan_aware:
+            continue
+        if active is not None and bool(int(interface.get("active") or 0)) != active:
+            continue
+        if fields:
+            interface = {field: interface.get(field) for field in fields if interface.get(field) is not None}
+        if interface:
+            filtered.append(interface)
+    return filtered
+
+
+async def query_network_devices(
+        proxmox_nodes: List[str],
+        interface_type: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        vlan_aware: Optional[bool] = None,
+        active: Optional[bool] = None
+):
+    try:
+        resources = await get_cluster_resources()
+    except Exception as e:
+        logger.error(f"Error retrieving cluster resources: {e}")
+        raise HTTPException(status_code=error_status(e), detail=f"Error getting network devices: {e}")
+    online = []
+    errors = []
+    for proxmox_node in proxmox_nodes:
+        node = resources.node(proxmox_node)
+        if node is None:
+            detail = "Proxmox cluster is unreachable" if resources.unreachable(proxmox_node) else "Node not found in the cluster"
+            errors.append({"node": proxmox_node, "detail": detail})
+        elif node.get("status") != "online":
+            errors.append({"node": proxmox_node, "detail": f"Node is {node.get('status', 'unknown')}"})
+        else:
+            online.append(proxmox_node)
+    logger.info(f"Querying {interface_type or 'all'} network devices on {len(online)} nodes")
+    results = await gather_bounded(
+        lambda proxmox_node: get_network_devices(proxmox_node, interface_type),
+        online,
+        int(env["PVE_NETWORK_QUERY_CONCURRENCY"])
+    )
+    interfaces = []
+    for proxmox_node, result in zip(online, results):
+        if isinstance(result, HTTPException):
+            errors.append({"node": proxmox_node, "detail": result.detail})
+        elif isinstance(result, Exception):
+            errors.append({"node": proxmox_node, "detail": str(result)})
+        else:
+            for interface in filter_network_devices(result, fields, vlan_aware, active):
+                interfaces.append({"node": proxmox_node, **interface})
+    return interfaces, errors
 
 
-def create_network_devices(
+async def create_network_devices(
         proxmox_node: str,
         iface: str,
         type: str,
@@ -39,57 +112,125 @@ def create_network_devices(
                 "autostart": 1
             }
             try:
-                logger.info(f"Creating VLAN with params: {params}")
-                return prox.nodes(proxmox_node).network.post(**params)
+                logger.info("Creating VLAN with params: %s", params)
+                return await clusters.nodes(proxmox_node).network.post(**params)
             except Exception as e:
                 logger.error(f"Error creating VLAN: {e}")
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error creating VLAN: {e}")
+                raise HTTPException(status_code=error_status(e), detail=f"Error creating VLAN: {e}")
         case "bridge":
+            params = {
+                "iface": iface,
+                "type": type,
+                "bridge_ports": bridge_ports,
+                "address": address,
+                "netmask": netmask,
+                "bridge_vlan_aware": 1,
+                "autostart": 1
+            }
             try:
-                logger.info(f"Creating bridge with params: {params}")
-                return prox.nodes(proxmox_node).network.post(
-                    iface=iface,
-                    type=type,
-                    bridge_ports=bridge_ports,
-                    address=address,
-                    netmask=netmask,
-                    bridge_vlan_aware=1,
-                    autostart=1
-                )
+                logger.info("Creating bridge with params: %s", params)
+                return await clusters.nodes(proxmox_node).network.post(**params)
             except Exception as e:
                 logger.error(f"Error creating bridge: {e}")
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error creating bridge: {e}")
+                raise HTTPException(status_code=error_status(e), detail=f"Error creating bridge: {e}")
         case "alias":
+            params = {
+                "iface": iface,
+                "type": type,
+                "address": address,
+                "netmask": netmask,
+                "autostart": 1
+            }
             try:
-                logger.info(f"Creating alias with params: {params}")
-                return prox.nodes(proxmox_node).network.post(
-                    iface=iface,
-                    type=type,
-                    address=address,
-                    netmask=netmask,
-                    autostart=1
-                )
+                logger.info("Creating alias with params: %s", params)
+                return await clusters.nodes(proxmox_node).network.post(**params)
             except Exception as e:
                 logger.error(f"Error creating alias: {e}")
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error creating alias: {e}")
+                raise HTTPException(status_code=error_status(e), detail=f"Error creating alias: {e}")
         case _:
             logger.error(f"Invalid interface type: {type}")
             raise ValueError(f"Invalid interface type: {type}")
 
 
-def remove_network_device(proxmox_node: str, iface: str):
+async def remove_network_device(proxmox_node: str, iface: str):
     try:
         logger.info(f"Removing network device with iface {iface}")
-        return prox.nodes(proxmox_node).network(iface).delete()
+        return await clusters.nodes(proxmox_node).network(iface).delete()
     except Exception as e:
         logger.error(f"Error removing network device: {e}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error removing network device: {e}")
+        raise HTTPException(status_code=error_status(e), detail=f"Error removing network device: {e}")
 
 
-def reload_network_config(proxmox_node: str):
+async def reload_network_config(proxmox_node: str):
     try:
         logger.info(f"Reloading network config for node {proxmox_node}")
-        return prox.nodes(proxmox_node).network.put()
+        return await clusters.nodes(proxmox_node).network.put()
     except Exception as e:
         logger.error(f"Error reloading network config: {e}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error reloading network config: {e}")
+        raise HTTPException(status_code=error_status(e), detail=f"Error reloading network config: {e}")
+
+
+class NetworkReloadCoalescer:
+    def __init__(self, window: float):
+        self._window = window
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    async def reload(self, proxmox_node: str):
+        if self._window <= 0:
+            return await reload_network_config(proxmox_node)
+        pending = self._pending.get(proxmox_node)
+        if pending is None:
+            pending = asyncio.get_running_loop().create_future()
+            self._pending[proxmox_node] = pending
+            create_detached_task(self._reload_after_window(proxmox_node, pending))
+        else:
+            logger.debug(f"Coalescing network reload for node {proxmox_node}")
+        return await asyncio.shield(pending)
+
+    async def _reload_after_window(self, proxmox_node: str, pending: asyncio.Future):
+        await asyncio.sleep(self._window)
+        self._pending.pop(proxmox_node, None)
+        try:
+            pending.set_result(await reload_network_config(proxmox_node))
+        except Exception as e:
+            pending.set_exception(e)
+
+
+network_reloads = NetworkReloadCoalescer(window=float(env["PVE_NETWORK_RELOAD_WINDOW"]))
+
+
+async def apply_network_batch_item(proxmox_node: str, item: NetworkBatchItem):
+    if item.action == NetworkBatchAction.DELETE:
+        return await remove_network_device(proxmox_node, item.iface)
+    if not item.type:
+        raise ValueError(f"Missing interface type to create {item.iface}")
+    return await create_network_devices(
+        proxmox_node,
+        item.iface,
+        item.type,
+        item.vlan_raw_device,
+        item.bridge_ports,
+        item.address,
+        item.netmask
+    )
+
+
+async def apply_network_batch(proxmox_node: str, items: List[NetworkBatchItem]):
+    logger.info(f"Applying {len(items)} network changes to node {proxmox_node}")
+    results = []
+    for item in items:
+        try:
+            results.append(await apply_network_batch_item(proxmox_node, item))
+        except Exception as e:
+            results.append(e)
+    if all(isinstance(result, Exception) for result in results):
+        logger.warning(f"No network change applied to node {proxmox_node}, skipping reload")
+        return results, False, None
+    try:
+        await network_reloads.reload(proxmox_node)
+    except HTTPException as e:
+        return results, False, e.detail
+    except Exception as e:
+        logger.error(f"Error reloading network config of node {proxmox_node}: {e}")
+        return results, False, f"Error reloading network config: {e}"
+    return results, True, None
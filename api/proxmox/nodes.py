@@ -1,5 +1,24 @@
-from .init import prox
+import asyncio
+from typing import List
+from .init import clusters
+from .resources import get_cluster_resources
+from utils.logs import logger
 
 
-def get_nodes():
-    return prox.cluster.config.nodes.get()
+async def get_nodes() -> List[dict]:
+    registered = list(clusters.items())
+    results = await asyncio.gather(*(client.cluster.config.nodes.cached_get() for _, client in registered), return_exceptions=True)
+    nodes = []
+    for (cluster, _), result in zip(registered, results):
+        if isinstance(result, Exception):
+            if len(registered) == 1:
+                raise result
+            logger.error(f"Error retrieving nodes of Proxmox cluster {cluster}: {result}")
+            continue
+        nodes.extend(node for node in result or [] if clusters.owns_node(node["node"], cluster))
+    return nodes
+
+
+async def get_node_names() -> List[str]:
+    resources = await get_cluster_resources()
+    return [node["node"] for node in resources.nodes()]
@@ -0,0 +1,166 @@
+import asyncio
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from .resources import fetch_cluster_resources, merge_resources
+from config.vars import env
+from db.config import AsyncSessionLocal
+from models import ProxNodeModel
+from schemas.proxmox.provision import PlacementStrategy
+from utils.logs import logger
+from utils.instrumentation import create_detached_task
+
+
+class PlacementError(Exception):
+    pass
+
+
+class PlacementIndex:
+    def __init__(self, interval: float, storage: str, cpu_overcommit: float):
+        self._interval = interval
+        self._storage = storage
+        self._cpu_overcommit = cpu_overcommit
+        self._regions: Dict[int, List[dict]] = {}
+        self._snapshot_at: Optional[float] = None
+        self._runner: Optional[asyncio.Task] = None
+
+    @property
+    def snapshot_at(self) -> Optional[float]:
+        return self._snapshot_at
+
+    def start(self):
+        if self._runner is None or self._runner.done():
+            self._runner = create_detached_task(self._run())
+
+    async def stop(self):
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing placement index: {e}")
+            await asyncio.sleep(self._interval)
+
+    async def refresh(self):
+        async with AsyncSessionLocal() as db:
+            node_regions = dict((await db.execute(select(ProxNodeModel.name, ProxNodeModel.region_id))).all())
+        fetched, _ = await fetch_cluster_resources(cached=False)
+        resources = merge_resources(fetched)
+        nodes = {}
+        allocated = defaultdict(lambda: {"cpu": 0.0, "memory": 0, "storage": 0})
+        storages = defaultdict(dict)
+        for resource in resources:
+            match resource.get("type"):
+                case "node":
+                    nodes[resource["node"]] = resource
+                case "lxc" | "qemu":
+                    allocated[resource["node"]]["cpu"] += resource.get("maxcpu", 0)
+                    allocated[resource["node"]]["memory"] += resource.get("maxmem", 0)
+                    allocated[resource["node"]]["storage"] += resource.get("maxdisk", 0)
+                case "storage":
+                    storages[resource["node"]][resource["storage"]] = resource.get("maxdisk", 0)
+        regions = defaultdict(list)
+        for name, region_id in node_regions.items():
+            node = nodes.get(name)
+            if node is None or node.get("status") != "online":
+                continue
+            node_storages = storages.get(name, {})
+            max_storage = node_storages[self._storage] if self._storage in node_storages else node.get("maxdisk", 0)
+            if not node.get("maxcpu") or not node.get("maxmem") or not max_storage:
+                continue
+            regions[region_id].append({
+                "node": name,
+                "max_cpu": node.get("maxcpu", 0) * self._cpu_overcommit,
+                "max_memory": node.get("maxmem", 0),
+                "max_storage": max_storage,
+                "free_cpu": node.get("maxcpu", 0) * self._cpu_overcommit - allocated[name]["cpu"],
+                "free_memory": node.get("maxmem", 0) - allocated[name]["memory"],
+                "free_storage": max_storage - allocated[name]["storage"],
+                "cpu_usage": node.get("cpu", 0),
+                "storages": node_storages,
+            })
+        self._regions = dict(regions)
+        self._snapshot_at = time.time()
+        logger.debug(f"Placement index refreshed with {sum(len(nodes) for nodes in self._regions.values())} nodes")
+
+    def nodes(self, region_id: int) -> List[dict]:
+        return [dict(node) for node in self._regions.get(region_id, [])]
+
+    def place(
+        self,
+        region_id: int,
+        cpu: int,
+        memory_mb: int,
+        storage_gb: int,
+        count: int = 1,
+        strategy: PlacementStrategy = PlacementStrategy.SPREAD,
+        reserve: bool = False,
+        storage: Optional[str] = None,
+    ) -> List[str]:
+        if self._snapshot_at is None:
+            raise PlacementError("Placement index not loaded yet")
+        memory = memory_mb * 1024 ** 2
+        disk = storage_gb * 1024 ** 3
+        candidates = self._regions.get(region_id, []) if reserve else self.nodes(region_id)
+        free = {node["node"]: [node["free_cpu"], node["free_memory"], node["free_storage"]] for node in candidates}
+        max_storage = {
+            node["node"]: node["max_storage"] if storage is None else node["storages"].get(storage, 0)
+            for node in candidates
+        }
+        placements = []
+        for _ in range(count):
+            best_node = None
+            best_score = None
+            for node in candidates:
+                if not max_storage[node["node"]]:
+                    continue
+                free_cpu, free_memory, free_storage = free[node["node"]]
+                free_storage += max_storage[node["node"]] - node["max_storage"]
+                if free_cpu < cpu or free_memory < memory or free_storage < disk:
+                    continue
+                score = (
+                    (free_cpu - cpu) / node["max_cpu"]
+                    + (free_memory - memory) / node["max_memory"]
+                    + (free_storage - disk) / max_storage[node["node"]]
+                ) / 3
+                if strategy == PlacementStrategy.BINPACK:
+                    score = -score
+                if best_score is None or score > best_score:
+                    best_node, best_score = node["node"], score
+            if best_node is None:
+                raise PlacementError(f"Not enough capacity in region {region_id} for {count} containers")
+            free[best_node][0] -= cpu
+            free[best_node][1] -= memory
+            free[best_node][2] -= disk
+            placements.append(best_node)
+        if reserve:
+            for node in candidates:
+                node["free_cpu"], node["free_memory"], node["free_storage"] = free[node["node"]]
+        return placements
+
+    def release(self, region_id: int, placements: List[str], cpu: int, memory_mb: int, storage_gb: int, snapshot_at: float):
+        if snapshot_at != self._snapshot_at:
+            return
+        nodes = {node["node"]: node for node in self._regions.get(region_id, [])}
+        for name in placements:
+            node = nodes.get(name)
+            if node is not None:
+                node["free_cpu"] += cpu
+                node["free_memory"] += memory_mb * 1024 ** 2
+                node["free_storage"] += storage_gb * 1024 ** 3
+
+
+placement_index = PlacementIndex(
+    interval=float(env["PVE_PLACEMENT_REFRESH_INTERVAL"]),
+    storage=env["PVE_PLACEMENT_STORAGE"],
+    cpu_overcommit=float(env["PVE_PLACEMENT_CPU_OVERCOMMIT"]),
+)
@@ -0,0 +1,17 @@
+from typing import List, Tuple
+from .lxc import create_lxc
+from config.vars import env
+from utils.logs import logger
+from utils.concurrency import gather_bounded
+from schemas.proxmox.lxc import LXCConfig
+
+
+def place_round_robin(proxmox_nodes: List[str], count: int) -> List[str]:
+    return [proxmox_nodes[index % len(proxmox_nodes)] for index in range(count)]
+
+
+async def provision_lxc(placements: List[Tuple[str, LXCConfig]]):
+    logger.info(f"Provisioning {len(placements)} LXC containers")
+    return await gather_bounded(
+        lambda placement: create_lxc(*placement), placements, int(env["PVE_PROVISION_CONCURRENCY"])
+    )
@@ -0,0 +1,107 @@
+import asyncio
+import json
+from typing import Any, Dict, Optional, Set, Tuple
+from sqlalchemy import select
+from .client import ProxmoxClient, ProxmoxResource
+from db.config import AsyncSessionLocal
+from models import ProxNodeModel
+from utils.logs import logger
+
+DEFAULT_CLUSTER = "default"
+
+
+class ProxmoxRegistry:
+    def __init__(self, clients: Dict[str, ProxmoxClient], region_clusters: Dict[int, str], default_cluster: str):
+        if default_cluster not in clients:
+            raise ValueError(f"Unknown default Proxmox cluster: {default_cluster}")
+        self._clients = clients
+        self._region_clusters = region_clusters
+        self._default_cluster = default_cluster
+        self._node_clusters: Dict[str, str] = {}
+        self._node_conflicts: Set[Tuple[str, str]] = set()
+
+    def get(self, cluster: str) -> ProxmoxClient:
+        return self._clients[cluster]
+
+    def items(self):
+        return self._clients.items()
+
+    def cluster_for_region(self, region_id: int) -> str:
+        return self._region_clusters.get(region_id, self._default_cluster)
+
+    def cluster_for_node(self, proxmox_node: str) -> str:
+        return self._node_clusters.get(proxmox_node, self._default_cluster)
+
+    def for_region(self, region_id: int) -> ProxmoxClient:
+        return self._clients[self.cluster_for_region(region_id)]
+
+    def for_node(self, proxmox_node: str) -> ProxmoxClient:
+        return self._clients[self.cluster_for_node(proxmox_node)]
+
+    def owns_node(self, proxmox_node: str, cluster: str) -> bool:
+        return self._node_clusters.get(proxmox_node, cluster) == cluster
+
+    def register_node(self, proxmox_node: str, cluster: str) -> bool:
+        registered = self._node_clusters.get(proxmox_node)
+        if registered is None:
+            logger.debug(f"Routing Proxmox node {proxmox_node} to cluster {cluster}")
+            self._node_clusters[proxmox_node] = cluster
+        elif registered != cluster:
+            if (proxmox_node, cluster) not in self._node_conflicts:
+                self._node_conflicts.add((proxmox_node, cluster))
+                logger.error(f"Ignoring Proxmox node {proxmox_node} of cluster {cluster}, the name is already routed to cluster {registered}. Node names must be unique across clusters")
+            return False
+        return True
+
+    def nodes(self, proxmox_node: str) -> ProxmoxResource:
+        return self.for_node(proxmox_node).nodes(proxmox_node)
+
+    async def invalidate(self, path: str):
+        parts = path.split("/")
+        if len(parts) > 1 and parts[0] == "nodes":
+            await self.for_node(parts[1]).invalidate(path)
+        else:
+            for client in self._clients.values():
+                await client.invalidate(path)
+
+    async def load_nodes(self):
+        try:
+            async with AsyncSessionLocal() as db:
+                rows = (await db.execute(select(ProxNodeModel.name, ProxNodeModel.region_id))).all()
+        except Exception as e:
+            logger.warning(f"Could not load Proxmox nodes, routing them as they are discovered: {e}")
+            return
+        for name, region_id in rows:
+            self.register_node(name, self.cluster_for_region(region_id))
+        logger.info(f"Routed {len(rows)} Proxmox nodes to {len(self._clients)} clusters")
+
+    async def warm(self):
+        async def ping(cluster: str, client: ProxmoxClient):
+            try:
+                await client.version.get()
+            except Exception as e:
+                logger.warning(f"Could not reach Proxmox cluster {cluster}: {e}")
+
+        await asyncio.gather(*(ping(cluster, client) for cluster, client in self._clients.items()))
+
+    async def aclose(self):
+        for client in self._clients.values():
+            await client.aclose()
+
+
+def parse_clusters(value: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    if not value:
+        return {}
+    clusters = json.loads(value)
+    if not isinstance(clusters, dict):
+        raise ValueError("PVE_CLUSTERS must be a JSON object keyed by cluster name")
+    return clusters
+
+
+def region_clusters(clusters: Dict[str, Dict[str, Any]]) -> Dict[int, str]:
+    regions = {}
+    for cluster, config in clusters.items():
+        for region_id in config.get("regions", []):
+            regions[int(region_id)] = cluster
+    return regions
+
@@ -0,0 +1,93 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+from .init import clusters
+from utils.logs import logger
+
+GUEST_TYPES = ("lxc", "qemu")
+
+
+class ClusterResources:
+    def __init__(self, resources: List[dict], failed: Set[str] = frozenset()):
+        self.failed = failed
+        self.by_type: Dict[str, List[dict]] = defaultdict(list)
+        self.by_node: Dict[str, Dict[str, List[dict]]] = defaultdict(lambda: defaultdict(list))
+        self.by_vmid: Dict[Tuple[str, int], dict] = {}
+        for resource in resources:
+            resource_type = resource.get("type")
+            self.by_type[resource_type].append(resource)
+            if "node" in resource:
+                self.by_node[resource["node"]][resource_type].append(resource)
+            if resource_type in GUEST_TYPES:
+                self.by_vmid[(resource.get("cluster"), int(resource["vmid"]))] = resource
+
+    def nodes(self) -> List[dict]:
+        return self.by_type.get("node", [])
+
+    def node(self, proxmox_node: str) -> Optional[dict]:
+        nodes = self.by_node.get(proxmox_node, {}).get("node")
+        return nodes[0] if nodes else None
+
+    def unreachable(self, proxmox_node: str) -> bool:
+        return clusters.cluster_for_node(proxmox_node) in self.failed
+
+    def guests(self, proxmox_node: Optional[str] = None, guest_type: str = "lxc") -> List[dict]:
+        if proxmox_node is None:
+            return self.by_type.get(guest_type, [])
+        return self.by_node.get(proxmox_node, {}).get(guest_type, [])
+
+    def guest(self, cluster: str, vmid: int) -> Optional[dict]:
+        return self.by_vmid.get((cluster, vmid))
+
+    def storages(self, proxmox_node: str) -> List[dict]:
+        return self.by_node.get(proxmox_node, {}).get("storage", [])
+
+
+async def fetch_cluster_resources(resource_type: Optional[str] = None, cached: bool = True) -> Tuple[Dict[str, List[dict]], Set[str]]:
+    params = {"type": resource_type} if resource_type else {}
+
+    async def fetch(cluster: str, client) -> List[dict]:
+        resource = client.cluster.resources
+        resources = await (resource.cached_get(**params) if cached else resource.get(**params)) or []
+        for item in resources:
+            if item.get("type") == "node":
+                clusters.register_node(item["node"], cluster)
+        if all(clusters.owns_node(item["node"], cluster) for item in resources if "node" in item):
+            return resources
+        return [item for item in resources if "node" not in item or clusters.owns_node(item["node"], cluster)]
+
+    registered = list(clusters.items())
+    results = await asyncio.gather(*(fetch(cluster, client) for cluster, client in registered), return_exceptions=True)
+    fetched = {}
+    failed = set()
+    for (cluster, _), result in zip(registered, results):
+        if isinstance(result, Exception):
+            if len(registered) == 1:
+                raise result
+            logger.error(f"Error retrieving resources of Proxmox cluster {cluster}: {result}")
+            failed.add(cluster)
+            continue
+        fetched[cluster] = result
+    return fetched, failed
+
+
+def merge_resources(fetched: Dict[str, List[dict]]) -> List[dict]:
+    return [{"cluster": cluster, **item} for cluster, resources in fetched.items() for item in resources]
+
+
+_index_sources: Dict[str, List[dict]] = {}
+_index: Optional[ClusterResources] = None
+
+
+async def get_cluster_resources() -> ClusterResources:
+    global _index_sources, _index
+    fetched, failed = await fetch_cluster_resources()
+    if (
+        _index is None
+        or fetched.keys() != _index_sources.keys()
+        or any(resources is not _index_sources[cluster] for cluster, resources in fetched.items())
+    ):
+        _index = ClusterResources(merge_resources(fetched), failed)
+        _index_sources = fetched
+        logger.debug(f"Indexed {len(_index.by_vmid)} guests from {len(fetched)} Proxmox clusters")
+    return _index
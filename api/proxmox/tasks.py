@@ -0,0 +1,234 @@
+import asyncio
+import time
+import uuid
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+from .client import ProxmoxError
+from .init import clusters
+from .registry import ProxmoxRegistry
+from config.vars import env
+from utils.logs import logger
+from utils.instrumentation import create_detached_task
+
+
+class TaskRegistry:
+    def __init__(self, clusters: ProxmoxRegistry, min_interval: float, max_interval: float, retention: float, max_poll_errors: int):
+        self._clusters = clusters
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._retention = retention
+        self._max_poll_errors = max_poll_errors
+        self._poll_errors: Dict[str, int] = {}
+        self._interval = min_interval
+        self._tasks: Dict[str, dict] = {}
+        self._done: Dict[str, asyncio.Event] = {}
+        self._groups: Dict[str, str] = {}
+        self._listeners: List[Callable[[str], None]] = []
+        self._wakeup = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+
+    def track(self, node: str, upid: str, operation: str, vmid: Optional[int] = None) -> dict:
+        task_id = uuid.uuid4().hex
+        task = {
+            "id": task_id,
+            "node": node,
+            "upid": upid,
+            "operation": operation,
+            "vmid": vmid,
+            "status": "running",
+            "exitstatus": None,
+            "created_at": time.time(),
+            "finished_at": None,
+        }
+        self._tasks[task_id] = task
+        self._done[task_id] = asyncio.Event()
+        self._interval = self._min_interval
+        self._wakeup.set()
+        self.start()
+        logger.info(f"Tracking Proxmox task {upid} on node {node} as {task_id}")
+        return dict(task)
+
+    def track_group(self, operation: str, total: int) -> dict:
+        group_id = uuid.uuid4().hex
+        group = {
+            "id": group_id,
+            "node": None,
+            "upid": None,
+            "operation": operation,
+            "vmid": None,
+            "status": "running",
+            "exitstatus": None,
+            "created_at": time.time(),
+            "finished_at": None,
+            "tasks": [],
+            "total": total,
+            "succeeded": 0,
+            "failed": 0,
+            "errors": [],
+        }
+        self._tasks[group_id] = group
+        self._done[group_id] = asyncio.Event()
+        self._update_group(group_id)
+        return dict(group)
+
+    def add_to_group(self, group_id: str, task_id: str):
+        self._tasks[group_id]["tasks"].append(task_id)
+        self._groups[task_id] = group_id
+
+    def fail_in_group(self, group_id: str, error: dict):
+        group = self._tasks[group_id]
+        group["errors"].append(error)
+        group["failed"] += 1
+        self._update_group(group_id)
+
+    def add_listener(self, listener: Callable[[str], None]):
+        self._listeners.append(listener)
+
+    def get(self, task_id: str) -> Optional[dict]:
+        task = self._tasks.get(task_id)
+        return dict(task) if task else None
+
+    async def wait(self, task_id: str, timeout: float) -> Optional[dict]:
+        done = self._done.get(task_id)
+        if done is None:
+            return None
+        try:
+            await asyncio.wait_for(done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.get(task_id)
+
+    def start(self):
+        if self._runner is None or self._runner.done():
+            self._runner = create_detached_task(self._run())
+
+    async def stop(self):
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                changed = await self._poll()
+            except Exception as e:
+                logger.error(f"Error polling Proxmox tasks: {e}")
+                changed = False
+            self._prune()
+            if changed:
+                self._interval = self._min_interval
+            else:
+                self._interval = min(self._interval * 2, self._max_interval)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll(self) -> bool:
+        pending: Dict[str, List[dict]] = defaultdict(list)
+        for task in self._tasks.values():
+            if task["status"] == "running" and task["upid"] is not None:
+                pending[task["node"]].append(task)
+        if not pending:
+            return False
+        results = await asyncio.gather(
+            *(self._poll_node(node, tasks) for node, tasks in pending.items()), return_exceptions=True
+        )
+        changed = False
+        for node, result in zip(pending, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Error polling Proxmox tasks for node {node}: {result}")
+            elif result:
+                changed = True
+        return changed
+
+    async def _poll_node(self, node: str, tasks: List[dict]) -> bool:
+        changed = False
+        try:
+            if len(tasks) > 1:
+                active = await self._clusters.nodes(node).tasks.get(source="active")
+                active_upids = {task["upid"] for task in active or []}
+                tasks = [task for task in tasks if task["upid"] not in active_upids]
+        except Exception as e:
+            logger.warning(f"Error polling Proxmox tasks for node {node}: {e}")
+            changed = self._record_poll_error(tasks, e)
+            tasks = []
+        for task in tasks:
+            try:
+                task_status = await self._clusters.nodes(node).tasks(task["upid"]).status.get()
+            except Exception as e:
+                logger.warning(f"Error polling Proxmox task {task['upid']}: {e}")
+                changed = self._record_poll_error([task], e) or changed
+                continue
+            self._poll_errors.pop(task["id"], None)
+            if task_status.get("status") == "running":
+                continue
+            self._finish(task, task_status.get("exitstatus"))
+            changed = True
+        if changed:
+            await self._clusters.invalidate(f"nodes/{node}")
+            for listener in self._listeners:
+                listener(node)
+        return changed
+
+    def _record_poll_error(self, tasks: List[dict], error: Exception) -> bool:
+        finished = False
+        for task in tasks:
+            errors = self._poll_errors[task["id"]] = self._poll_errors.get(task["id"], 0) + 1
+            unknown = isinstance(error, ProxmoxError) and 400 <= error.status_code < 500
+            if unknown or errors >= self._max_poll_errors:
+                self._finish(task, f"unknown: {error}")
+                finished = True
+        return finished
+
+    def _finish(self, task: dict, exitstatus: Optional[str]):
+        task["status"] = "stopped"
+        task["exitstatus"] = exitstatus
+        task["finished_at"] = time.time()
+        self._poll_errors.pop(task["id"], None)
+        self._done[task["id"]].set()
+        self._record_in_group(task)
+        logger.info(f"Proxmox task {task['upid']} finished with {task['exitstatus']}")
+
+    def _record_in_group(self, task: dict):
+        group = self._tasks.get(self._groups.pop(task["id"], None))
+        if group is None:
+            return
+        if task["exitstatus"] == "OK":
+            group["succeeded"] += 1
+        else:
+            group["failed"] += 1
+        self._update_group(group["id"])
+
+    def _update_group(self, group_id: str):
+        group = self._tasks[group_id]
+        if group["status"] != "running" or group["succeeded"] + group["failed"] < group["total"]:
+            return
+        group["status"] = "stopped"
+        group["exitstatus"] = "OK" if not group["failed"] else f"{group['failed']} of {group['total']} tasks failed"
+        group["finished_at"] = time.time()
+        self._done[group_id].set()
+
+    def _prune(self):
+        expired_before = time.time() - self._retention
+        for task_id in [
+            task_id
+            for task_id, task in self._tasks.items()
+            if task["finished_at"] is not None and task["finished_at"] < expired_before
+        ]:
+            del self._tasks[task_id]
+            del self._done[task_id]
+
+
+task_registry = TaskRegistry(
+    clusters,
+    min_interval=float(env["PVE_TASK_POLL_MIN_INTERVAL"]),
+    max_interval=float(env["PVE_TASK_POLL_MAX_INTERVAL"]),
+    retention=float(env["PVE_TASK_RETENTION"]),
+    max_poll_errors=int(env["PVE_TASK_MAX_POLL_ERRORS"]),
+)
@@ -0,0 +1,48 @@
+import asyncio
+import time
+from typing import Dict, List
+from .client import ProxmoxClient
+from .init import clusters
+from config.vars import env
+from utils.logs import logger
+
+MAX_VMID = 999999999
+
+
+class VmidAllocator:
+    def __init__(self, client: ProxmoxClient, reservation_ttl: float):
+        self._client = client
+        self._reservation_ttl = reservation_ttl
+        self._reserved: Dict[int, float] = {}
+        self._lock = asyncio.Lock()
+
+    async def allocate(self, count: int) -> List[int]:
+        async with self._lock:
+            now = time.time()
+            self._reserved = {vmid: expires_at for vmid, expires_at in self._reserved.items() if expires_at > now}
+            next_id = int(await self._client.cluster.nextid.get())
+            resources = await self._client.cluster.resources.get(type="vm")
+            used = {int(resource["vmid"]) for resource in resources or [] if "vmid" in resource}
+            used.update(self._reserved)
+            vmids = []
+            vmid = next_id
+            while len(vmids) < count:
+                if vmid > MAX_VMID:
+                    raise ValueError(f"Not enough free vmids to allocate {count} containers")
+                if vmid not in used:
+                    vmids.append(vmid)
+                vmid += 1
+            for vmid in vmids:
+                self._reserved[vmid] = now + self._reservation_ttl
+            logger.info(f"Allocated {count} vmids starting at {vmids[0]}")
+            return vmids
+
+    def release(self, vmids: List[int]):
+        for vmid in vmids:
+            self._reserved.pop(vmid, None)
+
+
+vmid_allocators = {
+    cluster: VmidAllocator(client, reservation_ttl=float(env["PVE_VMID_RESERVATION_TTL"]))
+    for cluster, client in clusters.items()
+}
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Path
+from fastapi import APIRouter, HTTPException, status, Depends, Path, Request
 from fastapi.responses import JSONResponse, Response
-from sqlalchemy.orm import Session
-from db.session import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.session import get_async_db
 from utils.logs import logger
+from utils.etag import bump_table_versions, table_etag, not_modified
+from utils.pagination import paginate, pagination_headers, stream_ndjson_async
 from models import ServerOfferModel, ServiceModel
 from schemas.business.server_offer import ServerOfferSchema, ServerOfferCreateSchema, ServerOfferUpdateSchema
+from schemas.common.pagination import PaginationParams
 
 
 server_offer_router = APIRouter()
@@ -16,16 +20,26 @@ server_offer_router = APIRouter()
     summary="Get all server offers",
     response_model=ServerOfferSchema,
 )
-def get_server_offers(
-    db: Session = Depends(get_db)
+async def get_server_offers(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    pagination: PaginationParams = Depends(PaginationParams),
 ):
     logger.info("Getting all server offers")
-    server_offers = db.query(ServerOfferModel).all()
+    etag = await table_etag(request, db, ServerOfferModel.__tablename__)
+    if response := not_modified(request, etag):
+        return response
+    query = paginate(select(ServerOfferModel), ServerOfferModel.id, pagination)
+    if pagination.stream:
+        response = stream_ndjson_async(query)
+        response.headers["ETag"] = etag
+        return response
+    server_offers = (await db.scalars(query)).all()
     if not server_offers:
         logger.warning("No server offers found")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     server_offer_list = [server_offer.to_dict() for server_offer in server_offers]
-    return JSONResponse(server_offer_list)
+    return JSONResponse(server_offer_list, headers={"ETag": etag, **pagination_headers(server_offers, pagination)})
 
 
 @server_offer_router.get(
@@ -34,21 +48,25 @@ def get_server_offers(
     summary="Get a server offers by service ID",
     response_model=ServerOfferSchema,
 )
-def get_server_offers_by_service_id(
+async def get_server_offers_by_service_id(
+    request: Request,
     service_id: int = Path(..., description="The ID of the service"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     logger.info(f"Getting server offers for service ID: {service_id}")
-    service = db.query(ServiceModel).filter(ServiceModel.id == service_id).first()
+    etag = await table_etag(request, db, ServiceModel.__tablename__, ServerOfferModel.__tablename__)
+    if response := not_modified(request, etag):
+        return response
+    service = await db.scalar(select(ServiceModel).where(ServiceModel.id == service_id))
     if not service:
         logger.warning(f"No service found for ID: {service_id}")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
-    server_offers = db.query(ServerOfferModel).filter(ServerOfferModel.service_id == service_id).all()
+    server_offers = (await db.scalars(select(ServerOfferModel).where(ServerOfferModel.service_id == service_id))).all()
     if not server_offers:
         logger.warning(f"No server offers found for service ID: {service_id}")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     server_offer_list = [server_offer.to_dict() for server_offer in server_offers]
-    return JSONResponse(server_offer_list)
+    return JSONResponse(server_offer_list, headers={"ETag": etag})
 
 
 @server_offer_router.post(
@@ -57,22 +75,23 @@ def get_server_offers_by_service_id(
     summary="Create a server offer",
     response_model=ServerOfferSchema,
 )
-def create_server_offer(
+async def create_server_offer(
     server_offer: ServerOfferCreateSchema,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    logger.info(f"Creating server offer: {server_offer}")
-    service = db.query(ServiceModel).filter(ServiceModel.id == server_offer.service_id).first()
+    logger.info(f"Creating server offer for service: {server_offer.service_id}")
+    service = await db.scalar(select(ServiceModel).where(ServiceModel.id == server_offer.service_id))
     if not service:
         logger.warning(f"No service found for ID: {server_offer.service_id}")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     new_server_offer = ServerOfferModel(**server_offer.dict())
     try:
         db.add(new_server_offer)
-        db.commit()
-        db.refresh(new_server_offer)
+        await bump_table_versions(db, ServerOfferModel.__tablename__)
+        await db.commit()
+        await db.refresh(new_server_offer)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error creating server offer: {e}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Error creating server offer")
     return JSONResponse(new_server_offer.to_dict(), status_code=status.HTTP_201_CREATED)
@@ -84,20 +103,21 @@ def create_server_offer(
     summary="Update a server offer",
     response_model=ServerOfferSchema,
 )
-def update_server_offer(
+async def update_server_offer(
     server_offer: ServerOfferUpdateSchema,
     server_offer_id: int = Path(..., description="The ID of the server offer"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     logger.info(f"Updating server offer ID: {server_offer_id}")
-    server_offer_to_update = db.query(ServerOfferModel).filter(ServerOfferModel.id == server_offer_id).first()
+    server_offer_to_update = await db.scalar(select(ServerOfferModel).where(ServerOfferModel.id == server_offer_id))
     if not server_offer_to_update:
         logger.warning(f"No server offer found for ID: {server_offer_id}")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     for key, value in server_offer.model_dump(exclude_unset=True).items():
         setattr(server_offer_to_update, key, value)
-    db.commit()
-    db.refresh(server_offer_to_update)
+    await bump_table_versions(db, ServerOfferModel.__tablename__)
+    await db.commit()
+    await db.refresh(server_offer_to_update)
     logger.info(f"Server offer with ID: {server_offer_id} updated successfully")
     return ServerOfferSchema.model_validate(server_offer_to_update.__dict__)
 
@@ -108,16 +128,17 @@ def update_server_offer(
     summary="Delete a server offer",
     response_model=ServerOfferSchema,
 )
-def delete_server_offer(
+async def delete_server_offer(
     server_offer_id: int = Path(..., description="The ID of the server offer"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     logger.info(f"Deleting server offer with ID: {server_offer_id}")
-    server_offer_to_delete = db.query(ServerOfferModel).filter(ServerOfferModel.id == server_offer_id).first()
+    server_offer_to_delete = await db.scalar(select(ServerOfferModel).where(ServerOfferModel.id == server_offer_id))
     if not server_offer_to_delete:
         logger.warning(f"No server offer found for ID: {server_offer_id}")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
-    db.delete(server_offer_to_delete)
-    db.commit()
+    await db.delete(server_offer_to_delete)
+    await bump_table_versions(db, ServerOfferModel.__tablename__)
+    await db.commit()
     logger.info(f"Server offer with ID: {server_offer_id} deleted successfully")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -5,10 +5,12 @@ from sqlalchemy.exc import IntegrityError
 from typing import List
 from db.session import get_db
 from utils.logs import logger
+from utils.pagination import paginate, pagination_headers, stream_ndjson
 #from auth.jwt import verify_token
 from models import ProjectModel
 #from models.auth.user_project import UserProjectModel
 from schemas.core.project import ProjectSchema, ProjectCreateSchema, ProjectUpdateSchema
+from schemas.common.pagination import PaginationParams
 
 
 project_router = APIRouter()
@@ -21,14 +23,20 @@ project_router = APIRouter()
     description="Get All Projects",
     response_model=List[ProjectSchema]
 )
-def get_all_projects(db: Session = Depends(get_db)):
+def get_all_projects(
+    db: Session = Depends(get_db),
+    pagination: PaginationParams = Depends(PaginationParams),
+):
     logger.info("Getting all projects")
-    project_query = db.query(ProjectModel).all()
+    query = paginate(db.query(ProjectModel), ProjectModel.id, pagination)
+    if pagination.stream:
+        return stream_ndjson(query)
+    project_query = query.all()
     if not project_query:
         logger.warning(f"Projects not found")
         raise HTTPException(status_code=status.HTTP_204_NO_CONTENT, detail="Projects not found")
     project_list = [project.to_dict() for project in project_query]
-    return JSONResponse(project_list)
+    return JSONResponse(project_list, headers=pagination_headers(project_query, pagination))
 
 
 @project_router.get(
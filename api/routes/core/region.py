@@ -1,12 +1,16 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Request
 from fastapi.responses import JSONResponse, Response
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from typing import List
-from db.session import get_db
+from db.session import get_async_db
 from utils.logs import logger
+from utils.etag import bump_table_versions, table_etag, not_modified
+from utils.pagination import paginate, pagination_headers, stream_ndjson_async
 from models import RegionModel
 from schemas.core.region import RegionFilterParams, RegionSchema, RegionCreateSchema, RegionUpdateSchema
+from schemas.common.pagination import PaginationParams
 
 
 region_router = APIRouter()
@@ -18,12 +22,17 @@ region_router = APIRouter()
     summary="Get all regions with optional filters",
     response_model=List[RegionSchema],
 )
-def get_all_regions(
-    db: Session = Depends(get_db),
+async def get_all_regions(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     filters: RegionFilterParams = Depends(RegionFilterParams),
+    pagination: PaginationParams = Depends(PaginationParams),
 ):
     logger.info(f"Getting regions")
-    query = db.query(RegionModel)
+    etag = await table_etag(request, db, RegionModel.__tablename__)
+    if response := not_modified(request, etag):
+        return response
+    query = select(RegionModel)
     if filters.id is not None:
         logger.info(f"Filtering by id: {filters.id}")
         query = query.filter(RegionModel.id == filters.id)
@@ -33,12 +42,17 @@ def get_all_regions(
     if filters.available is not None:
         logger.info(f"Filtering by available: {filters.available}")
         query = query.filter(RegionModel.available == filters.available)
-    regions = query.all()
+    query = paginate(query, RegionModel.id, pagination)
+    if pagination.stream:
+        response = stream_ndjson_async(query)
+        response.headers["ETag"] = etag
+        return response
+    regions = (await db.scalars(query)).all()
     if not regions:
         logger.warning(f"No regions found with the given filters")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     regions_list = [region.to_dict() for region in regions]
-    return JSONResponse(content=regions_list, status_code=status.HTTP_200_OK)
+    return JSONResponse(content=regions_list, status_code=status.HTTP_200_OK, headers={"ETag": etag, **pagination_headers(regions, pagination)})
 
 
 @region_router.post(
@@ -47,18 +61,19 @@ def get_all_regions(
     summary="Create a region",
     response_model=RegionSchema,
 )
-def create_region(region: RegionCreateSchema, db: Session = Depends(get_db)):
+async def create_region(region: RegionCreateSchema, db: AsyncSession = Depends(get_async_db)):
     logger.info(f"Creating region")
     region = RegionModel(**region.dict())
     try:
         logger.info(f"Adding region to database")
         db.add(region)
-        db.commit()
+        await bump_table_versions(db, RegionModel.__tablename__)
+        await db.commit()
     except IntegrityError:
         logger.warning(f"Region already exists")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Region already exists")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error creating region: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error creating region")
     return JSONResponse(content=region.to_dict(), status_code=status.HTTP_201_CREATED)
@@ -70,16 +85,17 @@ def create_region(region: RegionCreateSchema, db: Session = Depends(get_db)):
     summary="Update a region",
     response_model=RegionSchema,
 )
-def update_region(region_id: int, region_update: RegionUpdateSchema, db: Session = Depends(get_db)):
+async def update_region(region_id: int, region_update: RegionUpdateSchema, db: AsyncSession = Depends(get_async_db)):
     logger.info(f"Updating region with id {region_id}")
-    region = db.query(RegionModel).filter(RegionModel.id == region_id).first()
+    region = await db.scalar(select(RegionModel).where(RegionModel.id == region_id))
     if not region:
         logger.warning(f"Region with id {region_id} not found")
         raise HTTPException(status_code=status.HTTP_204_NO_CONTENT, detail="Region not found")
     for key, value in region_update.model_dump(exclude_unset=True).items():
         setattr(region, key, value)
-    db.commit()
-    db.refresh(region)
+    await bump_table_versions(db, RegionModel.__tablename__)
+    await db.commit()
+    await db.refresh(region)
     logger.info(f"Region with id {region_id} updated")
     return JSONResponse(content=region.to_dict(), status_code=status.HTTP_200_OK)
 
@@ -89,13 +105,14 @@ def update_region(region_id: int, region_update: RegionUpdateSchema, db: Session
     tags=["core", "region"],
     summary="Delete a region",
 )
-def delete_region(region_id: int, db: Session = Depends(get_db)):
+async def delete_region(region_id: int, db: AsyncSession = Depends(get_async_db)):
     logger.info(f"Deleting region with id {region_id}")
-    region = db.query(RegionModel).filter(RegionModel.id == region_id).first()
+    region = await db.scalar(select(RegionModel).where(RegionModel.id == region_id))
     if not region:
         logger.warning(f"Region with id {region_id} not found")
         raise HTTPException(status_code=status.HTTP_204_NO_CONTENT, detail="Region not found")
-    db.delete(region)
-    db.commit()
+    await db.delete(region)
+    await bump_table_versions(db, RegionModel.__tablename__)
+    await db.commit()
     logger.info(f"Region with id {region_id} deleted")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
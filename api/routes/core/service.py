@@ -1,12 +1,18 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Path, Body
+from fastapi import APIRouter, HTTPException, status, Depends, Path, Body, Request
 from fastapi.responses import JSONResponse, Response
-from sqlalchemy.orm import Session
+from sqlalchemy import select, delete
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert
 from typing import List
-from db.session import get_db
+from db.session import get_async_db
 from utils.logs import logger
+from utils.etag import bump_table_versions, table_etag, not_modified
+from utils.pagination import paginate, pagination_headers, stream_ndjson_async
 from models import ServiceModel, RegionModel, RegionServiceModel
 from schemas.core.service import ServiceFilterParams, ServiceSchema, ServiceCreateSchema, ServiceUpdateSchema
+from schemas.common.pagination import PaginationParams
 
 
 service_router = APIRouter()
@@ -18,12 +24,17 @@ service_router = APIRouter()
     summary="Get all services with optional filters",
     response_model=List[ServiceSchema],
 )
-def get_all_services(
-    db: Session = Depends(get_db),
+async def get_all_services(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     filters: ServiceFilterParams = Depends(ServiceFilterParams),
+    pagination: PaginationParams = Depends(PaginationParams),
 ):
     logger.info(f"Getting services")
-    query = db.query(ServiceModel)
+    etag = await table_etag(request, db, ServiceModel.__tablename__)
+    if response := not_modified(request, etag):
+        return response
+    query = select(ServiceModel).options(selectinload(ServiceModel.regions))
     if filters.id is not None:
         logger.info(f"Filtering by id: {filters.id}")
         query = query.filter(ServiceModel.id == filters.id)
@@ -33,12 +44,17 @@ def get_all_services(
     if filters.available is not None:
         logger.info(f"Filtering by available: {filters.available}")
         query = query.filter(ServiceModel.available == filters.available)
-    services = query.all()
+    query = paginate(query, ServiceModel.id, pagination)
+    if pagination.stream:
+        response = stream_ndjson_async(query)
+        response.headers["ETag"] = etag
+        return response
+    services = (await db.scalars(query)).all()
     if not services:
         logger.warning(f"No services found with the given filters")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     services_list = [service.to_dict() for service in services]
-    return JSONResponse(content=services_list, status_code=status.HTTP_200_OK)
+    return JSONResponse(content=services_list, status_code=status.HTTP_200_OK, headers={"ETag": etag, **pagination_headers(services, pagination)})
 
 
 @service_router.post(
@@ -47,8 +63,14 @@ def get_all_services(
     summary="Create a service",
     response_model=ServiceSchema,
 )
-def create_service(service: ServiceCreateSchema, db: Session = Depends(get_db)):
+async def create_service(service: ServiceCreateSchema, db: AsyncSession = Depends(get_async_db)):
     logger.info(f"Creating service")
+    region_ids = set(service.regions)
+    found_regions = set(await db.scalars(select(RegionModel.id).where(RegionModel.id.in_(region_ids))))
+    missing_regions = sorted(region_ids - found_regions)
+    if missing_regions:
+        logger.warning(f"Regions with ids {missing_regions} not found")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Regions not found: {missing_regions}")
     new_service = ServiceModel(
         name=service.name,
         description=service.description,
@@ -57,21 +79,21 @@ def create_service(service: ServiceCreateSchema, db: Session = Depends(get_db)):
     try:
         logger.info(f"Adding service to database")
         db.add(new_service)
-        db.flush()
-        for region_id in service.region_ids:
-            region = db.query(RegionModel).filter(RegionModel.id == region_id).first()
-            if not region:
-                logger.warning(f"Region with id {region_id} not found")
-                return Response(status_code=status.HTTP_204_NO_CONTENT)
-            region_service = RegionServiceModel(region_id=region_id, service_id=new_service.id)
-            db.add(region_service)
-        db.commit()
-        db.refresh(new_service)
+        await db.flush()
+        if region_ids:
+            await db.execute(
+                insert(RegionServiceModel)
+                .values([{"region_id": region_id, "service_id": new_service.id} for region_id in region_ids])
+                .on_conflict_do_nothing()
+            )
+        await bump_table_versions(db, ServiceModel.__tablename__)
+        await db.commit()
+        await db.refresh(new_service, ["regions"])
     except IntegrityError:
         logger.warning(f"Service already exists")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Service already exists")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error creating service: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error creating service")
     response_data = new_service.to_dict()
@@ -85,30 +107,36 @@ def create_service(service: ServiceCreateSchema, db: Session = Depends(get_db)):
     summary="Add regions to an existing service",
     response_model=ServiceSchema,
 )
-def add_regions_to_service(
+async def add_regions_to_service(
     service_id: int = Path(..., description="The ID of the service to add regions to"),
     region_ids: List[int] = Body(..., description="The IDs of the regions to add to the service"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     logger.info(f"Adding regions to service {service_id}")
-    service = db.query(ServiceModel).filter(ServiceModel.id == service_id).first()
+    service = await db.scalar(
+        select(ServiceModel).options(selectinload(ServiceModel.regions)).where(ServiceModel.id == service_id)
+    )
     if not service:
         logger.warning(f"Service with id {service_id} not found")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
-    existing_regions = set(rs.region_id for rs in service.regions)
+    new_region_ids = set(region_ids) - {rs.region_id for rs in service.regions}
+    found_regions = set(await db.scalars(select(RegionModel.id).where(RegionModel.id.in_(new_region_ids))))
+    missing_regions = sorted(new_region_ids - found_regions)
+    if missing_regions:
+        logger.warning(f"Regions with ids {missing_regions} not found")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Regions not found: {missing_regions}")
     try:
-        for region_id in region_ids:
-            if region_id not in existing_regions:
-                region = db.query(RegionModel).filter(RegionModel.id == region_id).first()
-                if not region:
-                    logger.warning(f"Region with id {region_id} not found")
-                    return Response(status_code=status.HTTP_204_NO_CONTENT)
-                region_service = RegionServiceModel(region_id=region_id, service_id=service_id)
-                db.add(region_service)
-        db.commit()
-        db.refresh(service)
+        if new_region_ids:
+            await db.execute(
+                insert(RegionServiceModel)
+                .values([{"region_id": region_id, "service_id": service_id} for region_id in new_region_ids])
+                .on_conflict_do_nothing()
+            )
+        await bump_table_versions(db, ServiceModel.__tablename__)
+        await db.commit()
+        await db.refresh(service, ["regions"])
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error adding regions to service: {str(e)}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error adding regions to service")
     return JSONResponse(content=service.to_dict(), status_code=status.HTTP_200_OK)
@@ -120,25 +148,26 @@ def add_regions_to_service(
     summary="Remove regions from an existing service",
     response_model=ServiceSchema,
 )
-def remove_regions_from_service(
+async def remove_regions_from_service(
     service_id: int = Path(..., description="The ID of the service to remove regions from"),
     region_ids: List[int] = Body(..., description="The IDs of the regions to remove from the service"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     logger.info(f"Removing regions from service {service_id}")
-    service = db.query(ServiceModel).filter(ServiceModel.id == service_id).first()
+    service = await db.scalar(select(ServiceModel).where(ServiceModel.id == service_id))
     if not service:
         logger.warning(f"Service with id {service_id} not found")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     try:
-        db.query(RegionServiceModel).filter(
+        await db.execute(delete(RegionServiceModel).where(
             RegionServiceModel.service_id == service_id,
             RegionServiceModel.region_id.in_(region_ids)
-        ).delete(synchronize_session=False)
-        db.commit()
-        db.refresh(service)
+        ))
+        await bump_table_versions(db, ServiceModel.__tablename__)
+        await db.commit()
+        await db.refresh(service, ["regions"])
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error removing regions from service: {str(e)}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error removing regions from service")
     return JSONResponse(content=service.to_dict(), status_code=status.HTTP_200_OK)
@@ -150,20 +179,21 @@ def remove_regions_from_service(
     summary="Update a service",
     response_model=ServiceSchema,
 )
-def update_service(
+async def update_service(
     service_update: ServiceUpdateSchema,
     service_id: int = Path(..., description="The ID of the service to update"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     logger.info(f"Updating service with id {service_id}")
-    service = db.query(ServiceModel).filter(ServiceModel.id == service_id).first()
+    service = await db.scalar(select(ServiceModel).where(ServiceModel.id == service_id))
     if not service:
         logger.warning(f"Service with id {service_id} not found")
         raise HTTPException(status_code=status.HTTP_204_NO_CONTENT, detail="Service not found")
     for key, value in service_update.model_dump(exclude_unset=True).items():
         setattr(service, key, value)
-    db.commit()
-    db.refresh(service)
+    await bump_table_versions(db, ServiceModel.__tablename__)
+    await db.commit()
+    await db.refresh(service, ["regions"])
     logger.info(f"Service with id {service_id} updated")
     return JSONResponse(content=service.to_dict(), status_code=status.HTTP_200_OK)
 
@@ -173,16 +203,17 @@ def update_service(
     tags=["core", "service"],
     summary="Delete a service",
 )
-def delete_service(
+async def delete_service(
     service_id: int = Path(..., description="The ID of the service to delete"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     logger.info(f"Deleting service with id {service_id}")
-    service = db.query(ServiceModel).filter(ServiceModel.id == service_id).first()
+    service = await db.scalar(select(ServiceModel).where(ServiceModel.id == service_id))
     if not service:
         logger.warning(f"Service with id {service_id} not found")
         raise HTTPException(status_code=status.HTTP_204_NO_CONTENT, detail="Service not found")
-    db.delete(service)
-    db.commit()
+    await db.delete(service)
+    await bump_table_versions(db, ServiceModel.__tablename__)
+    await db.commit()
     logger.info(f"Service with id {service_id} deleted")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -4,8 +4,10 @@ from sqlalchemy.orm import Session
 from typing import List
 from db.session import get_db
 from utils.logs import logger
+from utils.pagination import paginate, pagination_headers, stream_ndjson
 from models import ProxNodeModel, ProxVlanModel
 from schemas.networking.vlan import ProxVlanSchema, ProxVlanCreateSchema, ProxVlanUpdateSchema
+from schemas.common.pagination import PaginationParams
 
 
 prox_vlan_router = APIRouter()
@@ -20,21 +22,25 @@ prox_vlan_router = APIRouter()
 def get_all_vlans(
     db: Session = Depends(get_db),
     prox_node_id: int | None = Query(default=None, description="The ID of the prox node to filter by"),
-    vlan_id: int | None = Query(default=None, description="The ID of the vlan to filter by")
+    vlan_id: int | None = Query(default=None, description="The ID of the vlan to filter by"),
+    pagination: PaginationParams = Depends(PaginationParams),
 ):
     logger.info(f"Getting vlans")
+    query = db.query(ProxVlanModel)
     if prox_node_id:
         prox_node = db.query(ProxNodeModel).filter(ProxNodeModel.id == prox_node_id).first()
         if not prox_node:
             logger.warning(f"Prox node not found: {prox_node_id}")
             return Response(status_code=status.HTTP_204_NO_CONTENT)
-        vlans = db.query(ProxVlanModel).filter(ProxVlanModel.prox_node_id == prox_node_id).all()
+        query = query.filter(ProxVlanModel.prox_node_id == prox_node_id)
     elif vlan_id:
-        vlans = db.query(ProxVlanModel).filter(ProxVlanModel.id == vlan_id).first()
-    else:
-        vlans = db.query(ProxVlanModel).all()
+        query = query.filter(ProxVlanModel.id == vlan_id)
+    query = paginate(query, ProxVlanModel.id, pagination)
+    if pagination.stream:
+        return stream_ndjson(query)
+    vlans = query.all()
     vlans_list = [vlan.to_dict() for vlan in vlans]
-    return JSONResponse(content=vlans_list, status_code=status.HTTP_200_OK)
+    return JSONResponse(content=vlans_list, status_code=status.HTTP_200_OK, headers=pagination_headers(vlans, pagination))
 
 
 @prox_vlan_router.post(
@@ -1,45 +1,127 @@
-from fastapi import APIRouter, Path, Query, Body, status
-from fastapi.responses import JSONResponse, Response
+import asyncio
+import json
+import time
+from fastapi import APIRouter, Path, Query, Body, Depends, Request, status
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from proxmox.lxc import get_lxc, create_lxc, delete_lxc, change_status_lxc
-from utils.size_changes import bytes_to_gb
+from config.vars import env
+from db.session import get_async_db
+from models import ProxContainerModel, ProxNodeModel
+from proxmox.lxc import get_lxc, get_lxc_inventory, format_lxc, create_lxc, delete_lxc, change_status_lxc, start_lxc_batch
+from proxmox.events import container_events
+from proxmox.init import clusters
+from proxmox.inventory import inventory_reconciler
+from proxmox.nodes import get_node_names
+from proxmox.tasks import task_registry
 from utils.logs import logger
-from schemas.proxmox.lxc import LXCStatus, LXCConfig, LXCStatusChange
+from schemas.proxmox.lxc import LXCStatus, LXCConfig, LXCStatusChange, LXCBatchRequest
+from schemas.proxmox.task import TaskSchema
 
 
 lxc_containers = APIRouter()
 
 
+@lxc_containers.get(
+    "/proxmox/lxc",
+    tags=["proxmox"],
+    summary="Get all LXC containers in the cluster",
+    description="Get all LXC containers across every node of the cluster, optionally filtered by status. Nodes that are offline or missing from the cluster are reported in `errors`",
+)
+async def get_cluster_lxc_containers(
+    lxc_status: Optional[LXCStatus] = Query(None, description="Filter containers by status (running or stopped)")
+):
+    containers, errors = await get_lxc_inventory(await get_node_names(), lxc_status)
+    if not containers and not errors:
+        logger.info("No containers match the filter, returning 204")
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    return JSONResponse(content={"containers": containers, "errors": errors}, status_code=status.HTTP_200_OK)
+
+
+@lxc_containers.get(
+    "/proxmox/lxc/events",
+    tags=["proxmox"],
+    summary="Stream LXC container status changes",
+    description="Server-sent events stream of LXC container changes, optionally filtered by node, vmid or project (PVE tag `project-<id>`). Sends a `snapshot` event with the matching containers, then an `added`, `changed` or `removed` event for each change. All clients share a single Proxmox poller",
+)
+async def stream_lxc_events(
+    request: Request,
+    proxmox_node: Optional[str] = Query(None, alias="node", description="Only send changes of containers on this node"),
+    vmid: Optional[int] = Query(None, description="Only send changes of this container"),
+    project_id: Optional[int] = Query(None, description="Only send changes of containers tagged with this project"),
+):
+    subscription = await container_events.subscribe(proxmox_node, vmid, project_id)
+
+    async def events():
+        try:
+            yield f"event: snapshot\ndata: {json.dumps(container_events.snapshot(subscription))}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), float(env["SSE_KEEPALIVE_INTERVAL"]))
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            await container_events.unsubscribe(subscription)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@lxc_containers.post(
+    "/proxmox/lxc/batch",
+    tags=["proxmox"],
+    summary="Change many LXC containers at once",
+    description="Start, stop, shut down, reboot or delete many LXC containers in one call. Returns a batch task right away; requests are then sent with a per-node concurrency limit and a global rate limit, and the batch task lists each started task in `tasks` and each item that could not be started in `errors`. It stops once every item has failed or its task has stopped",
+    response_model=TaskSchema,
+)
+async def batch_lxc_containers(batch: LXCBatchRequest = Body(..., description="The LXC containers to change")):
+    batch_task = start_lxc_batch(batch.items)
+    return JSONResponse(content=batch_task, status_code=status.HTTP_202_ACCEPTED)
+
+
 @lxc_containers.get(
     "/proxmox/{proxmox_node}/lxc",
     tags=["proxmox"],
     summary="Get all LXC containers for a given node",
-    description="Get all LXC containers for a given node, optionally filtered by status",
+    description="Get all LXC containers for a given node, optionally filtered by status. Served from the inventory mirror, whose age in seconds for the node's cluster is sent in the `Age` header, unless `live` is set or the node is not in the mirror",
 )
-def get_lxc_containers(
+async def get_lxc_containers(
     proxmox_node: str = Path(..., description="The name of the Proxmox node"),
-    lxc_status: Optional[LXCStatus] = Query(None, description="Filter containers by status (running or stopped)")
+    lxc_status: Optional[LXCStatus] = Query(None, description="Filter containers by status (running or stopped)"),
+    live: bool = Query(False, description="Read the containers from Proxmox instead of the inventory mirror"),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    containers = get_lxc(proxmox_node)
-    logger.info(f"Retrieved {len(containers)} containers from Proxmox")
-    logger.info(f"Filtering with status: {lxc_status}")
-    filtered_containers = []
-    for container in containers:
-        container_status = container["status"].lower()
-        if lxc_status is None or container_status == lxc_status:
-            filtered_containers.append({
-                "name": container["name"],
-                "vmid": container["vmid"],
-                "type": container["type"],
-                "status": container_status,
-                "cpus": container["cpus"],
-                "maxmem_gb": bytes_to_gb(container["maxmem"]),
-                "maxdisk_gb": bytes_to_gb(container["maxdisk"])
-            })
+    prox_node_id = None
+    synced_at = inventory_reconciler.synced_at(clusters.cluster_for_node(proxmox_node))
+    if not live and synced_at is not None:
+        prox_node_id = await db.scalar(select(ProxNodeModel.id).where(ProxNodeModel.name == proxmox_node))
+    if prox_node_id is not None:
+        logger.info(f"Retrieving containers for node {proxmox_node} from the inventory mirror")
+        query = select(ProxContainerModel).where(ProxContainerModel.prox_node_id == prox_node_id)
+        if lxc_status is not None:
+            query = query.where(ProxContainerModel.status == lxc_status.value)
+        containers = (await db.scalars(query.order_by(ProxContainerModel.vmid))).all()
+        filtered_containers = [container.to_dict() for container in containers]
+        headers = {
+            "X-Inventory-Source": "mirror",
+            "Age": str(int(time.time() - synced_at)),
+        }
+    else:
+        containers = await get_lxc(proxmox_node)
+        logger.info(f"Retrieved {len(containers)} containers from Proxmox")
+        logger.info(f"Filtering with status: {lxc_status}")
+        filtered_containers = [
+            format_lxc(container)
+            for container in containers
+            if lxc_status is None or container["status"].lower() == lxc_status
+        ]
+        headers = {"X-Inventory-Source": "live"}
     if not filtered_containers:
         logger.info("No containers match the filter, returning 204")
-        return Response(status_code=status.HTTP_204_NO_CONTENT)
-    return JSONResponse(content=filtered_containers, status_code=status.HTTP_200_OK)
+        return Response(status_code=status.HTTP_204_NO_CONTENT, headers=headers)
+    return JSONResponse(content=filtered_containers, status_code=status.HTTP_200_OK, headers=headers)
 
 
 @lxc_containers.get(
@@ -48,11 +130,11 @@ def get_lxc_containers(
     summary="Get specific information for a LXC container",
     description="Get name, architecture, OS type, and network information for a specific LXC container",
 )
-def get_lxc_container_config(
+async def get_lxc_container_config(
     proxmox_node: str = Path(..., description="The name of the Proxmox node"),
     vmid: int = Path(..., description="The ID of the LXC container")
 ):
-    container = get_lxc(proxmox_node, vmid)
+    container = await get_lxc(proxmox_node, vmid)
     net0_info = dict(item.split("=") for item in container["net0"].split(","))
     filtered_container = {
         "name": container["hostname"],
@@ -70,40 +152,46 @@ def get_lxc_container_config(
     "/proxmox/{proxmox_node}/lxc",
     tags=["proxmox"],
     summary="Create a new LXC container",
-    description="Create a new LXC container",
+    description="Create a new LXC container. Returns the Proxmox task tracking the creation, see `/proxmox/tasks/{task_id}`",
+    response_model=TaskSchema,
 )
-def create_lxc_container(
+async def create_lxc_container(
     proxmox_node: str = Path(..., description="The name of the Proxmox node"),
     lxc_config: LXCConfig = Body(..., description="The configuration of the LXC container")
 ):
-    create_lxc(proxmox_node, lxc_config)
-    return Response(status_code=status.HTTP_201_CREATED)
+    upid = await create_lxc(proxmox_node, lxc_config)
+    task = task_registry.track(proxmox_node, upid, "create", lxc_config.vmid)
+    return JSONResponse(content=task, status_code=status.HTTP_202_ACCEPTED)
 
 
 @lxc_containers.delete(
     "/proxmox/{proxmox_node}/lxc/{vmid}",
     tags=["proxmox"],
     summary="Delete a LXC container",
-    description="Delete a LXC container",
+    description="Delete a LXC container. Returns the Proxmox task tracking the deletion, see `/proxmox/tasks/{task_id}`",
+    response_model=TaskSchema,
 )
-def delete_lxc_container(
+async def delete_lxc_container(
     proxmox_node: str = Path(..., description="The name of the Proxmox node"),
     vmid: int = Path(..., description="The ID of the LXC container")
 ):
-    delete_lxc(proxmox_node, vmid)
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
+    upid = await delete_lxc(proxmox_node, vmid)
+    task = task_registry.track(proxmox_node, upid, "delete", vmid)
+    return JSONResponse(content=task, status_code=status.HTTP_202_ACCEPTED)
 
 
 @lxc_containers.post(
     "/proxmox/{proxmox_node}/lxc/{vmid}",
     tags=["proxmox"],
     summary="Change the status of a LXC container",
-    description="Change the status of a LXC container",
+    description="Change the status of a LXC container. Returns the Proxmox task tracking the change, see `/proxmox/tasks/{task_id}`",
+    response_model=TaskSchema,
 )
-def change_status_lxc_container(
+async def change_status_lxc_container(
     proxmox_node: str = Path(..., description="The name of the Proxmox node"),
     vmid: int = Path(..., description="The ID of the LXC container"),
     lxc_status: LXCStatusChange = Query(..., description="The new status of the LXC container")
 ):
-    change_status_lxc(proxmox_node, vmid, lxc_status)
-    return Response(status_code=status.HTTP_200_OK)
+    upid = await change_status_lxc(proxmox_node, vmid, lxc_status)
+    task = task_registry.track(proxmox_node, upid, lxc_status.value, vmid)
+    return JSONResponse(content=task, status_code=status.HTTP_202_ACCEPTED)
@@ -1,29 +1,68 @@
-from fastapi import APIRouter, status, HTTPException, Path, Body, Query
+from fastapi import APIRouter, status, HTTPException, Path, Body, Query, Depends
 from fastapi.responses import JSONResponse, Response
 from typing import Optional
-from proxmox.network import get_network_devices, create_network_devices, reload_network_config, remove_network_device
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.session import get_async_db
+from models import ProxNodeModel
+from proxmox.network import NETWORK_FIELDS, get_network_devices, filter_network_devices, query_network_devices, create_network_devices, remove_network_device, apply_network_batch, network_reloads
+from proxmox.nodes import get_node_names
 from utils.logs import logger
-from schemas.proxmox.network import NetworkType, CreateNetworkRequest
+from schemas.proxmox.network import NetworkType, CreateNetworkRequest, NetworkBatchRequest
 
 
 network_devices = APIRouter()
 
 
+@network_devices.get(
+    "/proxmox/network",
+    tags=["proxmox"],
+    summary="Get the network interfaces of many nodes",
+    description="Get the network interfaces of every node of a region, or of the whole cluster, optionally filtered by interface type, VLAN awareness or state and projected to some fields. Nodes that are offline or missing from the cluster are reported in `errors`",
+)
+async def get_network_interfaces(
+    region_id: Optional[int] = Query(None, description="Only query the nodes of this region"),
+    interface_type: Optional[NetworkType] = Query(None, description="Filter interfaces by type"),
+    vlan_aware: Optional[bool] = Query(None, description="Filter bridges by VLAN awareness"),
+    active: Optional[bool] = Query(None, description="Filter interfaces by state"),
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to include in the response"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    if region_id is not None:
+        nodes = (await db.scalars(
+            select(ProxNodeModel.name).where(ProxNodeModel.region_id == region_id).order_by(ProxNodeModel.id)
+        )).all()
+        if not nodes:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"No nodes found for region: {region_id}")
+    else:
+        nodes = await get_node_names()
+    interfaces, errors = await query_network_devices(
+        nodes,
+        interface_type.value if interface_type else None,
+        fields.split(",") if fields else None,
+        vlan_aware,
+        active
+    )
+    if not interfaces and not errors:
+        logger.info("No interfaces match the filter, returning 204")
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    return JSONResponse(content={"interfaces": interfaces, "errors": errors}, status_code=status.HTTP_200_OK)
+
+
 @network_devices.get(
     "/proxmox/{proxmox_node}/network",
     tags=["proxmox"],
     summary="Get the network interfaces for a given node",
-    description="Get the network interfaces for a given node, optionally filtered by interface type",
+    description="Get the network interfaces for a given node, optionally filtered by interface type, VLAN awareness or state",
 )
-def get_network(
+async def get_network(
     proxmox_node: str = Path(..., description="The name of the node to retrieve the interfaces from (e.g., 'pve', 'node01')"),
-    interface_type: Optional[NetworkType] = Query(None, description="Filter interfaces by type")
+    interface_type: Optional[NetworkType] = Query(None, description="Filter interfaces by type"),
+    vlan_aware: Optional[bool] = Query(None, description="Filter bridges by VLAN awareness"),
+    active: Optional[bool] = Query(None, description="Filter interfaces by state"),
 ):
-    network_devices = get_network_devices(proxmox_node)
-    if interface_type:
-        filtered_devices = [device for device in network_devices if device.get('type') == interface_type]
-        return JSONResponse(content=filtered_devices)
-    return JSONResponse(content=network_devices)
+    network_devices = await get_network_devices(proxmox_node, interface_type.value if interface_type else None)
+    return JSONResponse(content=filter_network_devices(network_devices, vlan_aware=vlan_aware, active=active))
 
 
 @network_devices.get(
@@ -32,40 +71,32 @@ def get_network(
     summary="Get specific network interfaces for a given node",
     description="Get network interfaces of a specific type (vlan, bridge, alias) for a given node with specific fields",
 )
-def get_specific_interfaces(
+async def get_specific_interfaces(
     proxmox_node: str = Path(..., description="The name of the node to retrieve the interfaces from (e.g., 'pve', 'node01')"),
     interface_type: str = Path(..., description="Type of interface to retrieve (vlan, bridge, alias)"),
     fields: Optional[str] = Query(None, description="Comma-separated list of fields to include in the response")
 ):
-    if interface_type not in ["vlan", "bridge", "alias"]:
+    if interface_type not in NETWORK_FIELDS:
         logger.error(f"Invalid interface type: {interface_type}. Must be 'vlan', 'bridge', or 'alias'.")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid interface type. Must be 'vlan', 'bridge', or 'alias'.")
-    interfaces = get_network_devices(proxmox_node, interface_type=interface_type)
-    valid_fields = {
-        "vlan": ["vlan-id", "iface", "type"],
-        "bridge": ["iface", "cidr", "type", "bridge_ports"],
-        "alias": ["iface", "cidr", "type"]
-    }
+    valid_fields = NETWORK_FIELDS[interface_type]
     if fields:
         logger.info(f"Requested fields: {fields}")
         requested_fields = fields.split(',')
-        invalid_fields = [field for field in requested_fields if field not in valid_fields[interface_type]]
+        invalid_fields = [field for field in requested_fields if field not in valid_fields]
         if invalid_fields:
-            logger.error(f"Invalid fields for {interface_type} interface: {', '.join(invalid_fields)}. Valid fields are: {', '.join(valid_fields[interface_type])}")
+            logger.error(f"Invalid fields for {interface_type} interface: {', '.join(invalid_fields)}. Valid fields are: {', '.join(valid_fields)}")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid fields for {interface_type} interface: {', '.join(invalid_fields)}. Valid fields are: {', '.join(valid_fields[interface_type])}"
+                detail=f"Invalid fields for {interface_type} interface: {', '.join(invalid_fields)}. Valid fields are: {', '.join(valid_fields)}"
             )
         fields_to_include = requested_fields
     else:
         logger.info(f"No fields requested. Using all fields for {interface_type} interface.")
-        fields_to_include = valid_fields[interface_type]
-    filtered_interfaces = [
-        {field: interface.get(field) for field in fields_to_include if interface.get(field) is not None}
-        for interface in interfaces
-    ]
-    logger.info(f"Filtered interfaces: {filtered_interfaces}")
-    filtered_interfaces = [interface for interface in filtered_interfaces if interface]
+        fields_to_include = valid_fields
+    interfaces = await get_network_devices(proxmox_node, interface_type=interface_type)
+    filtered_interfaces = filter_network_devices(interfaces, fields_to_include)
+    logger.debug("Filtered interfaces: %s", filtered_interfaces)
     if not filtered_interfaces:
         logger.info(f"No {interface_type} interfaces found.")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -78,11 +109,11 @@ def get_specific_interfaces(
     summary="Create a new network interface for a given node",
     description="Create a new network interface for a given node with specific fields",
 )
-def create_network(
+async def create_network(
     network_data: CreateNetworkRequest = Body(...),
     proxmox_node: str = Path(..., description="The name of the node to create the interface on"),
 ):
-    create_network_devices(
+    await create_network_devices(
         proxmox_node,
         network_data.iface,
         network_data.type,
@@ -91,20 +122,44 @@ def create_network(
         network_data.address,
         network_data.netmask
     )
-    reload_network_config(proxmox_node)
+    await network_reloads.reload(proxmox_node)
     return JSONResponse(content={"message": "Network device created successfully"}, status_code=status.HTTP_201_CREATED)
 
 
+@network_devices.post(
+    "/proxmox/{proxmox_node}/network/batch",
+    tags=["proxmox"],
+    summary="Create and delete many network interfaces for a given node",
+    description="Create and delete many network interfaces for a given node in order, then reload the network config of the node once. Returns the result of each item, whether the network config was reloaded and, if the reload failed, why in `reload_error`",
+)
+async def batch_network(
+    batch: NetworkBatchRequest = Body(..., description="The network changes to apply"),
+    proxmox_node: str = Path(..., description="The name of the node to apply the changes to"),
+):
+    results, reloaded, reload_error = await apply_network_batch(proxmox_node, batch.items)
+    items = []
+    for item, result in zip(batch.items, results):
+        if isinstance(result, HTTPException):
+            items.append({**item.model_dump(mode="json", exclude_none=True), "applied": False, "detail": result.detail})
+        elif isinstance(result, Exception):
+            logger.error(f"Error applying {item.action.value} of interface {item.iface} on node {proxmox_node}: {result}")
+            items.append({**item.model_dump(mode="json", exclude_none=True), "applied": False, "detail": str(result)})
+        else:
+            items.append({**item.model_dump(mode="json", exclude_none=True), "applied": True, "detail": None})
+    logger.info(f"Network batch applied {sum(item['applied'] for item in items)} of {len(items)} changes to node {proxmox_node}")
+    return JSONResponse(content={"reloaded": reloaded, "reload_error": reload_error, "items": items}, status_code=status.HTTP_200_OK)
+
+
 @network_devices.delete(
     "/proxmox/{proxmox_node}/network/{interface_name}",
     tags=["proxmox"],
     summary="Delete a network interface for a given node",
     description="Delete a network interface for a given node",
 )
-def remove_network(
+async def remove_network(
     proxmox_node: str = Path(..., description="The name of the node to delete the interface from (e.g., 'pve', 'node01')"),
     interface_name: str = Path(..., description="The name of the interface to delete (e.g., 'eth0', 'enp3s0f1.101')")
 ):
-    remove_network_device(proxmox_node, interface_name)
-    reload_network_config(proxmox_node)
+    await remove_network_device(proxmox_node, interface_name)
+    await network_reloads.reload(proxmox_node)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
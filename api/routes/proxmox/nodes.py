@@ -12,5 +12,5 @@ pve_nodes = APIRouter()
     summary="Get the nodes",
     description="Get the nodes",
 )
-def read_root():
-    return JSONResponse(content=get_nodes())
+async def read_root():
+    return JSONResponse(content=await get_nodes())
@@ -0,0 +1,71 @@
+import json
+from fastapi import APIRouter, HTTPException, Path, Query, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from config.vars import env
+from proxmox.tasks import task_registry
+from schemas.proxmox.task import TaskSchema
+
+
+pve_tasks = APIRouter()
+
+
+def get_task_or_404(task_id: str) -> dict:
+    task = task_registry.get(task_id)
+    if task is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Task {task_id} not found")
+    return task
+
+
+@pve_tasks.get(
+    "/proxmox/tasks/{task_id}",
+    tags=["proxmox"],
+    summary="Get a Proxmox task",
+    description="Get the status of a long-running Proxmox operation started by the API",
+    response_model=TaskSchema,
+)
+async def get_task(task_id: str = Path(..., description="The ID of the task")):
+    return JSONResponse(content=get_task_or_404(task_id), status_code=status.HTTP_200_OK)
+
+
+@pve_tasks.get(
+    "/proxmox/tasks/{task_id}/wait",
+    tags=["proxmox"],
+    summary="Wait for a Proxmox task",
+    description="Long-poll a Proxmox task. Returns as soon as the task stops, or its current status once `timeout` expires",
+    response_model=TaskSchema,
+)
+async def wait_task(
+    task_id: str = Path(..., description="The ID of the task"),
+    timeout: float = Query(30, ge=0, le=120, description="Max seconds to wait for the task to stop"),
+):
+    get_task_or_404(task_id)
+    task = await task_registry.wait(task_id, timeout)
+    if task is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Task {task_id} not found")
+    return JSONResponse(content=task, status_code=status.HTTP_200_OK)
+
+
+@pve_tasks.get(
+    "/proxmox/tasks/{task_id}/events",
+    tags=["proxmox"],
+    summary="Stream a Proxmox task",
+    description="Server-sent events stream of a Proxmox task. Sends the current status, then the final status once the task stops",
+)
+async def stream_task(request: Request, task_id: str = Path(..., description="The ID of the task")):
+    task = get_task_or_404(task_id)
+
+    async def events():
+        current = task
+        yield f"event: task\ndata: {json.dumps(current)}\n\n"
+        while current["status"] == "running":
+            if await request.is_disconnected():
+                return
+            current = await task_registry.wait(task_id, float(env["SSE_KEEPALIVE_INTERVAL"]))
+            if current is None:
+                return
+            if current["status"] == "running":
+                yield ": keepalive\n\n"
+            else:
+                yield f"event: task\ndata: {json.dumps(current)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -1,11 +1,17 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Path, Body
+from fastapi import APIRouter, HTTPException, status, Depends, Path, Body, Request
 from fastapi.responses import JSONResponse, Response
-from sqlalchemy.orm import Session
+from sqlalchemy import select, delete
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert
 from typing import List
-from db.session import get_db
+from db.session import get_async_db
 from utils.logs import logger
+from utils.etag import bump_table_versions, table_etag, not_modified
+from utils.pagination import paginate, pagination_headers, stream_ndjson_async
 from models import ServerImageModel, ServiceModel, RegionModel, RegionImageModel
 from schemas.servers.image import ServerImageSchema, ServerImageCreateSchema, ServerImageUpdateSchema
+from schemas.common.pagination import PaginationParams
 
 
 server_image_router = APIRouter()
@@ -17,16 +23,27 @@ server_image_router = APIRouter()
     summary="Get all server images",
     response_model=List[ServerImageSchema],
 )
-def get_server_images(
-    db: Session = Depends(get_db)
+async def get_server_images(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    pagination: PaginationParams = Depends(PaginationParams),
 ):
     logger.info("Getting all server images")
-    server_images = db.query(ServerImageModel).all()
+    etag = await table_etag(request, db, ServerImageModel.__tablename__)
+    if response := not_modified(request, etag):
+        return response
+    query = select(ServerImageModel).options(selectinload(ServerImageModel.regions))
+    query = paginate(query, ServerImageModel.id, pagination)
+    if pagination.stream:
+        response = stream_ndjson_async(query)
+        response.headers["ETag"] = etag
+        return response
+    server_images = (await db.scalars(query)).all()
     if not server_images:
         logger.warning("No server images found")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     server_image_list = [server_image.to_dict() for server_image in server_images]
-    return JSONResponse(server_image_list)
+    return JSONResponse(server_image_list, headers={"ETag": etag, **pagination_headers(server_images, pagination)})
 
 
 @server_image_router.get(
@@ -35,21 +52,29 @@ def get_server_images(
     summary="Get a server image by Service ID",
     response_model=ServerImageSchema,
 )
-def get_server_image_by_service_id(
+async def get_server_image_by_service_id(
+    request: Request,
     service_id: int = Path(..., description="The ID of the service"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     logger.info(f"Getting server image for service ID: {service_id}")
-    service = db.query(ServiceModel).filter(ServiceModel.id == service_id).first()
+    etag = await table_etag(request, db, ServiceModel.__tablename__, ServerImageModel.__tablename__)
+    if response := not_modified(request, etag):
+        return response
+    service = await db.scalar(select(ServiceModel).where(ServiceModel.id == service_id))
     if not service:
         logger.warning(f"No service found for ID: {service_id}")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
-    server_images = db.query(ServerImageModel).filter(ServerImageModel.service_id == service_id).all()
+    server_images = (await db.scalars(
+        select(ServerImageModel)
+        .options(selectinload(ServerImageModel.regions))
+        .where(ServerImageModel.service_id == service_id)
+    )).all()
     if not server_images:
         logger.warning(f"No server image found for service ID: {service_id}")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     server_images_list = [server_image.to_dict() for server_image in server_images]
-    return JSONResponse(content=server_images_list)
+    return JSONResponse(content=server_images_list, headers={"ETag": etag})
 
 
 @server_image_router.post(
@@ -58,30 +83,36 @@ def get_server_image_by_service_id(
     summary="Create a server image",
     response_model=ServerImageSchema,
 )
-def create_server_image(
+async def create_server_image(
     server_image: ServerImageCreateSchema,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    logger.info(f"Creating server image: {server_image}")
-    service = db.query(ServiceModel).filter(ServiceModel.id == server_image.service_id).first()
+    logger.info(f"Creating server image {server_image.name} {server_image.version} for service: {server_image.service_id}")
+    service = await db.scalar(select(ServiceModel).where(ServiceModel.id == server_image.service_id))
     if not service:
         logger.warning(f"No service found for ID: {server_image.service_id}")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
-    new_server_image = ServerImageModel(**server_image.dict())
+    region_ids = set(server_image.regions)
+    found_regions = set(await db.scalars(select(RegionModel.id).where(RegionModel.id.in_(region_ids))))
+    missing_regions = sorted(region_ids - found_regions)
+    if missing_regions:
+        logger.warning(f"No regions found for IDs: {missing_regions}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Regions not found: {missing_regions}")
+    new_server_image = ServerImageModel(**server_image.dict(exclude={"regions"}))
     try:
         db.add(new_server_image)
-        db.flush()
-        for region_id in server_image.regions:
-            region = db.query(RegionModel).filter(RegionModel.id == region_id).first()
-            if not region:
-                logger.warning(f"No region found for ID: {region_id}")
-                return Response(status_code=status.HTTP_204_NO_CONTENT)
-            region_image = RegionImageModel(region_id=region_id, image_id=new_server_image.id)
-            db.add(region_image)
-        db.commit()
-        db.refresh(new_server_image)
+        await db.flush()
+        if region_ids:
+            await db.execute(
+                insert(RegionImageModel)
+                .values([{"region_id": region_id, "image_id": new_server_image.id} for region_id in region_ids])
+                .on_conflict_do_nothing()
+            )
+        await bump_table_versions(db, ServerImageModel.__tablename__)
+        await db.commit()
+        await db.refresh(new_server_image, ["regions"])
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error creating server image: {e}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Error creating server image")
     new_server_image_dict = new_server_image.to_dict()
@@ -95,30 +126,36 @@ def create_server_image(
     summary="Add regions to an existing server image",
     response_model=ServerImageSchema,
 )
-def add_regions_to_server_image(
+async def add_regions_to_server_image(
     server_image_id: int = Path(..., description="The ID of the server image to add regions to"),
     region_ids: List[int] = Body(..., description="The IDs of the regions to add to the server image"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     logger.info(f"Adding regions to server image {server_image_id}")
-    server_image = db.query(ServerImageModel).filter(ServerImageModel.id == server_image_id).first()
+    server_image = await db.scalar(
+        select(ServerImageModel).options(selectinload(ServerImageModel.regions)).where(ServerImageModel.id == server_image_id)
+    )
     if not server_image:
         logger.warning(f"Server image with id {server_image_id} not found")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
-    existing_regions = set(rs.region_id for rs in server_image.regions)
+    new_region_ids = set(region_ids) - {rs.region_id for rs in server_image.regions}
+    found_regions = set(await db.scalars(select(RegionModel.id).where(RegionModel.id.in_(new_region_ids))))
+    missing_regions = sorted(new_region_ids - found_regions)
+    if missing_regions:
+        logger.warning(f"Regions with ids {missing_regions} not found")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Regions not found: {missing_regions}")
     try:
-        for region_id in region_ids:
-            if region_id not in existing_regions:
-                region = db.query(RegionModel).filter(RegionModel.id == region_id).first()
-                if not region:
-                    logger.warning(f"Region with id {region_id} not found")
-                    return Response(status_code=status.HTTP_204_NO_CONTENT)
-                region_image = RegionImageModel(region_id=region_id, image_id=server_image_id)
-                db.add(region_image)
-        db.commit()
-        db.refresh(server_image)
+        if new_region_ids:
+            await db.execute(
+                insert(RegionImageModel)
+                .values([{"region_id": region_id, "image_id": server_image_id} for region_id in new_region_ids])
+                .on_conflict_do_nothing()
+            )
+        await bump_table_versions(db, ServerImageModel.__tablename__)
+        await db.commit()
+        await db.refresh(server_image, ["regions"])
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error adding regions to server image: {str(e)}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error adding regions to server image")
     return JSONResponse(content=server_image.to_dict(), status_code=status.HTTP_200_OK)
@@ -130,25 +167,26 @@ def add_regions_to_server_image(
     summary="Remove regions from an existing server image",
     response_model=ServerImageSchema,
 )
-def remove_regions_from_server_image(
+async def remove_regions_from_server_image(
     server_image_id: int = Path(..., description="The ID of the server image to remove regions from"),
     region_ids: List[int] = Body(..., description="The IDs of the regions to remove from the server image"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     logger.info(f"Removing regions from server image {server_image_id}")
-    server_image = db.query(ServerImageModel).filter(ServerImageModel.id == server_image_id).first()
+    server_image = await db.scalar(select(ServerImageModel).where(ServerImageModel.id == server_image_id))
     if not server_image:
         logger.warning(f"Server image with id {server_image_id} not found")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     try:
-        db.query(RegionImageModel).filter(
+        await db.execute(delete(RegionImageModel).where(
             RegionImageModel.image_id == server_image_id,
             RegionImageModel.region_id.in_(region_ids)
-        ).delete(synchronize_session=False)
-        db.commit()
-        db.refresh(server_image)
+        ))
+        await bump_table_versions(db, ServerImageModel.__tablename__)
+        await db.commit()
+        await db.refresh(server_image, ["regions"])
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error removing regions from server image: {str(e)}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error removing regions from server image")
     return JSONResponse(content=server_image.to_dict(), status_code=status.HTTP_200_OK)
@@ -160,20 +198,21 @@ def remove_regions_from_server_image(
     summary="Update a server image",
     response_model=ServerImageSchema,
 )
-def update_server_image(
+async def update_server_image(
     server_image: ServerImageUpdateSchema,
     server_image_id: int = Path(..., description="The ID of the server image"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     logger.info(f"Updating server image ID: {server_image_id}")
-    server_image_to_update = db.query(ServerImageModel).filter(ServerImageModel.id == server_image_id).first()
+    server_image_to_update = await db.scalar(select(ServerImageModel).where(ServerImageModel.id == server_image_id))
     if not server_image_to_update:
         logger.warning(f"No server image found for ID: {server_image_id}")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     for key, value in server_image.model_dump(exclude_unset=True).items():
         setattr(server_image_to_update, key, value)
-    db.commit()
-    db.refresh(server_image_to_update)
+    await bump_table_versions(db, ServerImageModel.__tablename__)
+    await db.commit()
+    await db.refresh(server_image_to_update)
     logger.info(f"Server image with ID: {server_image_id} updated successfully")
     return ServerImageSchema.model_validate(server_image_to_update.__dict__)
 
@@ -184,16 +223,17 @@ def update_server_image(
     summary="Delete a server image",
     response_model=ServerImageSchema,
 )
-def delete_server_image(
+async def delete_server_image(
     server_image_id: int = Path(..., description="The ID of the server image"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     logger.info(f"Deleting server image with ID: {server_image_id}")
-    server_image_to_delete = db.query(ServerImageModel).filter(ServerImageModel.id == server_image_id).first()
+    server_image_to_delete = await db.scalar(select(ServerImageModel).where(ServerImageModel.id == server_image_id))
     if not server_image_to_delete:
         logger.warning(f"No server image found for ID: {server_image_id}")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
-    db.delete(server_image_to_delete)
-    db.commit()
+    await db.delete(server_image_to_delete)
+    await bump_table_versions(db, ServerImageModel.__tablename__)
+    await db.commit()
     logger.info(f"Server image with ID: {server_image_id} deleted successfully")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
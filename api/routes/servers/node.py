@@ -1,11 +1,17 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Path, Query
 from fastapi.responses import JSONResponse, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
-from db.session import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from db.session import get_db, get_async_db
 from utils.logs import logger
+from utils.pagination import paginate, pagination_headers, stream_ndjson
 from models import ProxNodeModel, RegionModel
+from proxmox.lxc import get_lxc_inventory
+from schemas.proxmox.lxc import LXCStatus
 from schemas.servers.node import ProxNodeSchema, ProxNodeCreateSchema, ProxNodeUpdateSchema
+from schemas.common.pagination import PaginationParams
 
 
 prox_node_router = APIRouter()
@@ -19,19 +25,45 @@ prox_node_router = APIRouter()
 )
 def get_all_nodes(
     db: Session = Depends(get_db),
-    region_id: int | None = Query(default=None, description="The ID of the region to filter by")
+    region_id: int | None = Query(default=None, description="The ID of the region to filter by"),
+    pagination: PaginationParams = Depends(PaginationParams),
 ):
     logger.info(f"Getting nodes")
+    query = db.query(ProxNodeModel)
     if region_id:
         region = db.query(RegionModel).filter(RegionModel.id == region_id).first()
         if not region:
             logger.warning(f"Region not found: {region_id}")
             return Response(status_code=status.HTTP_204_NO_CONTENT)
-        nodes = db.query(ProxNodeModel).filter(ProxNodeModel.region_id == region_id).all()
-    else:
-        nodes = db.query(ProxNodeModel).all()
+        query = query.filter(ProxNodeModel.region_id == region_id)
+    query = paginate(query, ProxNodeModel.id, pagination)
+    if pagination.stream:
+        return stream_ndjson(query)
+    nodes = query.all()
     nodes_list = [node.to_dict() for node in nodes]
-    return JSONResponse(content=nodes_list, status_code=status.HTTP_200_OK)
+    return JSONResponse(content=nodes_list, status_code=status.HTTP_200_OK, headers=pagination_headers(nodes, pagination))
+
+
+@prox_node_router.get(
+    "/server/nodes/{region_id}/lxc",
+    tags=["servers", "nodes"],
+    summary="Get all LXC containers of a region",
+    description="Get all LXC containers across the nodes of a region, optionally filtered by status. Nodes that are offline or missing from the cluster are reported in `errors`",
+)
+async def get_region_lxc_containers(
+    region_id: int = Path(..., description="The ID of the region"),
+    lxc_status: Optional[LXCStatus] = Query(None, description="Filter containers by status (running or stopped)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    logger.info(f"Getting LXC containers for region: {region_id}")
+    nodes = (await db.scalars(select(ProxNodeModel.name).where(ProxNodeModel.region_id == region_id))).all()
+    if not nodes:
+        logger.warning(f"No nodes found for region: {region_id}")
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    containers, errors = await get_lxc_inventory(list(nodes), lxc_status)
+    if not containers and not errors:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    return JSONResponse(content={"containers": containers, "errors": errors}, status_code=status.HTTP_200_OK)
 
 
 @prox_node_router.post(
@@ -49,6 +81,9 @@ def create_node(
     if not region:
         logger.warning(f"Region not found: {node.region_id}")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
+    if db.query(ProxNodeModel).filter(ProxNodeModel.name == node.name).first():
+        logger.warning(f"Node name already exists: {node.name}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Node name already exists")
     node_model = ProxNodeModel(**node.dict())
     try:
         db.add(node_model)
@@ -82,6 +117,9 @@ def update_node(
         if not region:
             logger.warning(f"Region not found: {node_update.region_id}")
             return Response(status_code=status.HTTP_204_NO_CONTENT)
+    if node_update.name and db.query(ProxNodeModel).filter(ProxNodeModel.name == node_update.name, ProxNodeModel.id != node_id).first():
+        logger.warning(f"Node name already exists: {node_update.name}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Node name already exists")
     for key, value in node_update.model_dump(exclude_unset=True).items():
         setattr(node, key, value)
     db.commit()
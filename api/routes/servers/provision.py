@@ -0,0 +1,159 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, status, Depends, Body, Query
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.session import get_async_db
+from utils.logs import logger
+from models import ServerOfferModel, ServerImageModel, ProxNodeModel
+from proxmox.placement import placement_index, PlacementError
+from proxmox.lxc import project_tag
+from proxmox.provision import place_round_robin, provision_lxc
+from proxmox.tasks import task_registry
+from proxmox.init import clusters
+from proxmox.vmids import vmid_allocators
+from schemas.proxmox.lxc import LXCConfig
+from schemas.proxmox.provision import LXCProvisionRequest, PlacementStrategy
+
+
+server_provision_router = APIRouter()
+
+
+@server_provision_router.get(
+    "/server/placement",
+    tags=["servers"],
+    summary="Get the placement of LXC containers",
+    description="Get the nodes of a region where `count` LXC containers sized by a server offer would be placed. Answered from the node capacity snapshot, without calling Proxmox",
+)
+async def get_placement(
+    region_id: int = Query(..., description="The ID of the region"),
+    server_offer_id: int = Query(..., description="The ID of the server offer sizing the LXC containers"),
+    count: int = Query(1, ge=1, le=500, description="The number of LXC containers to place"),
+    strategy: PlacementStrategy = Query(PlacementStrategy.SPREAD, description="The placement strategy, spread or binpack"),
+    storage: Optional[str] = Query(None, description="The storage for the rootfs of the LXC containers, the placement storage by default"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    server_offer = await db.scalar(select(ServerOfferModel).where(ServerOfferModel.id == server_offer_id))
+    if not server_offer:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Server offer not found: {server_offer_id}")
+    try:
+        nodes = placement_index.place(
+            region_id, server_offer.cpu, server_offer.memory, server_offer.storage, count, strategy, storage=storage
+        )
+    except PlacementError as e:
+        logger.warning(f"No placement for region {region_id}: {e}")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return JSONResponse(
+        content={"nodes": nodes, "snapshot_at": placement_index.snapshot_at},
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@server_provision_router.post(
+    "/server/provision",
+    tags=["servers"],
+    summary="Provision LXC containers",
+    description="Create `count` LXC containers sized by a server offer from a server image. Vmids are allocated in bulk and containers are placed on the nodes of the region by capacity. Returns the result of each container and a batch task that stops once every creation has stopped",
+)
+async def provision_servers(
+    provision: LXCProvisionRequest = Body(..., description="The LXC containers to provision"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    logger.info(f"Provisioning {provision.count} servers in region: {provision.region_id}")
+    server_offer = await db.scalar(select(ServerOfferModel).where(ServerOfferModel.id == provision.server_offer_id))
+    if not server_offer:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Server offer not found: {provision.server_offer_id}")
+    server_image = await db.scalar(
+        select(ServerImageModel)
+        .options(selectinload(ServerImageModel.regions))
+        .where(ServerImageModel.id == provision.image_id)
+    )
+    if not server_image or not server_image.available:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Server image not available: {provision.image_id}")
+    if server_image.service_id != server_offer.service_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Server image and server offer belong to different services")
+    if provision.region_id not in [region.region_id for region in server_image.regions]:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Server image not available in region: {provision.region_id}")
+    nodes = (await db.scalars(
+        select(ProxNodeModel.name).where(ProxNodeModel.region_id == provision.region_id).order_by(ProxNodeModel.id)
+    )).all()
+    if not nodes:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"No nodes found for region: {provision.region_id}")
+
+    if placement_index.snapshot_at is None:
+        logger.warning("Placement index not loaded yet, placing containers round-robin")
+        placement = place_round_robin(nodes, provision.count)
+        reserved_at = None
+    else:
+        reserved_at = placement_index.snapshot_at
+        try:
+            placement = placement_index.place(
+                provision.region_id,
+                server_offer.cpu,
+                server_offer.memory,
+                server_offer.storage,
+                provision.count,
+                provision.strategy,
+                reserve=True,
+                storage=provision.storage,
+            )
+        except PlacementError as e:
+            logger.warning(f"No placement for region {provision.region_id}: {e}")
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    vmid_allocator = vmid_allocators[clusters.cluster_for_region(provision.region_id)]
+    try:
+        vmids = await vmid_allocator.allocate(provision.count)
+    except Exception as e:
+        logger.error(f"Error allocating vmids: {e}")
+        if reserved_at is not None:
+            placement_index.release(provision.region_id, placement, server_offer.cpu, server_offer.memory, server_offer.storage, reserved_at)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error allocating vmids: {e}")
+    placements = [
+        (node, LXCConfig(
+            vmid=vmid,
+            hostname=f"{provision.hostname_prefix}-{vmid}",
+            ostemplate=server_image.source,
+            password=provision.password,
+            memory=server_offer.memory,
+            swap=provision.swap,
+            net0=provision.net0,
+            ssh_public_keys=provision.ssh_public_keys,
+            rootfs=f"{provision.storage}:{server_offer.storage}",
+            storage=provision.storage,
+            cores=server_offer.cpu,
+            tags=project_tag(provision.project_id) if provision.project_id is not None else None,
+        ))
+        for node, vmid in zip(placement, vmids)
+    ]
+    results = await provision_lxc(placements)
+
+    items = []
+    failed_vmids = []
+    for (node, lxc_config), result in zip(placements, results):
+        item = {"node": node, "vmid": lxc_config.vmid, "hostname": lxc_config.hostname, "task": None, "detail": None}
+        if isinstance(result, HTTPException):
+            item["detail"] = result.detail
+            failed_vmids.append(lxc_config.vmid)
+        elif isinstance(result, Exception):
+            logger.error(f"Error creating LXC container {lxc_config.vmid} for node {node}: {result}")
+            item["detail"] = str(result)
+            failed_vmids.append(lxc_config.vmid)
+        else:
+            item["task"] = task_registry.track(node, result, "create", lxc_config.vmid)["id"]
+        items.append(item)
+    vmid_allocator.release(failed_vmids)
+    failed_nodes = [item["node"] for item in items if item["task"] is None]
+    if reserved_at is not None and failed_nodes:
+        placement_index.release(provision.region_id, failed_nodes, server_offer.cpu, server_offer.memory, server_offer.storage, reserved_at)
+    provision_task = task_registry.track_group("provision", len(items))
+    for item in items:
+        if item["task"] is not None:
+            task_registry.add_to_group(provision_task["id"], item["task"])
+        else:
+            task_registry.fail_in_group(provision_task["id"], item)
+    provision_task = task_registry.get(provision_task["id"])
+    started = [item["task"] for item in items if item["task"] is not None]
+    logger.info(f"Provisioning started {len(started)} of {provision.count} servers")
+    return JSONResponse(content={"task": provision_task, "items": items}, status_code=status.HTTP_202_ACCEPTED)
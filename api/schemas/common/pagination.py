@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class PaginationParams(BaseModel):
+    limit: Optional[int] = Field(None, ge=1, le=1000, description="The maximum number of items to return")
+    after_id: Optional[int] = Field(None, description="Return only items with an ID greater than this one")
+    stream: bool = Field(False, description="Stream the items as newline delimited JSON")
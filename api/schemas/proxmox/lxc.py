@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -18,6 +19,8 @@ class LXCConfig(BaseModel):
     ssh_public_keys: str = Field(..., description="The SSH public keys of the LXC container")
     rootfs: str = Field(..., description="The rootfs of the LXC container")
     storage: str = Field(..., description="The storage of the LXC container")
+    cores: Optional[int] = Field(None, description="The number of CPU cores of the LXC container")
+    tags: Optional[str] = Field(None, description="The Proxmox tags of the LXC container, separated by ';'")
 
 
 class LXCStatusChange(str, Enum):
@@ -25,3 +28,21 @@ class LXCStatusChange(str, Enum):
     STOP = "stop"
     SHUTDOWN = "shutdown"
     REBOOT = "reboot"
+
+
+class LXCBatchAction(str, Enum):
+    START = "start"
+    STOP = "stop"
+    SHUTDOWN = "shutdown"
+    REBOOT = "reboot"
+    DELETE = "delete"
+
+
+class LXCBatchItem(BaseModel):
+    node: str = Field(..., description="The name of the Proxmox node")
+    vmid: int = Field(..., description="The ID of the LXC container")
+    action: LXCBatchAction = Field(..., description="The action to apply to the LXC container")
+
+
+class LXCBatchRequest(BaseModel):
+    items: List[LXCBatchItem] = Field(..., min_length=1, max_length=5000, description="The LXC containers to change and the action for each one")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from enum import Enum
 
 
@@ -21,3 +21,22 @@ class CreateNetworkRequest(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class NetworkBatchAction(str, Enum):
+    CREATE = "create"
+    DELETE = "delete"
+
+
+class NetworkBatchItem(BaseModel):
+    action: NetworkBatchAction = Field(..., description="The change to apply, create or delete")
+    iface: str = Field(..., description="The name of the interface to create or delete (e.g., 'eth0', 'enp3s0f1.101')")
+    type: Optional[str] = Field(None, description="The type of interface to create (e.g., 'vlan', 'bridge', 'alias'), required to create")
+    vlan_raw_device: Optional[str] = Field(None, description="The raw device to use for VLAN creation (e.g., 'enp3s0f1, eth0')")
+    bridge_ports: Optional[str] = Field(None, description="The bridge ports to use for bridge creation (e.g., 'enp3s0f1.101, eth0.105')")
+    address: Optional[str] = Field(None, description="The IP address to use for the interface (e.g., '10.10.0.1')")
+    netmask: Optional[str] = Field(None, description="The netmask to use for the interface (e.g., '255.255.255.192')")
+
+
+class NetworkBatchRequest(BaseModel):
+    items: List[NetworkBatchItem] = Field(..., min_length=1, max_length=500, description="The network changes to apply, in order")
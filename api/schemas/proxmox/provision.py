@@ -0,0 +1,23 @@
+from enum import Enum
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class PlacementStrategy(str, Enum):
+    BINPACK = "binpack"
+    SPREAD = "spread"
+
+
+class LXCProvisionRequest(BaseModel):
+    server_offer_id: int = Field(..., description="The ID of the server offer sizing the LXC containers")
+    image_id: int = Field(..., description="The ID of the server image used as OS template")
+    region_id: int = Field(..., description="The ID of the region where the LXC containers are placed")
+    project_id: Optional[int] = Field(None, description="The ID of the project owning the LXC containers, set as the PVE tag 'project-<id>'")
+    count: int = Field(..., ge=1, le=500, description="The number of LXC containers to create")
+    hostname_prefix: str = Field(..., description="The hostname prefix, each container is named '<prefix>-<vmid>'")
+    password: str = Field(..., description="The password of the LXC containers")
+    ssh_public_keys: str = Field(..., description="The SSH public keys of the LXC containers")
+    storage: str = Field("local-lvm", description="The storage for the rootfs of the LXC containers")
+    net0: str = Field("name=eth0,bridge=vmbr0,ip=dhcp", description="The network interface of the LXC containers")
+    swap: int = Field(0, description="The swap of the LXC containers in MB")
+    strategy: PlacementStrategy = Field(PlacementStrategy.SPREAD, description="How containers are placed on the nodes of the region, 'spread' favours the emptiest nodes and 'binpack' the fullest ones")
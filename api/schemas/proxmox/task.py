@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class TaskSchema(BaseModel):
+    id: str = Field(..., description="The ID of the task")
+    node: Optional[str] = Field(None, description="The Proxmox node running the task, empty for batch tasks")
+    upid: Optional[str] = Field(None, description="The Proxmox UPID of the task, empty for batch tasks")
+    operation: str = Field(..., description="The operation performed by the task (e.g., 'create', 'delete', 'start', 'batch')")
+    vmid: Optional[int] = Field(None, description="The ID of the LXC container affected by the task")
+    status: str = Field(..., description="The status of the task, running or stopped")
+    exitstatus: Optional[str] = Field(None, description="The exit status of the task once stopped, 'OK' on success")
+    created_at: float = Field(..., description="Unix timestamp of when the task was started")
+    finished_at: Optional[float] = Field(None, description="Unix timestamp of when the task finished")
+    tasks: Optional[List[str]] = Field(None, description="The IDs of the tasks started so far by a batch task")
+    total: Optional[int] = Field(None, description="The number of items of a batch task")
+    succeeded: Optional[int] = Field(None, description="The number of batch items whose task stopped with 'OK'")
+    failed: Optional[int] = Field(None, description="The number of batch items that could not be started or whose task failed")
+    errors: Optional[List[dict]] = Field(None, description="The batch items that could not be started, with the reason in `detail`")
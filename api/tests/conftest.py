@@ -0,0 +1,61 @@
+import json
+import os
+
+os.environ.setdefault("PVE_CLUSTERS", json.dumps({
+    "east": {"host": "http://east.pve.test", "user": "test@pve", "token_name": "test", "token_value": "test", "regions": [1]},
+    "west": {"host": "http://west.pve.test", "user": "test@pve", "token_name": "test", "token_value": "test", "regions": [2]},
+}))
+os.environ.setdefault("PVE_RETRIES", "0")
+os.environ.setdefault("LOG_FORMAT", "text")
+
+import asyncio
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+
+@pytest.fixture
+def database(tmp_path):
+    import db.config as db_config
+    import models
+
+    path = tmp_path / "test.db"
+    db_config.engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    db_config.async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    db_config.SessionLocal.configure(bind=db_config.engine)
+    db_config.AsyncSessionLocal.configure(bind=db_config.async_engine)
+    db_config.Base.metadata.create_all(db_config.engine)
+    yield db_config
+    db_config.engine.dispose()
+    db_config.engine = None
+    db_config.async_engine = None
+
+
+class RecordingTransport(httpx.ASGITransport):
+    def __init__(self, app):
+        super().__init__(app=app)
+        self.requests = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(f"{request.method} {request.url.path.split('/api2/json/', 1)[-1]}")
+        return await super().handle_async_request(request)
+
+
+@pytest.fixture
+def fake_pve():
+    from benchmarks.fake_pve import FakeProxmox, create_app
+    from proxmox.init import clusters
+
+    pve = FakeProxmox(nodes=2, containers_per_node=3, task_durations=["*=fixed:50"], seed=0)
+    transport = RecordingTransport(create_app(pve))
+    for cluster, client in clusters.items():
+        if cluster == "east":
+            client._http_client = httpx.AsyncClient(transport=transport)
+        else:
+            client._http_client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json={"data": []})))
+        client._breakers.clear()
+        for node in pve.nodes:
+            asyncio.run(client.invalidate(f"nodes/{node}"))
+    yield pve, transport
@@ -0,0 +1,36 @@
+import asyncio
+import sys
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+import db.config as db_config
+from config.vars import env
+from db.bootstrap import add_unique_associations
+
+
+def test_unique_associations_are_added_to_existing_tables(database):
+    with database.engine.begin() as connection:
+        connection.execute(text("DROP TABLE region_service"))
+        connection.execute(text("CREATE TABLE region_service (id INTEGER PRIMARY KEY, region_id INTEGER NOT NULL, service_id INTEGER NOT NULL)"))
+        connection.execute(text("INSERT INTO region_service (region_id, service_id) VALUES (1, 1), (1, 1), (1, 2), (1, 1)"))
+
+    add_unique_associations(database.engine)
+    add_unique_associations(database.engine)
+
+    with database.engine.begin() as connection:
+        rows = connection.execute(text("SELECT id, region_id, service_id FROM region_service ORDER BY id")).all()
+        assert [tuple(row) for row in rows] == [(1, 1, 1), (3, 1, 2)]
+        with pytest.raises(IntegrityError):
+            connection.execute(text("INSERT INTO region_service (region_id, service_id) VALUES (1, 2)"))
+
+
+def test_sync_engine_does_not_need_asyncpg(monkeypatch):
+    monkeypatch.setitem(sys.modules, "asyncpg", None)
+    monkeypatch.setitem(env, "DATABASE_CONNECTION_STRING", "puyu:puyu@localhost/puyu")
+    monkeypatch.setattr(db_config, "engine", None)
+    monkeypatch.setattr(db_config, "async_engine", None)
+
+    engine = db_config.init_engines(with_async=False)
+    assert engine.dialect.driver == "psycopg2"
+    assert db_config.async_engine is None
+    asyncio.run(db_config.dispose_engines())
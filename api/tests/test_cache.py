@@ -0,0 +1,101 @@
+import asyncio
+import pytest
+from proxmox.breaker import CircuitBreaker, CLOSED, HALF_OPEN, OPEN
+from proxmox.cache import MemoryCacheBackend, ProxmoxCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr("proxmox.cache.time.time", clock)
+    return clock
+
+
+def counting_loader(values):
+    calls = []
+
+    async def loader():
+        calls.append(None)
+        await asyncio.sleep(0.01)
+        return values[len(calls) - 1]
+
+    return loader, calls
+
+
+def test_stale_entries_are_served_while_refreshing(clock):
+    cache = ProxmoxCache(MemoryCacheBackend(), ttl=10, stale_ttl=60)
+    loader, calls = counting_loader(["v1", "v2"])
+
+    async def run():
+        assert await cache.fetch("cluster", "resources", {}, loader) == "v1"
+        clock.now += 5
+        assert await cache.fetch("cluster", "resources", {}, loader) == "v1"
+        assert len(calls) == 1
+        clock.now += 10
+        assert await cache.fetch("cluster", "resources", {}, loader) == "v1"
+        await asyncio.sleep(0.05)
+        assert len(calls) == 2
+        assert await cache.fetch("cluster", "resources", {}, loader) == "v2"
+        clock.now += 100
+        with pytest.raises(IndexError):
+            await cache.fetch("cluster", "resources", {}, loader)
+
+    asyncio.run(run())
+
+
+def test_concurrent_misses_share_one_load(clock):
+    cache = ProxmoxCache(MemoryCacheBackend(), ttl=10, stale_ttl=60)
+    loader, calls = counting_loader(["v1"])
+
+    async def run():
+        values = await asyncio.gather(*(cache.fetch("node01", "network", {}, loader) for _ in range(10)))
+        assert values == ["v1"] * 10
+        assert len(calls) == 1
+
+    asyncio.run(run())
+
+
+def test_loads_started_before_an_invalidation_are_not_stored(clock):
+    cache = ProxmoxCache(MemoryCacheBackend(), ttl=10, stale_ttl=60)
+    loader, calls = counting_loader(["before", "after"])
+
+    async def run():
+        loading = asyncio.ensure_future(cache.fetch("node01", "network", {}, loader))
+        await asyncio.sleep(0)
+        await cache.invalidate("node01")
+        assert await loading == "before"
+        assert await cache.fetch("node01", "network", {}, loader) == "after"
+        assert len(calls) == 2
+
+    asyncio.run(run())
+
+
+def test_breaker_opens_then_lets_one_trial_through(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr("proxmox.breaker.time.monotonic", clock)
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=10)
+
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    clock.now += 10
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    clock.now += 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
@@ -0,0 +1,52 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from proxmox.init import clusters
+from proxmox.lxc import get_lxc, delete_lxc, change_status_lxc
+from proxmox.nodes import get_nodes, get_node_names
+from proxmox.tasks import TaskRegistry
+from schemas.proxmox.lxc import LXCStatusChange
+
+
+def test_lxc_lifecycle_against_the_simulator(fake_pve):
+    pve, transport = fake_pve
+    registry = TaskRegistry(clusters, min_interval=0.01, max_interval=0.05, retention=3600, max_poll_errors=3)
+
+    async def vmids(proxmox_node: str):
+        return sorted(container["vmid"] for container in await get_lxc(proxmox_node))
+
+    async def run():
+        assert await vmids("node01") == [100, 101, 102]
+        assert await vmids("node02") == [103, 104, 105]
+        assert transport.requests.count("GET cluster/resources") == 1
+
+        task = registry.track("node01", await delete_lxc("node01", 100), "delete", 100)
+        assert pve.containers[100]["lock"] == "destroyed"
+        with pytest.raises(HTTPException) as error:
+            await change_status_lxc("node01", 100, LXCStatusChange.STOP)
+        assert error.value.status_code == 500
+        assert (await registry.wait(task["id"], 2))["exitstatus"] == "OK"
+        assert await vmids("node01") == [101, 102]
+        assert transport.requests.count("GET cluster/resources") == 2
+
+        pve.task_failure_rate = 1
+        task = registry.track("node01", await delete_lxc("node01", 101), "delete", 101)
+        assert (await registry.wait(task["id"], 2))["exitstatus"] == "simulated task failure"
+        assert pve.containers[101]["lock"] is None
+        pve.task_failure_rate = 0
+        task = registry.track("node01", await change_status_lxc("node01", 101, LXCStatusChange.STOP), "stop", 101)
+        assert (await registry.wait(task["id"], 2))["exitstatus"] == "OK"
+        assert pve.containers[101]["status"] == "stopped"
+        await registry.stop()
+
+    asyncio.run(run())
+
+
+def test_nodes_keep_the_cluster_config_fields(fake_pve):
+    async def run():
+        nodes = await get_nodes()
+        assert [node["node"] for node in nodes] == ["node01", "node02"]
+        assert {"name", "nodeid", "quorum_votes", "ring0_addr"} <= nodes[0].keys()
+        assert await get_node_names() == ["node01", "node02"]
+
+    asyncio.run(run())
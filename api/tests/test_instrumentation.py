@@ -0,0 +1,18 @@
+import asyncio
+from utils.instrumentation import RequestStats, create_detached_task, record_pve_call, request_stats
+
+
+def test_detached_tasks_do_not_record_into_the_request():
+    async def run():
+        stats = RequestStats()
+        request_stats.set(stats)
+        record_pve_call(0.1)
+
+        async def background():
+            record_pve_call(0.1)
+            return request_stats.get()
+
+        assert await create_detached_task(background()) is None
+        assert stats.pve_calls == 1
+
+    asyncio.run(run())
@@ -0,0 +1,115 @@
+import asyncio
+import httpx
+from sqlalchemy import select
+from models import RegionModel, ProxNodeModel, ProxContainerModel
+from proxmox.events import ContainerEventBroker, ContainerSubscription
+from proxmox.init import clusters
+from proxmox.inventory import inventory_reconciler
+
+
+def lxc(node: str, vmid: int) -> dict:
+    return {"type": "lxc", "node": node, "vmid": vmid, "name": f"ct{vmid}", "status": "running", "maxcpu": 1, "maxmem": 1024, "maxdisk": 2048}
+
+
+def mock_clusters(resources: dict):
+    def handler_for(cluster: str):
+        def handler(request: httpx.Request) -> httpx.Response:
+            if resources[cluster] is None:
+                return httpx.Response(500, json={"data": None})
+            return httpx.Response(200, json={"data": resources[cluster]})
+        return handler
+
+    for cluster, client in clusters.items():
+        client._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler_for(cluster)))
+
+
+def seed_nodes(db_config):
+    with db_config.SessionLocal() as db:
+        db.add_all([RegionModel(id=1, name="east", logo="east.svg", available=True), RegionModel(id=2, name="west", logo="west.svg", available=True)])
+        db.add_all([
+            ProxNodeModel(name="east-1", private_network_interface="vmbr1", public_network_interface="vmbr0", region_id=1),
+            ProxNodeModel(name="west-1", private_network_interface="vmbr1", public_network_interface="vmbr0", region_id=2),
+        ])
+        db.commit()
+
+
+def test_sync_keeps_containers_of_unreachable_cluster(database):
+    seed_nodes(database)
+    resources = {"east": [lxc("east-1", 100), lxc("east-1", 101)], "west": [lxc("west-1", 200)]}
+    mock_clusters(resources)
+
+    async def sync_vmids():
+        await inventory_reconciler.sync()
+        async with database.AsyncSessionLocal() as db:
+            return set(await db.scalars(select(ProxContainerModel.vmid)))
+
+    async def run():
+        await clusters.load_nodes()
+        assert await sync_vmids() == {100, 101, 200}
+        resources["east"] = [lxc("east-1", 100)]
+        resources["west"] = None
+        assert await sync_vmids() == {100, 200}
+        resources["west"] = []
+        assert await sync_vmids() == {100}
+
+    asyncio.run(run())
+
+
+def test_events_keep_snapshot_of_unreachable_cluster():
+    resources = {"east": [lxc("east-1", 100)], "west": [lxc("west-1", 200)]}
+    mock_clusters(resources)
+    broker = ContainerEventBroker(interval=1, max_events=10)
+    subscription = ContainerSubscription(None, None, None, 10)
+    broker._subscriptions.add(subscription)
+
+    def events():
+        queue = subscription.queue
+        return [(event["event"], event["vmid"]) for event in (queue.get_nowait() for _ in range(queue.qsize()))]
+
+    async def run():
+        await broker._poll()
+        resources["west"] = None
+        await broker._poll()
+        assert events() == []
+        assert {container["vmid"] for container in broker.snapshot(subscription)} == {100, 200}
+        resources["west"] = [lxc("west-1", 200), lxc("west-1", 201)]
+        await broker._poll()
+        assert events() == [("added", 201)]
+
+    asyncio.run(run())
+
+
+def test_subscribe_while_last_subscriber_leaves_starts_a_poller():
+    mock_clusters({"east": [lxc("east-1", 100)], "west": []})
+    broker = ContainerEventBroker(interval=60, max_events=10)
+
+    async def run():
+        first = await broker.subscribe()
+        leaving = asyncio.create_task(broker.unsubscribe(first))
+        await asyncio.sleep(0)
+        second = await asyncio.wait_for(broker.subscribe(), 1)
+        await leaving
+        assert broker._runner is not None and not broker._runner.done()
+        assert [container["vmid"] for container in broker.snapshot(second)] == [100]
+        await broker.unsubscribe(second)
+
+    asyncio.run(run())
+
+
+def test_sync_time_is_tracked_per_cluster(database, monkeypatch):
+    seed_nodes(database)
+    resources = {"east": [lxc("east-1", 100)], "west": [lxc("west-1", 200)]}
+    mock_clusters(resources)
+    now = [1000.0]
+    monkeypatch.setattr("proxmox.inventory.time.time", lambda: now[0])
+
+    async def run():
+        await clusters.load_nodes()
+        await inventory_reconciler.sync()
+        resources["west"] = None
+        now[0] = 1060.0
+        await inventory_reconciler.sync()
+        assert inventory_reconciler.synced_at("east") == 1060.0
+        assert inventory_reconciler.synced_at("west") == 1000.0
+
+    asyncio.run(run())
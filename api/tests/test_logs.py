@@ -0,0 +1,28 @@
+import logging
+import queue
+import pytest
+from utils.logs import RecordQueueHandler, redact
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("{'password': 'hunter2', 'vmid': 100}", "{'password': '***', 'vmid': 100}"),
+    ('{"token_value": "abc def"}', '{"token_value": "***"}'),
+    ("GET https://pve/api?user=root&password=hunter2&vmid=100", "GET https://pve/api?user=root&password=***&vmid=100"),
+    ("PVE_TOKEN_VALUE=abc-123 started", "PVE_TOKEN_VALUE=*** started"),
+    ("secret: s3cr3t, next", "secret: ***, next"),
+    ("token_name=bench", "token_name=bench"),
+])
+def test_redact(message, expected):
+    assert redact(message) == expected
+
+
+def test_queued_records_are_formatted_when_enqueued():
+    records = queue.SimpleQueue()
+    handler = RecordQueueHandler(records)
+    config = {"vmid": 100}
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "Config %s", (config,), None)
+    handler.emit(record)
+    config["vmid"] = 200
+    queued = records.get_nowait()
+    assert queued.getMessage() == "Config {'vmid': 100}"
+    assert queued.args is None
@@ -0,0 +1,27 @@
+import asyncio
+import httpx
+from proxmox.init import clusters
+from proxmox.network import apply_network_batch
+from schemas.proxmox.network import NetworkBatchItem
+
+
+def test_batch_keeps_item_results_when_reload_fails():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "PUT":
+            return httpx.Response(500, json={"data": None})
+        if request.url.path.endswith("/vmbr9"):
+            return httpx.Response(400, json={"data": None, "errors": {"iface": "does not exist"}})
+        return httpx.Response(200, json={"data": None})
+
+    for _, client in clusters.items():
+        client._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    items = [
+        NetworkBatchItem(action="create", iface="vmbr1", type="bridge", bridge_ports="eth1"),
+        NetworkBatchItem(action="delete", iface="vmbr9"),
+    ]
+
+    results, reloaded, reload_error = asyncio.run(apply_network_batch("east-1", items))
+    assert results[0] is None
+    assert isinstance(results[1], Exception)
+    assert reloaded is False
+    assert "Error reloading network config" in reload_error
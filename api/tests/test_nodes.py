@@ -0,0 +1,42 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from models import RegionModel, ProxNodeModel, ProxContainerModel
+from routes.servers.node import prox_node_router
+
+
+def test_delete_node_with_mirrored_containers(database):
+    with database.SessionLocal() as db:
+        db.add(RegionModel(id=1, name="east", logo="east.svg", available=True))
+        node = ProxNodeModel(name="east-1", private_network_interface="vmbr1", public_network_interface="vmbr0", region_id=1)
+        db.add(node)
+        db.flush()
+        db.add_all(
+            ProxContainerModel(vmid=vmid, name=f"ct{vmid}", type="lxc", status="running", cpus=1, maxmem=1024, maxdisk=2048, synced_at=0, prox_node_id=node.id)
+            for vmid in (100, 101)
+        )
+        db.commit()
+        node_id = node.id
+
+    app = FastAPI()
+    app.include_router(prox_node_router)
+    with TestClient(app) as client:
+        response = client.delete(f"/server/nodes/{node_id}")
+    assert response.status_code == 204
+    with database.SessionLocal() as db:
+        assert db.query(ProxNodeModel).count() == 0
+        assert db.query(ProxContainerModel).count() == 0
+
+
+def test_region_lxc_containers(database, fake_pve):
+    with database.SessionLocal() as db:
+        db.add(RegionModel(id=1, name="east", logo="east.svg", available=True))
+        db.add_all(ProxNodeModel(name=name, private_network_interface="vmbr1", public_network_interface="vmbr0", region_id=1) for name in ("node01", "node02"))
+        db.commit()
+
+    app = FastAPI()
+    app.include_router(prox_node_router)
+    with TestClient(app) as client:
+        response = client.get("/server/nodes/1/lxc")
+        assert response.status_code == 200
+        assert sorted(container["vmid"] for container in response.json()["containers"]) == [100, 101, 102, 103, 104, 105]
+        assert client.get("/server/nodes/2/lxc").status_code == 204
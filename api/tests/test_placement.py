@@ -0,0 +1,39 @@
+import pytest
+from proxmox.placement import PlacementIndex, PlacementError
+
+
+def index_with_nodes(*names: str) -> PlacementIndex:
+    index = PlacementIndex(interval=60, storage="local", cpu_overcommit=1)
+    index._regions = {1: [
+        {"node": name, "max_cpu": 8, "max_memory": 8 * 1024 ** 3, "max_storage": 100 * 1024 ** 3, "free_cpu": 8, "free_memory": 8 * 1024 ** 3, "free_storage": 100 * 1024 ** 3, "cpu_usage": 0, "storages": {"local": 100 * 1024 ** 3}}
+        for name in names
+    ]}
+    index._snapshot_at = 1.0
+    return index
+
+
+def test_release_returns_reserved_capacity():
+    index = index_with_nodes("node01", "node02")
+    before = index.nodes(1)
+    placements = index.place(1, cpu=2, memory_mb=1024, storage_gb=10, count=4, reserve=True)
+    assert index.nodes(1) != before
+    index.release(1, placements, cpu=2, memory_mb=1024, storage_gb=10, snapshot_at=1.0)
+    assert index.nodes(1) == before
+
+
+def test_release_ignores_reservations_of_an_older_snapshot():
+    index = index_with_nodes("node01")
+    placements = index.place(1, cpu=2, memory_mb=1024, storage_gb=10, reserve=True)
+    reserved = index.nodes(1)
+    index.release(1, placements, cpu=2, memory_mb=1024, storage_gb=10, snapshot_at=0.5)
+    assert index.nodes(1) == reserved
+
+
+def test_place_checks_the_requested_storage():
+    index = index_with_nodes("node01", "node02")
+    index._regions[1][0]["storages"]["ceph"] = 20 * 1024 ** 3
+    assert index.place(1, cpu=1, memory_mb=512, storage_gb=10, count=2, storage="ceph", reserve=True) == ["node01", "node01"]
+    assert index.nodes(1)[0]["free_storage"] == 80 * 1024 ** 3
+    with pytest.raises(PlacementError):
+        index.place(1, cpu=1, memory_mb=512, storage_gb=10, storage="ceph")
+    assert index.place(1, cpu=1, memory_mb=512, storage_gb=10) == ["node02"]
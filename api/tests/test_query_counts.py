@@ -0,0 +1,53 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from models import RegionModel, ServiceModel, RegionServiceModel, ServerImageModel, RegionImageModel
+from routes.core.service import service_router
+from routes.servers.image import server_image_router
+
+ROWS = 5
+
+
+def add_services_and_images(db_config, count: int):
+    with db_config.SessionLocal() as db:
+        regions = db.query(RegionModel).all()
+        if not regions:
+            regions = [RegionModel(name=f"region-{index}", logo="region.svg", available=True) for index in range(3)]
+            db.add_all(regions)
+            db.flush()
+        offset = db.query(ServiceModel).count()
+        services = [ServiceModel(name=f"service-{offset + index}", description="Service", available=True) for index in range(count)]
+        db.add_all(services)
+        db.flush()
+        images = [
+            ServerImageModel(name=f"image-{service.id}", version="1.0", source=f"local:vztmpl/image-{service.id}.tar.zst", logo="image.svg", available=True, service_id=service.id)
+            for service in services
+        ]
+        db.add_all(images)
+        db.flush()
+        db.add_all(RegionServiceModel(region_id=region.id, service_id=service.id) for region in regions for service in services)
+        db.add_all(RegionImageModel(region_id=region.id, image_id=image.id) for region in regions for image in images)
+        db.commit()
+
+
+@pytest.mark.parametrize("path", ["/core/service", "/server/image"])
+def test_list_query_count_does_not_grow_with_rows(database, path):
+    app = FastAPI()
+    app.include_router(service_router)
+    app.include_router(server_image_router)
+    queries = []
+    event.listen(database.async_engine.sync_engine, "before_cursor_execute", lambda *args: queries.append(args[2]))
+
+    def count_queries(rows: int) -> int:
+        queries.clear()
+        response = client.get(path)
+        assert response.status_code == 200
+        assert len(response.json()) == rows
+        return len(queries)
+
+    with TestClient(app) as client:
+        add_services_and_images(database, ROWS)
+        small = count_queries(ROWS)
+        add_services_and_images(database, ROWS * 9)
+        assert count_queries(ROWS * 10) == small
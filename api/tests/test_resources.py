@@ -0,0 +1,57 @@
+import asyncio
+import httpx
+from proxmox.init import clusters
+from proxmox.resources import fetch_cluster_resources
+
+
+def test_duplicate_node_names_keep_their_first_cluster():
+    resources = {
+        "east": [{"type": "node", "node": "pve"}, {"type": "lxc", "node": "pve", "vmid": 100}],
+        "west": [{"type": "node", "node": "pve"}, {"type": "lxc", "node": "pve", "vmid": 200}],
+    }
+    for cluster, client in clusters.items():
+        client._http_client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request, cluster=cluster: httpx.Response(200, json={"data": resources[cluster]})))
+    clusters.register_node("pve", "east")
+
+    async def run():
+        for _ in range(3):
+            fetched, failed = await fetch_cluster_resources(cached=False)
+            assert failed == set()
+            assert fetched["east"] == resources["east"]
+            assert fetched["west"] == []
+            assert clusters.cluster_for_node("pve") == "east"
+
+    asyncio.run(run())
+
+
+def test_get_lxc_tells_unknown_nodes_from_unreachable_clusters():
+    from fastapi import HTTPException
+    from proxmox.lxc import get_lxc
+
+    resources = {"east": [{"type": "node", "node": "east-9", "status": "online"}, {"type": "lxc", "node": "east-9", "vmid": 900}], "west": None}
+
+    def handler_for(cluster: str):
+        def handler(request: httpx.Request) -> httpx.Response:
+            if resources[cluster] is None:
+                return httpx.Response(500, json={"data": None})
+            return httpx.Response(200, json={"data": resources[cluster]})
+        return handler
+
+    for cluster, client in clusters.items():
+        client._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler_for(cluster)))
+        asyncio.run(client.invalidate("cluster/resources"))
+    clusters.register_node("west-9", "west")
+
+    async def status_of(proxmox_node: str) -> int:
+        try:
+            await get_lxc(proxmox_node)
+        except HTTPException as e:
+            return e.status_code
+        return 200
+
+    async def run():
+        assert [guest["vmid"] for guest in await get_lxc("east-9")] == [900]
+        assert await status_of("west-9") == 503
+        assert await status_of("nowhere") == 404
+
+    asyncio.run(run())
@@ -0,0 +1,83 @@
+import asyncio
+import httpx
+from proxmox.init import clusters
+from proxmox.lxc import batch_runners, start_lxc_batch
+from proxmox.tasks import task_registry
+from schemas.proxmox.lxc import LXCBatchItem
+
+
+def test_batch_group_counts_children_that_were_pruned(monkeypatch):
+    exit_statuses = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if request.method == "POST":
+            vmid = int(path.split("/")[-3])
+            if vmid == 102:
+                return httpx.Response(500, json={"data": None})
+            return httpx.Response(200, json={"data": f"UPID:east-1:{vmid}"})
+        if path.endswith("/tasks"):
+            return httpx.Response(200, json={"data": []})
+        vmid = int(path.split("/")[-2].split(":")[-1])
+        exit_status = exit_statuses.get(vmid)
+        return httpx.Response(200, json={"data": {"status": "running" if exit_status is None else "stopped", "exitstatus": exit_status}})
+
+    for _, client in clusters.items():
+        client._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(task_registry, "_retention", 0)
+    items = [LXCBatchItem(node="east-1", vmid=vmid, action="start") for vmid in (100, 101, 102)]
+
+    async def run():
+        group = start_lxc_batch(items)
+        assert group["status"] == "running"
+        assert group["tasks"] == []
+        await asyncio.gather(*batch_runners)
+        await task_registry.stop()
+        group = task_registry.get(group["id"])
+        assert len(group["tasks"]) == 2
+        assert [error["vmid"] for error in group["errors"]] == [102]
+
+        exit_statuses[100] = "OK"
+        await task_registry._poll()
+        task_registry._prune()
+        assert task_registry.get(group["tasks"][0]) is None
+        assert task_registry.get(group["id"])["status"] == "running"
+
+        exit_statuses[101] = "command failed"
+        await task_registry._poll()
+        group = task_registry.get(group["id"])
+        assert group["status"] == "stopped"
+        assert (group["succeeded"], group["failed"]) == (1, 2)
+        assert group["exitstatus"] == "2 of 3 tasks failed"
+
+    asyncio.run(run())
+
+
+def test_tasks_whose_status_cannot_be_polled_are_stopped():
+    from proxmox.tasks import TaskRegistry
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if "/tasks/" not in request.url.path:
+            return httpx.Response(200, json={"data": []})
+        if ":404:" in request.url.path:
+            return httpx.Response(400, json={"data": None, "errors": {"upid": "unable to parse worker upid"}})
+        return httpx.Response(500, json={"data": None})
+
+    for _, client in clusters.items():
+        client._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    registry = TaskRegistry(clusters, min_interval=0.5, max_interval=5, retention=3600, max_poll_errors=3)
+
+    async def run():
+        unknown = registry.track("east-1", "UPID:east-1:404:", "start", 100)
+        unreachable = registry.track("east-1", "UPID:east-1:500:", "start", 101)
+        await registry.stop()
+        await registry._poll()
+        assert registry.get(unknown["id"])["status"] == "stopped"
+        assert registry.get(unknown["id"])["exitstatus"].startswith("unknown")
+        assert registry.get(unreachable["id"])["status"] == "running"
+        await registry._poll()
+        await registry._poll()
+        assert registry.get(unreachable["id"])["status"] == "stopped"
+        assert (await registry.wait(unreachable["id"], 0))["exitstatus"].startswith("unknown")
+
+    asyncio.run(run())
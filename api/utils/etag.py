@@ -0,0 +1,36 @@
+import hashlib
+from typing import Optional
+from fastapi import Request, status
+from fastapi.responses import Response
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import TableVersionModel
+
+
+async def bump_table_versions(db: AsyncSession, *tables: str):
+    statement = insert(TableVersionModel).values([{"name": table, "version": 1} for table in tables])
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[TableVersionModel.name],
+        set_={"version": TableVersionModel.version + 1},
+    ))
+
+
+async def table_etag(request: Request, db: AsyncSession, *tables: str) -> str:
+    rows = await db.execute(
+        select(TableVersionModel.name, TableVersionModel.version).where(TableVersionModel.name.in_(tables))
+    )
+    versions = dict(rows.all())
+    version = ".".join(str(versions.get(table, 0)) for table in tables)
+    representation = hashlib.sha1(f"{request.url.path}?{request.url.query}".encode()).hexdigest()[:16]
+    return f'"{version}-{representation}"'
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    if "*" in candidates or etag in candidates:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
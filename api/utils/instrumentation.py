@@ -0,0 +1,108 @@
+import asyncio
+import time
+from contextvars import ContextVar, copy_context
+from typing import Coroutine, Optional
+from sqlalchemy import event
+from utils.metrics import HTTP_REQUEST_SECONDS, HTTP_REQUEST_DB_QUERIES, HTTP_REQUEST_DB_SECONDS, HTTP_REQUEST_PVE_CALLS, HTTP_REQUEST_PVE_SECONDS, HTTP_RESPONSE_BYTES
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestStats:
+    def __init__(self, scope=None):
+        self.scope = scope
+        self.start = time.perf_counter()
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.pve_calls = 0
+        self.pve_seconds = 0.0
+        self.response_bytes = 0
+        self.log_sampled: Optional[bool] = None
+
+    def server_timing(self) -> str:
+        return ", ".join([
+            f"app;dur={(time.perf_counter() - self.start) * 1000:.1f}",
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_queries} queries"',
+            f'pve;dur={self.pve_seconds * 1000:.1f};desc="{self.pve_calls} calls"',
+        ])
+
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def create_detached_task(coro: Coroutine) -> asyncio.Task:
+    context = copy_context()
+    context.run(request_stats.set, None)
+    return asyncio.create_task(coro, context=context)
+
+
+def record_db_query(seconds: float):
+    stats = request_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += seconds
+
+
+def record_pve_call(seconds: float):
+    stats = request_stats.get()
+    if stats is not None:
+        stats.pve_calls += 1
+        stats.pve_seconds += seconds
+
+
+def instrument_engine(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        record_db_query(time.perf_counter() - conn.info["query_start"].pop())
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            record_db_query(time.perf_counter() - starts.pop())
+
+
+def route_template(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+class InstrumentationMiddleware:
+    def __init__(self, app, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats(scope)
+        token = request_stats.set(stats)
+        status_code = 500
+
+        async def send_with_stats(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    message["headers"] = [*message.get("headers", []), (b"server-timing", stats.server_timing().encode())]
+            elif message["type"] == "http.response.body":
+                stats.response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            request_stats.reset(token)
+            method = scope["method"]
+            route = route_template(scope)
+            HTTP_REQUEST_SECONDS.labels(method, route, str(status_code)).observe(time.perf_counter() - stats.start)
+            HTTP_REQUEST_DB_QUERIES.labels(method, route).observe(stats.db_queries)
+            HTTP_REQUEST_DB_SECONDS.labels(method, route).observe(stats.db_seconds)
+            HTTP_REQUEST_PVE_CALLS.labels(method, route).observe(stats.pve_calls)
+            HTTP_REQUEST_PVE_SECONDS.labels(method, route).observe(stats.pve_seconds)
+            HTTP_RESPONSE_BYTES.labels(method, route).observe(stats.response_bytes)
@@ -1,3 +1,131 @@
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from utils.instrumentation import request_stats, route_template
 
 logger = logging.getLogger(__name__)
+
+REDACTED = "***"
+SECRET_PATTERN = re.compile(
+    r"""(?P<key>['"]?(?:password|token_value|token|secret|ssh_private_key)['"]?\s*[:=]\s*)(?:(?P<quote>['"])(?P<value>.*?)(?P=quote)|[^\s&,;'"})\]]+)""",
+    re.IGNORECASE,
+)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def redact(message: str) -> str:
+    return SECRET_PATTERN.sub(lambda match: f"{match['key']}{match['quote'] or ''}{REDACTED}{match['quote'] or ''}", message)
+
+
+def parse_route_settings(value: Optional[str]) -> Dict[str, str]:
+    settings = {}
+    if not value:
+        return settings
+    for item in value.split(","):
+        if "=" in item:
+            route, setting = item.rsplit("=", 1)
+            settings[route.strip()] = setting.strip()
+    return settings
+
+
+class RouteFilter(logging.Filter):
+    def __init__(self, level: int, route_levels: Dict[str, int], route_sample_rates: Dict[str, float]):
+        super().__init__()
+        self.level = level
+        self.route_levels = route_levels
+        self.route_sample_rates = route_sample_rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        stats = request_stats.get()
+        route = route_template(stats.scope) if stats is not None and stats.scope is not None else None
+        record.route = route
+        if record.levelno < self.route_levels.get(route, self.level):
+            return False
+        rate = self.route_sample_rates.get(route)
+        if rate is None or record.levelno >= logging.WARNING:
+            return True
+        if stats.log_sampled is None:
+            stats.log_sampled = random.random() < rate
+        return stats.log_sampled
+
+
+class RecordQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": redact(record.getMessage()),
+        }
+        route = getattr(record, "route", None)
+        if route is not None:
+            entry["route"] = route
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = redact(record.exc_text)
+        return json.dumps(entry, default=str)
+
+
+class RedactingFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return redact(super().format(record))
+
+
+def setup_logging(
+    level: str = "INFO",
+    log_format: str = "json",
+    route_levels: Optional[str] = None,
+    route_sample_rates: Optional[str] = None,
+):
+    global _listener
+    if _listener is not None:
+        return
+    root_level = logging.getLevelName(level.upper())
+    levels = {route: logging.getLevelName(value.upper()) for route, value in parse_route_settings(route_levels).items()}
+    rates = {route: float(value) for route, value in parse_route_settings(route_sample_rates).items()}
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    if log_format == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(RedactingFormatter("%(levelname)s:%(name)s:%(message)s"))
+    log_queue = queue.SimpleQueue()
+    queue_handler = RecordQueueHandler(log_queue)
+    queue_handler.addFilter(RouteFilter(root_level, levels, rates))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(min([root_level, *levels.values()]))
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,67 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+
+DB_POOL_SIZE = Gauge("puyu_db_pool_size", "Configured size of the database connection pool", ["engine"])
+DB_POOL_CHECKED_OUT = Gauge("puyu_db_pool_checked_out", "Database connections currently checked out", ["engine"])
+DB_POOL_CHECKED_IN = Gauge("puyu_db_pool_checked_in", "Idle database connections in the pool", ["engine"])
+DB_POOL_OVERFLOW = Gauge("puyu_db_pool_overflow", "Database connections opened beyond the pool size", ["engine"])
+DB_POOL_WAIT_SECONDS = Histogram(
+    "puyu_db_pool_wait_seconds",
+    "Time spent waiting for the pool to hand out a database connection",
+    ["engine"],
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "puyu_db_pool_checkout_seconds",
+    "Total time to check out a database connection, including pre-ping",
+    ["engine"],
+)
+
+PVE_CIRCUIT_STATE = Gauge(
+    "puyu_pve_circuit_state",
+    "State of the Proxmox circuit breaker, 0 closed, 1 half open, 2 open",
+    ["scope"],
+)
+PVE_CIRCUIT_TRIPS = Counter("puyu_pve_circuit_trips_total", "Times the Proxmox circuit breaker opened", ["scope"])
+PVE_REQUEST_RETRIES = Counter("puyu_pve_request_retries_total", "Proxmox GET requests retried after a failure", ["scope"])
+
+
+def instrument_pool(pool, engine_name: str):
+    pool.metrics_label = engine_name
+    DB_POOL_SIZE.labels(engine_name).set_function(pool.size)
+    DB_POOL_CHECKED_OUT.labels(engine_name).set_function(pool.checkedout)
+    DB_POOL_CHECKED_IN.labels(engine_name).set_function(pool.checkedin)
+    DB_POOL_OVERFLOW.labels(engine_name).set_function(lambda: max(pool.overflow(), 0))
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "puyu_http_request_seconds",
+    "Wall time of an HTTP request",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "puyu_http_request_db_queries",
+    "Database queries run by an HTTP request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "puyu_http_request_db_seconds",
+    "Time an HTTP request spent running database queries",
+    ["method", "route"],
+)
+HTTP_REQUEST_PVE_CALLS = Histogram(
+    "puyu_http_request_pve_calls",
+    "Proxmox API calls made by an HTTP request, including retries",
+    ["method", "route"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+HTTP_REQUEST_PVE_SECONDS = Histogram(
+    "puyu_http_request_pve_seconds",
+    "Time an HTTP request spent waiting for Proxmox API calls",
+    ["method", "route"],
+)
+HTTP_RESPONSE_BYTES = Histogram(
+    "puyu_http_response_bytes",
+    "Size of an HTTP response body",
+    ["method", "route"],
+    buckets=(0, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
@@ -0,0 +1,44 @@
+import json
+from typing import Callable, Dict, List, Union
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.orm import Query
+from db.config import SessionLocal, AsyncSessionLocal
+from schemas.common.pagination import PaginationParams
+
+STREAM_BATCH_SIZE = 500
+
+
+def paginate(query: Union[Query, Select], id_column, pagination: PaginationParams) -> Union[Query, Select]:
+    query = query.order_by(id_column)
+    if pagination.after_id is not None:
+        query = query.filter(id_column > pagination.after_id)
+    if pagination.limit is not None:
+        query = query.limit(pagination.limit)
+    return query
+
+
+def pagination_headers(rows: List, pagination: PaginationParams) -> Dict[str, str]:
+    if pagination.limit is not None and len(rows) == pagination.limit:
+        return {"X-Next-After-Id": str(rows[-1].id)}
+    return {}
+
+
+def stream_ndjson(query: Query, serialize: Callable = lambda row: row.to_dict()) -> StreamingResponse:
+    def generate():
+        db = SessionLocal()
+        try:
+            for row in query.with_session(db).yield_per(STREAM_BATCH_SIZE):
+                yield json.dumps(serialize(row)) + "\n"
+        finally:
+            db.close()
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+def stream_ndjson_async(statement: Select, serialize: Callable = lambda row: row.to_dict()) -> StreamingResponse:
+    async def generate():
+        async with AsyncSessionLocal() as db:
+            rows = await db.stream_scalars(statement.execution_options(yield_per=STREAM_BATCH_SIZE))
+            async for row in rows:
+                yield json.dumps(serialize(row)) + "\n"
+    return StreamingResponse(generate(), media_type="application/x-ndjson")